@@ -0,0 +1,39 @@
+" ncm2 source, see 'pythonx/ncm2_gdscript3.py'.
+
+let g:ncm2_gdscript3#source = extend(get(g:, 'ncm2_gdscript3#source', {}), {
+    \ 'name': 'gdscript3',
+    \ 'priority': 9,
+    \ 'mark': 'gd',
+    \ 'scope': ['gdscript3'],
+    \ 'word_pattern': '[\w\-]+',
+    \ 'complete_pattern': [
+        \ '\.',
+        \ '\bextends\s+',
+        \ '\bexport\(',
+        \ '\bfunc\s+',
+        \ '"res://[^"]*',
+        \ '\$[\w/]*',
+        \ '\bget_node\("[^"]*',
+        \ '\b(connect|disconnect|emit_signal|is_connected)\(\s*"\w*',
+        \ '\byield\(.+,\s*"\w*'
+    \ ],
+    \ 'on_complete': 'ncm2_gdscript3#on_complete',
+    \ 'on_warmup': 'ncm2_gdscript3#on_warmup',
+    \ }, 'keep')
+
+let g:ncm2_gdscript3#proc = yarp#py3({
+    \ 'module': 'ncm2_gdscript3',
+    \ 'on_load': { -> ncm2#set_ready(g:ncm2_gdscript3#source)}
+    \ })
+
+fun! ncm2_gdscript3#init()
+    call ncm2#register_source(g:ncm2_gdscript3#source)
+endfun
+
+fun! ncm2_gdscript3#on_warmup(ctx)
+    call g:ncm2_gdscript3#proc.jobstart()
+endfun
+
+fun! ncm2_gdscript3#on_complete(ctx)
+    call g:ncm2_gdscript3#proc.try_notify('on_complete', a:ctx, getline(1, '$'), b:changedtick)
+endfun
@@ -5,19 +5,50 @@ if exists("g:gdscript3_loaded")
 endif
 let g:gdscript3_loaded=1
 
-if !has("python3") && !has("python")
+" Time spent loading the plugin, in milliseconds, by part. See
+" 'python/gdscript3/bench_startup.py'.
+let g:gdscript3_timings = {}
+let s:start_time = reltime()
+
+" The completion engine needs Python 3.
+if !has("python3")
     finish
 endif
 
-if has("python3")
-    let s:pyfile_cmd = "py3file"
-    let s:py_cmd = "py3"
-else
-    let s:pyfile_cmd = "pyfile"
-    let s:py_cmd = "py"
-endif
+let s:pyfile_cmd = "py3file"
+let s:py_cmd = "py3"
+
+let s:python_dir = expand('<sfile>:p:h:h') . "/python/gdscript3"
+let s:python_loaded = 0
 
-execute s:pyfile_cmd . " " . expand('<sfile>:p:h') . "/../python/gdscript3/init.py"
+" The Python side is loaded the first time it's needed, e.g. for completion,
+" or once Vim has been idle for 'g:gdscript3_warmup_delay' milliseconds, so
+" opening a script doesn't wait for the interpreter and the class database.
+fun! s:LoadPython()
+    if s:python_loaded
+        return
+    endif
+    let s:python_loaded = 1
+    let start = reltime()
+    " Read by 'init.py', since '<sfile>' isn't a file inside a function.
+    let python_dir = s:python_dir
+    execute s:pyfile_cmd . " " . fnameescape(python_dir . "/init.py")
+    let g:gdscript3_timings.python = reltimefloat(reltime(start)) * 1000
+endfun
+
+" Load the Python side and the classes the current script uses, unless the
+" user is typing.
+fun! s:WarmUp(timer)
+    if mode() !=# 'n'
+        call timer_start(s:warmup_delay, function('s:WarmUp'))
+        return
+    endif
+    call s:LoadPython()
+    if &filetype ==# 'gdscript3'
+        execute s:py_cmd . " gdscript_warmup()"
+        execute s:py_cmd . " gdscript_highlight_classes()"
+    endif
+endfun
 
 fun! GDScriptComplete(findstart, base)
     if a:findstart == 1
@@ -34,6 +65,7 @@ fun! GDScriptComplete(findstart, base)
         endwhile
         return start
     else
+        call s:LoadPython()
         execute s:py_cmd . " gdscript_complete()"
         if exists("gdscript_completions")
             return gdscript_completions
@@ -44,22 +76,220 @@ fun! GDScriptComplete(findstart, base)
 endfun
 set omnifunc=GDScriptComplete
 
+" Rank recently chosen completions higher.
+augroup gdscript3_complete
+    au!
+    au CompleteDone *.gd if s:python_loaded | execute s:py_cmd . " gdscript_complete_done()" | endif
+augroup END
+
+" Symbol navigation, backed by an index of the current buffer and project.
+command! GDScriptDefinition call s:LoadPython() | execute s:py_cmd . " gdscript_goto_definition()"
+command! GDScriptReferences call s:LoadPython() | execute s:py_cmd . " gdscript_find_references()" | cwindow
+command! GDScriptReindex call s:LoadPython() | execute s:py_cmd . " gdscript_reindex()"
+            \ | execute s:py_cmd . " gdscript_highlight_classes()"
+
+augroup gdscript3_index
+    au!
+    " Indexes are only built once the Python side is loaded.
+    au BufWritePost *.gd if s:python_loaded | execute s:py_cmd . " gdscript_update_index()" | endif
+    " Classes declared in other scripts may have changed since the buffer was
+    " last shown.
+    au BufWritePost,BufEnter *.gd if s:python_loaded | execute s:py_cmd . " gdscript_highlight_classes()" | endif
+    au VimLeavePre * if s:python_loaded | execute s:py_cmd . " gdscript_save_symbols()" | endif
+augroup END
+
+" Fuzzy search for declarations across the project. Returns a list of dicts
+" with the 'name', 'kind' and 'text' of each symbol, and its 'filename',
+" 'lnum' and 'col' if it's declared in a script, best match first. Set
+" 'g:gdscript3_symbols_api' to include the Godot API.
+fun! GDScriptSearchSymbols(query, ...)
+    let limit = a:0 ? a:1 : 50
+    call s:LoadPython()
+    execute s:py_cmd . " gdscript_search_symbols()"
+    return gdscript_symbols
+endfun
+
+fun! s:SearchSymbols(query)
+    call setqflist(GDScriptSearchSymbols(a:query), 'r')
+    cwindow
+endfun
+
+command! -nargs=1 GDScriptSymbols call s:SearchSymbols(<q-args>)
+
+" Documentation of built-in classes and their items.
+command! GDScriptDoc call s:LoadPython() | execute s:py_cmd . " gdscript_show_doc()"
+
+" Show the description of the selected completion in the info popup.
+" Descriptions are only read when an item is selected, so 'completeopt' needs
+" 'popuphidden' for the popup to wait for them.
+if exists('*popup_findinfo')
+    fun! s:ShowCompleteDoc()
+        if !s:python_loaded
+            return
+        endif
+        execute s:py_cmd . " gdscript_complete_doc()"
+        let id = popup_findinfo()
+        if !id
+            return
+        endif
+        if exists("gdscript_doc")
+            call popup_settext(id, split(gdscript_doc, "\n"))
+            call popup_show(id)
+        else
+            call popup_hide(id)
+        endif
+    endfun
+
+    augroup gdscript3_docs
+        au!
+        au CompleteChanged *.gd call s:ShowCompleteDoc()
+    augroup END
+endif
+
+" Diagnostics from the class database, e.g. 'OS.get_nmae()', checked in-process
+" after each pause in typing. Only lines changed since the last check are
+" checked again, 'g:gdscript3_lint_budget' milliseconds at a time, so typing
+" isn't held up. Set 'g:gdscript3_lint' to enable. Errors are shown as signs,
+" and in the location list with 'g:gdscript3_lint_loclist'.
+if get(g:, 'gdscript3_lint', 0)
+    let s:lint_timer = -1
+    let s:lint_bufnr = -1
+
+    if exists('*sign_define')
+        call sign_define('GDScriptLintError', {'text': '>>', 'texthl': 'Error'})
+    endif
+
+    fun! s:ScheduleLint()
+        call timer_stop(s:lint_timer)
+        let s:lint_bufnr = bufnr('%')
+        let s:lint_timer = timer_start(get(g:, 'gdscript3_lint_delay', 250),
+                                     \ function('s:LintStep'))
+    endfun
+
+    " Check part of the buffer, and continue in another timer until done.
+    fun! s:LintStep(timer)
+        if bufnr('%') != s:lint_bufnr
+            return
+        endif
+        " Stop on errors, rather than failing again every millisecond.
+        try
+            call s:LoadPython()
+            execute s:py_cmd . " gdscript_lint()"
+        catch
+            echohl ErrorMsg | echomsg v:exception | echohl None
+            return
+        endtry
+        if exists("gdscript_lint_items")
+            call s:PublishLint(gdscript_lint_items)
+        else
+            let s:lint_timer = timer_start(1, function('s:LintStep'))
+        endif
+    endfun
+
+    fun! s:PublishLint(items)
+        let bufnr = bufnr('%')
+        if exists('*sign_place')
+            call sign_unplace('gdscript3_lint', {'buffer': bufnr})
+            for item in a:items
+                call sign_place(0, 'gdscript3_lint', 'GDScriptLintError', bufnr,
+                              \ {'lnum': item.lnum})
+            endfor
+        endif
+        if get(g:, 'gdscript3_lint_loclist', 0) || !exists('*sign_place')
+            call setloclist(0, a:items, 'r')
+        endif
+    endfun
+
+    augroup gdscript3_lint
+        au!
+        au BufEnter,TextChanged,TextChangedI,InsertLeave *.gd call s:ScheduleLint()
+    augroup END
+endif
+
+augroup gdscript3_buffers
+    au!
+    au BufWipeout *.gd if s:python_loaded | execute s:py_cmd . " gdscript_clear_buffer()" | endif
+augroup END
+
+" Tags, generated by 'python/gdscript3/tags.py' outside of Vim.
+" :GDScriptTags updates the project's tags file in the background, rewriting
+" only the entries of changed scripts. Set 'g:gdscript3_tags_auto' to update
+" it on every save.
+let s:tags_script = expand('<sfile>:p:h:h') . "/python/gdscript3/tags.py"
+
+fun! s:UpdateTags()
+    let cmd = [get(g:, 'gdscript3_python', 'python3'), s:tags_script]
+    if exists('g:gdscript3_tags_file')
+        let cmd += ['-o', g:gdscript3_tags_file]
+    endif
+    let cmd += [expand('%:p:h')]
+    if exists('*jobstart')
+        call jobstart(cmd)
+    elseif exists('*job_start')
+        call job_start(cmd, {'out_io': 'null', 'err_io': 'null'})
+    else
+        call system(join(map(cmd, 'shellescape(v:val)')))
+    endif
+endfun
+
+command! GDScriptTags call s:UpdateTags()
+
+augroup gdscript3_tags
+    au!
+    au BufWritePost *.gd if get(g:, 'gdscript3_tags_auto', 0) | call s:UpdateTags() | endif
+augroup END
+
+" Tagbar
+" The outline of a buffer comes from the same parser, one script at a time.
+if !exists('g:tagbar_type_gdscript3')
+    let g:tagbar_type_gdscript3 = {
+        \ 'ctagstype': 'gdscript3',
+        \ 'ctagsbin': get(g:, 'gdscript3_python', 'python3'),
+        \ 'ctagsargs': shellescape(s:tags_script) . ' --outline',
+        \ 'kinds': [
+            \ 'c:classes',
+            \ 'g:enums',
+            \ 'e:enumerators:0:0',
+            \ 'C:constants:0:0',
+            \ 'v:variables:0:0',
+            \ 's:signals',
+            \ 'm:methods',
+        \ ],
+        \ 'sro': '.',
+        \ 'kind2scope': {'c': 'class', 'g': 'enum'},
+        \ 'scope2kind': {'class': 'c', 'enum': 'g'},
+    \ }
+endif
+
 " Configure for common completion frameworks.
 
 " Deoplete
+" The 'gdscript3' source (see 'rplugin/python3/deoplete/sources') calls the
+" completion engine directly. Set 'g:gdscript3_deoplete_omni' to use the
+" omnifunc instead.
 if &rtp =~ 'deoplete.nvim'
-    call deoplete#custom#option('sources', {
-        \ 'gdscript3': ['omni'],
-    \ })
-    call deoplete#custom#var('omni', 'input_patterns', {
-        \ 'gdscript3': [
-            \ '\.|\w+',
-            \ '\bextends\s+',
-            \ '\bexport\(',
-            \ '\bfunc\s+',
-            \ '"res://[^"]*'
-        \ ]
-    \ })
+    if get(g:, 'gdscript3_deoplete_omni', 0)
+        call deoplete#custom#option('sources', {
+            \ 'gdscript3': ['omni'],
+        \ })
+        call deoplete#custom#var('omni', 'input_patterns', {
+            \ 'gdscript3': [
+                \ '\.|\w+',
+                \ '\bextends\s+',
+                \ '\bexport\(',
+                \ '\bfunc\s+',
+                \ '"res://[^"]*',
+                \ '\$[\w/]*',
+                \ '\bget_node\("[^"]*',
+                \ '\b(connect|disconnect|emit_signal|is_connected)\(\s*"\w*',
+                \ '\byield\(.+,\s*"\w*'
+            \ ]
+        \ })
+    else
+        call deoplete#custom#option('sources', {
+            \ 'gdscript3': ['gdscript3'],
+        \ })
+    endif
 endif
 
 " SuperTab
@@ -75,7 +305,11 @@ let g:ycm_semantic_triggers.gdscript3 = [
     \'re!\bextends\s+',
     \'re!\bexport\(',
     \'re!\bfunc\s+',
-    \'re!"res://[^"]*'
+    \'re!"res://[^"]*',
+    \'re!\$[\w/]*',
+    \'re!\bget_node\("[^"]*',
+    \'re!\b(connect|disconnect|emit_signal|is_connected)\(\s*"\w*',
+    \'re!\byield\(.+,\s*"\w*'
     \]
 
 
@@ -84,6 +318,7 @@ let g:ycm_semantic_triggers.gdscript3 = [
 if &rtp =~ 'echodoc'
     let s:echodoc_dict = { "name": "gdscript3", "rank": 9 }
     fun! s:echodoc_dict.search(text)
+        call s:LoadPython()
         execute s:py_cmd . " echodoc_search()"
         if exists("echodoc_search_result")
             return echodoc_search_result
@@ -101,3 +336,49 @@ endif
 
 " Configure Syntastic checker
 let g:syntastic_gdscript3_checkers = ['godot_server']
+
+" Check the current file with a long-lived godot_server process.
+" Returns a location list for Syntastic.
+" Waits at most 'g:gdscript3_checker_wait' milliseconds for the engine. If it
+" takes longer, the errors of the last check are returned, and Syntastic checks
+" again once the engine is done.
+fun! GDScriptCheck(exe)
+    call s:LoadPython()
+    execute s:py_cmd . " gdscript_check()"
+    if gdscript_check_pending && has('timers')
+        call timer_stop(s:check_timer)
+        let s:check_bufnr = bufnr('%')
+        let s:check_timer = timer_start(200, function('s:PollCheck'))
+    endif
+    if exists("gdscript_loclist")
+        return gdscript_loclist
+    else
+        return []
+    endif
+endfun
+
+let s:check_timer = -1
+let s:check_bufnr = -1
+
+fun! s:PollCheck(timer)
+    if bufnr('%') != s:check_bufnr
+        return
+    endif
+    execute s:py_cmd . " gdscript_check_pending()"
+    if gdscript_check_pending
+        let s:check_timer = timer_start(200, function('s:PollCheck'))
+    elseif exists(':SyntasticCheck')
+        SyntasticCheck godot_server
+    endif
+endfun
+
+" Set 'g:gdscript3_warmup_delay' to 0 to load the Python side right away, or
+" to -1 to only load it when it's first needed.
+let s:warmup_delay = get(g:, 'gdscript3_warmup_delay', 1000)
+if s:warmup_delay == 0
+    call s:LoadPython()
+elseif s:warmup_delay > 0 && has('timers')
+    call timer_start(s:warmup_delay, function('s:WarmUp'))
+endif
+
+let g:gdscript3_timings.ftplugin = reltimefloat(reltime(s:start_time)) * 1000
@@ -0,0 +1 @@
+call ncm2_gdscript3#init()
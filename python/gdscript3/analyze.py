@@ -0,0 +1,168 @@
+# This is a standalone script that statically checks every script in a Godot
+# project, without Vim. It runs the checks from 'lint.py', which use the
+# plugin's token chain resolution to find accesses to members, methods and
+# constants that don't exist, e.g. 'Vector2(1, 2).lenght()' or 'OS.get_nmae()'.
+#
+# Usage: python analyze.py [options] [path/to/project]
+#
+# Scripts are analyzed in a process pool. Results are cached by file mtime and
+# size, so reruns only analyze scripts that changed. Diagnostics are written
+# as JSON (or plain text with '--format text'), and the throughput is reported
+# on stderr. The exit status is 1 if there were any diagnostics, and 2 if
+# nothing could be checked because there's no API data for the project's
+# Godot version (unless '--allow-unknown-version' is given).
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+
+import util
+import classes
+import index
+import lint
+
+# Bump this when checks change, to invalidate cached results.
+ANALYZER_VERSION = 3
+
+# Analyze a script and return a list of diagnostic dicts.
+def analyze_file(path):
+    lines = index.read_lines(path)
+    if lines is None:
+        return [lint.make_diagnostic(path, 1, 1, "read-error", "Couldn't read file")]
+    return lint.check_lines(lines, path)
+
+# Select the API version like the main process does, so the workers know
+# whether it's the project's version.
+def _init_worker(root, api_version):
+    if api_version:
+        classes.configure(version=api_version)
+    classes.select_project(root)
+
+# Worker entry point. Returns (path, stat key, diagnostics).
+def _analyze_job(job):
+    (path, key) = job
+    return (path, key, analyze_file(path))
+
+def _find_scripts(root):
+    paths = []
+    for (dirpath, dirnames, filenames) in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for f in filenames:
+            if f.endswith(".gd"):
+                paths.append(os.path.join(dirpath, f))
+    return sorted(paths)
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_mtime, st.st_size]
+
+def _default_cache_path(root, version):
+    key = "{}\0{}".format(root, version)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(util.get_cache_dir(), "analyze-{}.json".format(digest))
+
+def _load_cache(path):
+    try:
+        with open(path, "r") as f:
+            cache = json.load(f)
+        if cache.get("version") == ANALYZER_VERSION:
+            return cache.get("files", {})
+    except (IOError, ValueError):
+        pass
+    return {}
+
+def _save_cache(path, files):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": ANALYZER_VERSION, "files": files}, f)
+    os.rename(tmp_path, path)
+
+def _format_text(diagnostics, root):
+    lines = []
+    for d in diagnostics:
+        lines.append("{}:{}:{}: {}: {}".format(os.path.relpath(d["path"], root),
+                     d["line"], d["col"], d["severity"], d["message"]))
+    return "\n".join(lines) + ("\n" if lines else "")
+
+def main():
+    parser = argparse.ArgumentParser(description="Statically check GDScript files.")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="project directory, or any directory inside it")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("-f", "--format", choices=("json", "text"), default="json")
+    parser.add_argument("-o", "--output", help="write diagnostics to a file")
+    parser.add_argument("--api-version",
+                        help="Godot API version (default: from project.godot)")
+    parser.add_argument("--allow-unknown-version", action="store_true",
+                        help="exit with status 0 rather than 2 if the project's "
+                             "API version is unknown, so nothing is checked")
+    parser.add_argument("--cache", help="cache file (default: in ~/.cache)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="analyze every script, ignoring cached results")
+    args = parser.parse_args()
+
+    root = util.find_project_dir(args.project)
+    if not root:
+        print("'{}' is not inside a Godot project".format(args.project), file=sys.stderr)
+        exit(2)
+
+    start = time.time()
+    if args.api_version:
+        classes.configure(version=args.api_version)
+    version = classes.select_project(root)
+    if not classes.is_version_exact():
+        print("No API data for this project's Godot version, so nothing was checked. "
+              "Pass --api-version to check against another version.", file=sys.stderr)
+        exit(0 if args.allow_unknown_version else 2)
+    cache_path = args.cache or _default_cache_path(root, version)
+    cache = {} if args.no_cache else _load_cache(cache_path)
+
+    files = {}
+    jobs = []
+    for path in _find_scripts(root):
+        key = _stat_key(path)
+        cached = cache.get(path)
+        if cached and cached["key"] == key:
+            files[path] = cached
+        else:
+            jobs.append((path, key))
+    cached_count = len(files)
+
+    if jobs:
+        pool = multiprocessing.Pool(args.jobs or None, _init_worker,
+                                   (root, args.api_version))
+        try:
+            for (path, key, diagnostics) in pool.imap_unordered(_analyze_job, jobs, 8):
+                files[path] = {"key": key, "diagnostics": diagnostics}
+        finally:
+            pool.close()
+            pool.join()
+    _save_cache(cache_path, files)
+
+    diagnostics = []
+    for path in sorted(files):
+        diagnostics.extend(files[path]["diagnostics"])
+    if args.format == "json":
+        output = json.dumps(diagnostics, indent=2) + "\n"
+    else:
+        output = _format_text(diagnostics, root)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    else:
+        sys.stdout.write(output)
+
+    elapsed = time.time() - start
+    rate = len(jobs) / elapsed if elapsed > 0 else 0
+    print("Analyzed {} script(s) ({} cached) in {:.2f}s, {:.0f} files/s: "
+          "{} diagnostic(s)".format(len(files), cached_count, elapsed, rate,
+                                   len(diagnostics)), file=sys.stderr)
+    exit(1 if diagnostics else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+# This is a standalone script that measures how long Vim takes to open a
+# GDScript buffer with the plugin, e.g. to check that a change doesn't make
+# the ftplugin slower to load.
+#
+# Usage: python bench_startup.py [options] [path/to/script.gd]
+#
+# Vim is started repeatedly on the script with '--startuptime', once with the
+# Python side loaded eagerly when the ftplugin is sourced
+# ('g:gdscript3_warmup_delay' set to 0, which is how the plugin always worked
+# before), and once with it deferred (the default). For each mode, the median
+# time spent sourcing each of the plugin's files is reported, along with the
+# total time and the plugin's own timings ('g:gdscript3_timings').
+# Without a script, a small one is generated in a temporary project.
+
+import os
+import re
+import json
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+PLUGIN_DIR = os.path.realpath(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                           "..", ".."))
+
+_MODES = [
+    ("eager", 0),
+    ("lazy", None),
+]
+
+# Lines of '--startuptime' output for sourced files:
+# "clock  self+sourced  self: sourcing path".
+_SOURCING_PATTERN = re.compile(r"^\s*[\d.]+\s+([\d.]+)\s+[\d.]+: sourcing (.*)$")
+_CLOCK_PATTERN = re.compile(r"^\s*([\d.]+)\s")
+
+_SAMPLE_SCRIPT = """extends Node2D
+
+signal hit(damage)
+
+const SPEED = 200
+
+var velocity = Vector2()
+
+func _ready():
+    set_process(true)
+
+func _process(delta):
+    position += velocity * delta
+"""
+
+def _make_sample_project(tmp_dir):
+    with open(os.path.join(tmp_dir, "project.godot"), "w") as f:
+        f.write("config_version=3\n")
+    path = os.path.join(tmp_dir, "player.gd")
+    with open(path, "w") as f:
+        f.write(_SAMPLE_SCRIPT)
+    return path
+
+def _get_vim_args(vim, path, log_path, timings_path, warmup_delay):
+    args = [vim]
+    if os.path.basename(vim).startswith("nvim"):
+        args.append("--headless")
+    else:
+        args.append("--not-a-term")
+    args += ["-Nu", "NONE", "-i", "NONE", "--startuptime", log_path]
+    args += ["--cmd", "set rtp^=" + PLUGIN_DIR.replace(" ", "\\ ")]
+    if warmup_delay is not None:
+        args += ["--cmd", "let g:gdscript3_warmup_delay = {}".format(warmup_delay)]
+    args += ["--cmd", "filetype plugin indent on", "--cmd", "syntax on"]
+    args += ["-c", "call writefile([json_encode(get(g:, 'gdscript3_timings', {{}}))], "
+                   "'{}')".format(timings_path.replace("'", "''"))]
+    args += ["-c", "qa!", path]
+    return args
+
+# Run Vim once. Returns a dict mapping what was measured to milliseconds.
+def _run(vim, path, tmp_dir, warmup_delay):
+    log_path = os.path.join(tmp_dir, "startuptime.log")
+    timings_path = os.path.join(tmp_dir, "timings.json")
+    for p in (log_path, timings_path):
+        if os.path.exists(p):
+            os.remove(p)
+    with open(os.devnull, "r+") as devnull:
+        subprocess.call(_get_vim_args(vim, path, log_path, timings_path, warmup_delay),
+                        stdin=devnull, stdout=devnull, stderr=devnull)
+    results = {}
+    with open(log_path, "r") as f:
+        for line in f:
+            m = _SOURCING_PATTERN.match(line)
+            if m:
+                source_path = os.path.realpath(m.group(2).strip())
+                if source_path.startswith(PLUGIN_DIR + os.sep):
+                    name = "sourcing " + os.path.relpath(source_path, PLUGIN_DIR)
+                    results[name] = results.get(name, 0.0) + float(m.group(1))
+                continue
+            # Vim quits before it's done starting, so the last clock is the
+            # time it took to open the script.
+            m = _CLOCK_PATTERN.match(line)
+            if m:
+                results["total"] = float(m.group(1))
+    try:
+        with open(timings_path, "r") as f:
+            for (name, ms) in json.load(f).items():
+                results["g:gdscript3_timings." + name] = float(ms)
+    except (IOError, ValueError):
+        pass
+    return results
+
+def _median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    if len(values) % 2:
+        return values[mid]
+    return (values[mid - 1] + values[mid]) / 2
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure the cost of opening a GDScript buffer.")
+    parser.add_argument("script", nargs="?", help="script to open (default: a generated one)")
+    parser.add_argument("-n", "--runs", type=int, default=20,
+                        help="number of runs per mode (default: 20)")
+    parser.add_argument("--vim", default="vim", help="Vim executable (default: vim)")
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="gdscript3-bench-")
+    try:
+        path = os.path.abspath(args.script) if args.script else _make_sample_project(tmp_dir)
+        all_results = []
+        for (mode, warmup_delay) in _MODES:
+            runs = [_run(args.vim, path, tmp_dir, warmup_delay) for _ in range(args.runs)]
+            names = sorted(set(name for r in runs for name in r))
+            all_results.append((mode, [(name, _median([r.get(name, 0.0) for r in runs]))
+                                       for name in names]))
+    finally:
+        shutil.rmtree(tmp_dir)
+
+    print("Median of {} run(s), in milliseconds, opening '{}':".format(
+          args.runs, args.script or "generated script"))
+    for (mode, results) in all_results:
+        print("\n{}:".format(mode))
+        for (name, ms) in results:
+            print("  {:<48} {:8.2f}".format(name, ms))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,370 @@
+# Script checking for the Syntastic checker.
+#
+# Booting the engine for every check takes seconds, so instead one godot_server
+# process is kept alive per project (see 'checker_server.gd'). Requests are
+# debounced and batched by a worker thread, scripts whose contents haven't
+# changed since their last check aren't sent again, and the engine's output is
+# parsed line by line as it arrives.
+#
+# Checking never blocks Vim for long: if the engine hasn't answered within a
+# short wait, the last results for the script are returned and the check is
+# marked pending, so the caller can poll ('is_pending()') and check again once
+# the engine is done. Failures to start the engine, crashes and timeouts are
+# reported as errors on the first line of the script.
+#
+# Before anything is sent to the engine, a cheap syntax pre-check runs
+# in-process. Obvious mistakes like unbalanced brackets are reported straight
+# away without involving the engine at all.
+
+import os
+import re
+import time
+import shutil
+import atexit
+import hashlib
+import tempfile
+import threading
+import subprocess
+from collections import namedtuple
+
+import index
+
+CheckError = namedtuple("CheckError", "path, line, col, text")
+
+_SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                              "checker_server.gd")
+
+_ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+_ERROR_PATTERN = re.compile(r"SCRIPT ERROR:\s*(?:[\w:]+:\s+)?(.*)")
+_LOCATION_PATTERN = re.compile(r"\s*At:\s*(res://.*):(\d+)")
+_DONE_PATTERN = re.compile(r"gdscript3:done (\d+)")
+
+_BLOCK_PATTERN = re.compile(
+        r"\s*(if|elif|else|for|while|match|func|static\s+func|class)\b")
+
+_BRACKETS = {")": "(", "]": "[", "}": "{"}
+
+_STRING_PATTERNS = {
+    '"': re.compile(r'"(?:\\.|[^"\\])*"$'),
+    "'": re.compile(r"'(?:\\.|[^'\\])*'$"),
+}
+
+# Maps project directories to Checker objects.
+_checkers = {}
+
+# Check a script on disk. Returns (errors, pending), where 'errors' is a list
+# of CheckErrors. Syntax errors found by the pre-check are returned without
+# starting the engine. If the engine doesn't answer within 'wait' seconds,
+# the errors of the last finished check of the script are returned, and
+# 'pending' is True. Checks taking longer than 'timeout' seconds fail.
+def check(path, project_dir, godot_bin, debounce=0.1, wait=0.2, timeout=10):
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except IOError:
+        return ([], False)
+    lines = data.decode("utf-8", "replace").splitlines()
+    errors = precheck(lines, path)
+    if errors or not project_dir:
+        return (errors, False)
+    checker = _checkers.get(project_dir)
+    if not checker or checker.godot_bin != godot_bin:
+        if checker:
+            checker.stop()
+        checker = Checker(project_dir, godot_bin, debounce, timeout)
+        _checkers[project_dir] = checker
+    digest = hashlib.sha1(data).hexdigest()
+    checker.request(path, digest)
+    result = checker.wait(path, digest, wait)
+    if result:
+        return (result, False)
+    return (checker.get_last_errors(path), True)
+
+# Check whether the last check of 'path' is still waiting for the engine.
+def is_pending(path, project_dir):
+    checker = _checkers.get(project_dir)
+    return bool(checker and checker.is_pending(path))
+
+# Look for syntax errors that don't need the engine to be detected:
+# unbalanced brackets, unterminated strings, missing colons after block
+# statements, and unexpected indentation.
+def precheck(lines, path=None):
+    errors = []
+    stack = []
+    in_multiline = False
+    continued = False
+    statement = None
+    # Indent of the last statement, and whether it opened a block.
+    prev_indent = 0
+    opens_block = False
+    for lnum, line in enumerate(lines, 1):
+        starts_statement = not stack and not in_multiline and not continued
+        was_multiline = in_multiline
+        (tokens, in_multiline) = index.tokenize_line(line, in_multiline)
+        code = [t for t in tokens if t[1] != index.COMMENT]
+        continued = line.rstrip().endswith("\\")
+        if starts_statement and code:
+            indent = index._get_indent(line)
+            if indent > prev_indent and not opens_block:
+                errors.append(CheckError(path, lnum, indent + 1, "Unexpected indent"))
+            m = _BLOCK_PATTERN.match(line)
+            statement = (lnum, m.group(1) if m else None, [])
+            prev_indent = indent
+        for (i, (col, kind, text)) in enumerate(code):
+            if kind == index.STRING:
+                # Multi-line strings are only closed by '"""'.
+                if was_multiline and i == 0 or text.startswith('"""'):
+                    continue
+                if not _STRING_PATTERNS[text[0]].match(text):
+                    errors.append(CheckError(path, lnum, col + 1, "Unterminated string"))
+            elif kind == index.OP:
+                if text in "([{":
+                    stack.append((text, lnum, col))
+                elif not stack or stack[-1][0] != _BRACKETS[text]:
+                    errors.append(CheckError(path, lnum, col + 1,
+                                             "Unexpected '{}'".format(text)))
+                else:
+                    stack.pop()
+        if statement and code:
+            statement[2].append(_strip_strings(line, tokens))
+        if statement and not stack and not in_multiline and not continued:
+            if statement[1]:
+                opens_block = _ends_block(statement)
+                if opens_block is None:
+                    errors.append(CheckError(path, statement[0], 1,
+                        "Expected ':' after '{}' statement".format(statement[1])))
+                    opens_block = True
+            elif code:
+                opens_block = _has_colon_at_end(statement[2])
+            statement = None
+    for (text, lnum, col) in stack:
+        errors.append(CheckError(path, lnum, col + 1, "Unclosed '{}'".format(text)))
+    return errors
+
+# Remove the contents of strings and comments from a line, keeping the columns.
+def _strip_strings(line, tokens):
+    chars = list(line)
+    for (col, kind, text) in tokens:
+        if kind == index.STRING or kind == index.COMMENT:
+            for i in range(col, min(col + len(text), len(chars))):
+                chars[i] = " "
+    return "".join(chars)
+
+# Check whether a block statement contains a ':' outside of brackets.
+# Returns True if the block's body starts on the next line, False if it's a
+# one-liner like 'if x: return', or None if there's no colon at all.
+def _ends_block(statement):
+    text = " ".join(statement[2])
+    depth = 0
+    for i, char in enumerate(text):
+        if char in "([{":
+            depth += 1
+        elif char in ")]}":
+            depth -= 1
+        elif char == ":" and depth == 0:
+            return not text[i+1:].strip()
+    return None
+
+def _has_colon_at_end(parts):
+    return " ".join(parts).rstrip().endswith(":")
+
+# A godot_server process checking scripts for one project.
+class Checker:
+    def __init__(self, project_dir, godot_bin, debounce, timeout=10):
+        self.project_dir = project_dir
+        self.godot_bin = godot_bin
+        self.debounce = debounce
+        self.timeout = timeout
+        self._process = None
+        self._queue_dir = None
+        self._seq = 0
+        self._cond = threading.Condition()
+        # Maps paths to the digest of the contents waiting to be checked.
+        self._pending = {}
+        self._last_request = 0
+        # Maps batch numbers to ({path: digest}, process, time sent) for
+        # batches sent to the engine.
+        self._in_flight = {}
+        # Maps paths to (digest, [CheckError], failed) for the latest finished
+        # check. Failed checks hold a single error saying why.
+        self._results = {}
+        # Maps paths to the digest of their latest request.
+        self._requested = {}
+        self._stopped = False
+        worker = threading.Thread(target=self._run_worker)
+        worker.daemon = True
+        worker.start()
+        atexit.register(self.stop)
+
+    # Queue a script to be checked, unless its contents were already checked.
+    def request(self, path, digest):
+        with self._cond:
+            self._requested[path] = digest
+            result = self._results.get(path)
+            if result and result[0] == digest and not result[2]:
+                return
+            if digest in self._in_flight_digests(path):
+                return
+            self._pending[path] = digest
+            self._last_request = time.time()
+            self._cond.notify_all()
+
+    # Wait up to 'timeout' seconds for the result of checking 'path' with
+    # contents 'digest'. Returns the list of CheckErrors, or None if the check
+    # isn't done yet.
+    def wait(self, path, digest, timeout):
+        deadline = time.time() + timeout
+        with self._cond:
+            while True:
+                self._expire()
+                result = self._results.get(path)
+                if result and result[0] == digest:
+                    return result[1]
+                remaining = deadline - time.time()
+                if remaining <= 0 or self._stopped:
+                    return
+                self._cond.wait(remaining)
+
+    # Get the errors of the last finished check of 'path', whatever its
+    # contents were.
+    def get_last_errors(self, path):
+        with self._cond:
+            result = self._results.get(path)
+            return list(result[1]) if result else []
+
+    def is_pending(self, path):
+        with self._cond:
+            if self._stopped:
+                return False
+            self._expire()
+            result = self._results.get(path)
+            return not result or result[0] != self._requested.get(path)
+
+    # Fail the batches the engine didn't answer in time, and restart the
+    # engine for the next ones. Called with the lock held.
+    def _expire(self):
+        now = time.time()
+        for (seq, (batch, process, sent)) in list(self._in_flight.items()):
+            if now - sent > self.timeout:
+                if process and process.poll() is None:
+                    process.terminate()
+                self._fail(seq, "godot_server didn't answer within {}s".format(
+                                    self.timeout))
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._queue_dir:
+            shutil.rmtree(self._queue_dir, ignore_errors=True)
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+
+    def _in_flight_digests(self, path):
+        return [batch[path] for (batch, process, sent) in self._in_flight.values()
+                if path in batch]
+
+    # Send pending requests to the engine once no new ones arrived for
+    # 'debounce' seconds.
+    def _run_worker(self):
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._pending:
+                        remaining = self._last_request + self.debounce - time.time()
+                        if remaining <= 0:
+                            break
+                        self._cond.wait(remaining)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    return
+                batch = self._pending
+                self._pending = {}
+                self._seq += 1
+                seq = self._seq
+            try:
+                process = self._ensure_process()
+                with self._cond:
+                    self._in_flight[seq] = (batch, process, time.time())
+                self._write_request(seq, batch)
+            except (OSError, IOError) as e:
+                with self._cond:
+                    self._in_flight[seq] = (batch, None, time.time())
+                    self._fail(seq, "Couldn't run godot_server '{}': {}".format(
+                                        self.godot_bin, e))
+
+    def _ensure_process(self):
+        if self._process and self._process.poll() is None:
+            return self._process
+        if self._queue_dir:
+            shutil.rmtree(self._queue_dir, ignore_errors=True)
+        self._queue_dir = tempfile.mkdtemp(prefix="gdscript3-")
+        self._process = subprocess.Popen(
+                [self.godot_bin, "--path", self.project_dir,
+                 "-s", _SERVER_SCRIPT, self._queue_dir],
+                stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT)
+        reader = threading.Thread(target=self._run_reader, args=(self._process,))
+        reader.daemon = True
+        reader.start()
+        return self._process
+
+    def _write_request(self, seq, batch):
+        paths = [self._to_res_path(p) for p in batch]
+        tmp_path = os.path.join(self._queue_dir, "{}.tmp".format(seq))
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(paths) + "\n")
+        os.rename(tmp_path, os.path.join(self._queue_dir, "{}.req".format(seq)))
+
+    # Parse the engine's output as it's printed.
+    def _run_reader(self, process):
+        errors = []
+        message = None
+        for raw in iter(process.stdout.readline, b""):
+            line = _ANSI_PATTERN.sub("", raw.decode("utf-8", "replace")).rstrip()
+            m = _ERROR_PATTERN.search(line)
+            if m:
+                message = m.group(1)
+                continue
+            m = _LOCATION_PATTERN.match(line)
+            if m:
+                if message:
+                    path = self._from_res_path(m.group(1))
+                    errors.append(CheckError(path, int(m.group(2)), 0, message))
+                message = None
+                continue
+            m = _DONE_PATTERN.search(line)
+            if m:
+                self._finish(int(m.group(1)), errors)
+                errors = []
+        # The process died, so nothing it was sent will be answered.
+        status = process.wait()
+        with self._cond:
+            for (seq, (batch, p, sent)) in list(self._in_flight.items()):
+                if p is process:
+                    self._fail(seq, "godot_server exited with status {}".format(
+                                        status))
+
+    # Store the results of a batch.
+    def _finish(self, seq, errors):
+        with self._cond:
+            (batch, process, sent) = self._in_flight.pop(seq, ({}, None, 0))
+            for (path, digest) in batch.items():
+                self._results[path] = (digest, [e for e in errors if e.path == path],
+                                       False)
+            self._cond.notify_all()
+
+    # Fail a batch, reporting 'message' on the first line of each of its
+    # scripts. Called with the lock held.
+    def _fail(self, seq, message):
+        (batch, process, sent) = self._in_flight.pop(seq, ({}, None, 0))
+        for (path, digest) in batch.items():
+            self._results[path] = (digest, [CheckError(path, 1, 0, message)], True)
+        self._cond.notify_all()
+
+    def _to_res_path(self, path):
+        return "res://" + os.path.relpath(path, self.project_dir).replace(os.sep, "/")
+
+    def _from_res_path(self, res_path):
+        return os.path.join(self.project_dir, res_path[len("res://"):])
@@ -0,0 +1,58 @@
+# Long-lived script checker, run as 'godot_server --path <project> -s <this file> <queue dir>'.
+#
+# Batches of scripts to check are written to the queue directory as
+# '<seq>.req' files, containing one 'res://' path per line. Each script is
+# reloaded without using the resource cache, so the engine prints the usual
+# "SCRIPT ERROR: ... At: res://file:line" messages for it. After every batch,
+# "gdscript3:done <seq>" is printed to stderr so the client knows where the
+# errors for that batch end.
+#
+# The checker quits when the queue directory is removed.
+extends SceneTree
+
+var queue_dir = null
+var dir = Directory.new()
+
+func _init():
+	var args = OS.get_cmdline_args()
+	if args.size() > 0:
+		queue_dir = args[args.size() - 1]
+	if queue_dir == null or not dir.dir_exists(queue_dir):
+		printerr("gdscript3: missing queue directory")
+		quit()
+
+func _idle(delta):
+	if not dir.dir_exists(queue_dir):
+		quit()
+		return false
+	var seq = _next_request()
+	if seq < 0:
+		OS.delay_msec(20)
+		return false
+	var path = "%s/%d.req" % [queue_dir, seq]
+	var f = File.new()
+	if f.open(path, File.READ) == OK:
+		while not f.eof_reached():
+			var script_path = f.get_line().strip_edges()
+			if script_path != "":
+				ResourceLoader.load(script_path, "", true)
+		f.close()
+	dir.remove(path)
+	printerr("gdscript3:done %d" % seq)
+	return false
+
+# Get the lowest pending request number, or -1 if there are none.
+func _next_request():
+	var lowest = -1
+	if dir.open(queue_dir) != OK:
+		return lowest
+	dir.list_dir_begin(true)
+	var name = dir.get_next()
+	while name != "":
+		if name.ends_with(".req"):
+			var seq = int(name.get_basename())
+			if lowest < 0 or seq < lowest:
+				lowest = seq
+		name = dir.get_next()
+	dir.list_dir_end()
+	return lowest
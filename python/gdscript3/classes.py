@@ -1,27 +1,70 @@
 # Stores built-in class info
 
-from collections import namedtuple
-import vim
+from collections import namedtuple, OrderedDict
+import os
+import re
+import sys
 import json
+import threading
 
 BUILT_IN = 1
 EXTENDABLE = 2
 EXPORTABLE = 3
+NODE = 4
+RESOURCE = 5
 
-_classes = {}
+# Maps class names to their entry in the hierarchy table of '@ClassInfo.json'.
 _class_info = None
-_class_names = None
+# Maps the category flags above (and 0 for all classes) to sorted name lists.
+_categories = None
+# Maps class names to OrderedDicts of their signals, including inherited ones,
+# from '@Signals.json'. Each signal name maps to a tuple of (declaring class
+# name, GodotSignal). Loaded the first time a signal is looked up.
+_signals = None
 
-_global_scope = None
+# Classes that are never evicted from the cache, in addition to the extends
+# chain of the current script.
+_PINNED = ("@GlobalScope", "Object", "Node")
 
-_JSON_DIR = vim.eval("expand('<sfile>:p:h')") + "/../python/gdscript3/json/"
+_JSON_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)), "json") + "/"
+
+# API versions are described by '@Versions.json'. The base version's classes
+# are stored in full in the JSON directory, and every other version has a
+# subdirectory holding only the classes that differ from the base (see
+# 'gen_json.py'), along with its own '@ClassInfo.json'.
+_versions = None
+# The selected API version, and the files in its subdirectory.
+_version = None
+_version_files = set()
+# Maps versions that were selected before to their (files, class info,
+# categories, signals), so switching between projects of different versions
+# doesn't load them again.
+_version_tables = {}
+# A version forced with 'configure()', overriding the project's version.
+_forced_version = None
+# Maps project directories to versions set with 'configure()'. Godot 3.1 and
+# later 3.x versions all write 'config_version=4', so this is the only way to
+# tell e.g. a 3.1 project from a 3.2 one.
+_project_overrides = {}
+# Maps project directories to their API version, and whether it's known to be
+# the project's version rather than a guess.
+_project_versions = {}
+# Whether the selected version is known to be the project's.
+_version_exact = False
+
+_CONFIG_VERSION_PATTERN = re.compile(r"\s*config_version\s*=\s*(\d+)")
 
 GodotMember = namedtuple("GodotMember", "name, type")
 GodotConstant = namedtuple("GodotConstant", "name, value, type")
 GodotMethod = namedtuple("GodotMethod", "name, returns, args, qualifiers")
 GodotMethodArg = namedtuple("GodotMethodArg", "name, type, default")
+GodotSignal = namedtuple("GodotSignal", "name, args")
 
 class GodotClass:
+    __slots__ = ("_name", "_inherits", "_built_in", "_members", "_constants",
+                 "_methods", "_members_lookup", "_constants_lookup",
+                 "_methods_lookup")
+
     def __init__(self, name, inherits, built_in, members, constants, methods):
         self._name = name
         self._inherits = inherits
@@ -30,47 +73,56 @@ class GodotClass:
         self._constants = constants
         self._methods = methods
 
-        self._members_lookup = {}
-        for member in members:
-            self._members_lookup[member.name] = member
-
-        self._constants_lookup = {}
-        for constant in constants:
-            self._constants_lookup[constant.name] = constant
-
-        self._methods_lookup = {}
-        for method in methods:
-            self._methods_lookup[method.name] = method
+        # Lookup tables are built the first time they're needed, since most
+        # classes are only ever iterated over for completion.
+        self._members_lookup = None
+        self._constants_lookup = None
+        self._methods_lookup = None
 
     def get_name(self):
         return self._name
 
+    # The inherited class is stored by name and looked up in the class cache,
+    # so that evicting a class actually frees it. Returns None if it can't be
+    # loaded, e.g. if its file is missing from a generated version.
     def get_inherited_class(self):
-        return self._inherits
+        return get_class(self._inherits)
 
     def is_built_in(self):
         return self._built_in
 
     def get_member(self, name, search_inherited=True, search_global=False):
+        if self._members_lookup is None:
+            self._members_lookup = _make_lookup(self._members)
         member = self._members_lookup.get(name)
-        if not member and search_inherited and self._inherits:
-            member = self._inherits.get_member(name)
+        if not member and search_inherited:
+            parent = self.get_inherited_class()
+            if parent:
+                member = parent.get_member(name)
         if not member and search_global:
             member = get_global_scope().get_member(name)
         return member
 
     def get_constant(self, name, search_inherited=True, search_global=False):
+        if self._constants_lookup is None:
+            self._constants_lookup = _make_lookup(self._constants)
         constant = self._constants_lookup.get(name)
-        if not constant and search_inherited and self._inherits:
-            constant = self._inherits.get_constant(name)
+        if not constant and search_inherited:
+            parent = self.get_inherited_class()
+            if parent:
+                constant = parent.get_constant(name)
         if not constant and search_global:
             constant = get_global_scope().get_constant(name)
         return constant
 
     def get_method(self, name, search_inherited=True, search_global=False):
+        if self._methods_lookup is None:
+            self._methods_lookup = _make_lookup(self._methods)
         method = self._methods_lookup.get(name)
-        if not method and search_inherited and self._inherits:
-            method = self._inherits.get_method(name)
+        if not method and search_inherited:
+            parent = self.get_inherited_class()
+            if parent:
+                method = parent.get_method(name)
         if not method and search_global:
             method = get_global_scope().get_method(name)
         return method
@@ -84,17 +136,312 @@ class GodotClass:
     def iter_methods(self):
         return iter(self._methods)
 
+def _make_lookup(items):
+    lookup = {}
+    for item in items:
+        lookup[item.name] = item
+    return lookup
+
+# Strings and method args are shared between all loaded classes, since the
+# same handful of type names and args (e.g. "int", "delta: float") appear
+# thousands of times across the API.
+_strings = {}
+_args = {}
+_NO_ARGS = ()
+
+def _intern(s):
+    if s is None:
+        return None
+    return _strings.setdefault(s, s)
+
+def _intern_arg(name, type, default):
+    arg = GodotMethodArg(_intern(name), _intern(type), _intern(default))
+    return _args.setdefault(arg, arg)
+
+# LRU cache of loaded classes, bounded by class count and/or approximate size.
+# Classes are keyed by (API version, class name), so projects of different
+# versions share the budget instead of clearing each other's classes.
+# Requests in different threads share the cache, so it's guarded by a lock.
+class _ClassCache:
+    def __init__(self):
+        self._classes = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self.max_classes = 0
+        self.max_bytes = 0
+        # Names of classes never evicted, in any version.
+        self.pinned = set(_PINNED)
+        # Keys of the classes in the current script's extends chain.
+        self.chain = set()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            c = self._classes.get(key)
+            if c:
+                self.hits += 1
+                self._classes.move_to_end(key)
+            else:
+                self.misses += 1
+            return c
+
+    def add(self, key, c):
+        with self._lock:
+            self._classes[key] = c
+            if self.max_bytes:
+                size = _sizeof(c, set(), count_shared=False)
+                self._sizes[key] = size
+                self._bytes += size
+            self.evict()
+
+    # Drop least recently used classes until the cache fits its budget.
+    def evict(self):
+        with self._lock:
+            for key in list(self._classes):
+                if not self._over_budget():
+                    return
+                if key[1] in self.pinned or key in self.chain:
+                    continue
+                del self._classes[key]
+                self._bytes -= self._sizes.pop(key, 0)
+                self.evictions += 1
+
+    def _over_budget(self):
+        return (self.max_classes and len(self._classes) > self.max_classes or
+                self.max_bytes and self._bytes > self.max_bytes)
+
+    def clear(self):
+        with self._lock:
+            self._classes.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def items(self):
+        with self._lock:
+            return list(self._classes.items())
+
+    def stats(self):
+        return {
+            "classes": len(self._classes),
+            "bytes": self._bytes if self.max_bytes else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+_cache = _ClassCache()
+
+# Set the budget of the class cache. A limit of 0 means unlimited.
+# 'max_bytes' is approximate, and doesn't include the shared string tables.
+# If 'version' is given, that API version is used for every project.
+# 'project_versions' maps project directories to the API version to use for
+# them, instead of the one guessed from their 'config_version'.
+def configure(max_classes=0, max_bytes=0, version=None, project_versions=None):
+    global _forced_version
+    _forced_version = version or None
+    if _forced_version:
+        _set_version(_forced_version)
+    if project_versions is not None:
+        _project_overrides.clear()
+        for (project_dir, project_version) in project_versions.items():
+            _project_overrides[_normalize_dir(project_dir)] = project_version
+        _project_versions.clear()
+    _cache.max_classes = max_classes
+    _cache.max_bytes = max_bytes
+    if max_bytes:
+        _cache._bytes = 0
+        for (key, c) in _cache.items():
+            size = _sizeof(c, set(), count_shared=False)
+            _cache._sizes[key] = size
+            _cache._bytes += size
+    _cache.evict()
+
+# Pin the given class and everything it inherits, so the extends chain of the
+# current script stays loaded. Replaces the previously pinned chain.
+def pin_extends_chain(name):
+    version = get_version()
+    _cache.chain = set((version, n) for n in get_ancestors(name))
+    if name:
+        _cache.chain.add((version, name))
+
+def cache_stats():
+    return _cache.stats()
+
+def _load_versions():
+    global _versions
+    if not _versions:
+        try:
+            _versions = json.load(open(_JSON_DIR + "@Versions.json", "r"))
+        except (IOError, ValueError):
+            _versions = {"base": None, "versions": {}}
+    return _versions
+
+def get_versions():
+    return sorted(_load_versions()["versions"], key=_version_key)
+
+def get_version():
+    if not _version:
+        _set_version(_load_versions()["base"])
+    return _version
+
+def _version_key(version):
+    return tuple(int(n) if n.isdigit() else 0 for n in version.split("."))
+
+# Switch to another API version. The tables of the previous version are kept
+# for when it's selected again.
+def _set_version(version):
+    global _version
+    global _version_files
+    global _class_info
+    global _categories
+    global _signals
+    versions = _load_versions()
+    if version not in versions["versions"]:
+        version = versions["base"]
+    if version == _version:
+        return
+    if _version:
+        _version_tables[_version] = (_version_files, _class_info, _categories, _signals)
+    _version = version
+    if version in _version_tables:
+        (_version_files, _class_info, _categories, _signals) = _version_tables[version]
+        return
+    _version_files = set()
+    if version != versions["base"]:
+        try:
+            _version_files = set(os.listdir(_JSON_DIR + version))
+        except OSError:
+            pass
+    _class_info = None
+    _categories = None
+    _signals = None
+
+# Select the API version for the project in 'project_dir'.
+# Unless the project's version was set with 'configure()', the newest version
+# matching the 'config_version' in its 'project.godot' is used, or the base
+# version if there's no match. Returns the selected version.
+def select_project(project_dir):
+    global _version_exact
+    if _forced_version:
+        _version_exact = get_version() == _forced_version
+        return get_version()
+    if project_dir not in _project_versions:
+        override = _project_overrides.get(_normalize_dir(project_dir)) \
+                if project_dir else None
+        if override:
+            _project_versions[project_dir] = (override, True)
+        else:
+            _project_versions[project_dir] = _find_project_version(project_dir)
+    (version, exact) = _project_versions[project_dir]
+    _set_version(version)
+    _version_exact = exact and get_version() == version
+    return get_version()
+
+# Whether the version selected by 'select_project()' is known to be the
+# project's: it was set with 'configure()', or it's the only version matching
+# the project's 'config_version'. Checks that report what's missing from the
+# API should be skipped otherwise, since the project may use another version.
+def is_version_exact():
+    return _version_exact
+
+def _normalize_dir(path):
+    return os.path.realpath(os.path.expanduser(path))
+
+# Returns (version, whether it's the only version matching the project).
+def _find_project_version(project_dir):
+    versions = _load_versions()
+    config_version = None
+    try:
+        with open(os.path.join(project_dir, "project.godot"), "r") as f:
+            for line in f:
+                m = _CONFIG_VERSION_PATTERN.match(line)
+                if m:
+                    config_version = int(m.group(1))
+                    break
+    except (IOError, TypeError):
+        pass
+    matches = [v for (v, n) in versions["versions"].items() if n == config_version]
+    if matches:
+        return (max(matches, key=_version_key), len(matches) == 1)
+    return (versions["base"], False)
+
+# Get the directories holding data for the selected version, most specific first.
+def get_json_dirs():
+    get_version()
+    if _version_files:
+        return ["{}{}/".format(_JSON_DIR, _version), _JSON_DIR]
+    return [_JSON_DIR]
+
+# Get the path of a JSON file for the selected version.
+def _get_path(file_name):
+    if file_name in _version_files:
+        return "{}{}/{}".format(_JSON_DIR, _version, file_name)
+    return _JSON_DIR + file_name
+
 def _load_class_info():
     global _class_info
-    global _class_names
+    global _categories
+    get_version()
     if not _class_info:
-        _class_info = json.load(open(_JSON_DIR + "@ClassInfo.json", "r"))
-        _class_names = set(map(lambda c: c["name"], _class_info))
+        obj = json.load(open(_get_path("@ClassInfo.json"), "r"))
+        _class_info = obj["classes"]
+        # Ancestors are also kept as a set, for constant-time subclass checks.
+        for info in _class_info.values():
+            info["ancestor_set"] = frozenset(info["ancestors"])
+        categories = obj["categories"]
+        _categories = {
+            0: sorted(_class_info),
+            BUILT_IN: categories["built_in"],
+            EXTENDABLE: categories["extendable"],
+            EXPORTABLE: categories["exportable"],
+            NODE: categories["node"],
+            RESOURCE: categories["resource"],
+        }
+
+# Read the JSON for a class in the selected version.
+# Classes that changed since the base version are stored as a delta, which is
+# applied to the base version's class.
+def _read_class(name):
+    file_name = name + ".json"
+    obj = json.load(open(_get_path(file_name), "r"))
+    if obj.get("delta"):
+        base = json.load(open(_JSON_DIR + file_name, "r"))
+        obj = _apply_delta(base, obj)
+    return obj
+
+# Items are replaced by name, so every overload of a method is replaced at once.
+def _apply_delta(base, delta):
+    obj = {
+        "name": base.get("name"),
+        "inherits": delta.get("inherits"),
+        "built_in": delta.get("built_in"),
+    }
+    removed = delta.get("removed", {})
+    for key in ("members", "constants", "methods"):
+        changed = OrderedDict()
+        for item in delta.get(key, []):
+            changed.setdefault(item["name"], []).append(item)
+        dropped = set(removed.get(key, []))
+        items = []
+        for item in base.get(key, []):
+            name = item["name"]
+            if name in changed:
+                items.extend(changed.pop(name))
+                dropped.add(name)
+            elif name not in dropped:
+                items.append(item)
+        for new_items in changed.values():
+            items.extend(new_items)
+        obj[key] = items
+    return obj
 
 def _load_class(name):
-    path = "{}{}.json".format(_JSON_DIR, name)
+    get_version()
     try:
-        obj = json.load(open(path, "r"))
+        obj = _read_class(name)
     except:
         return
 
@@ -103,48 +450,180 @@ def _load_class(name):
     built_in = obj.get("built_in")
 
     def map_member(m):
-        return GodotMember(m["name"], m["type"])
+        return GodotMember(_intern(m["name"]), _intern(m["type"]))
     def map_constant(c):
-        return GodotConstant(c["name"], c["value"], c.get("type"))
+        return GodotConstant(_intern(c["name"]), _intern(c["value"]), _intern(c.get("type")))
     def map_arg(a):
-        return GodotMethodArg(a["name"], a["type"], a.get("default"))
+        return _intern_arg(a["name"], a["type"], a.get("default"))
     def map_method(m):
-        args = list(map(map_arg, m.get("args", [])))
-        return GodotMethod(m["name"], m["returns"], args, m.get("qualifiers"))
+        args = tuple(map(map_arg, m.get("args", _NO_ARGS))) or _NO_ARGS
+        return GodotMethod(_intern(m["name"]), _intern(m["returns"]), args,
+                           _intern(m.get("qualifiers")))
 
-    members = list(map(map_member, obj.get("members", [])))
-    constants = list(map(map_constant, obj.get("constants", [])))
-    methods = list(map(map_method, obj.get("methods", [])))
-    return GodotClass(c_name, get_class(inherits), built_in, members, constants, methods)
+    members = tuple(map(map_member, obj.get("members", [])))
+    constants = tuple(map(map_constant, obj.get("constants", [])))
+    methods = tuple(map(map_method, obj.get("methods", [])))
+    return GodotClass(_intern(c_name), _intern(inherits), bool(built_in),
+                      members, constants, methods)
 
 def get_class(name):
     if not name:
         return
-    c = _classes.get(name)
+    key = (get_version(), name)
+    c = _cache.get(key)
     if not c:
         _load_class_info()
         # Only attempt to load known classes.
-        if not name in _class_names:
+        if not name in _class_info:
             return
         c = _load_class(name)
-        _classes[name] = c
+        if c:
+            _cache.add(key, c)
     return c
 
+# Read the JSON of a class as a dict, for a single pass over every class.
+# Unlike 'get_class', nothing is added to the cache or the string tables.
+# Returns None for unknown classes.
+def read_class(name):
+    get_version()
+    _load_class_info()
+    if not name in _class_info:
+        return
+    try:
+        return _read_class(name)
+    except:
+        return
+
 def get_global_scope():
-    global _global_scope
-    if not _global_scope:
-        _global_scope = _load_class("@GlobalScope")
-    return _global_scope
+    key = (get_version(), "@GlobalScope")
+    c = _cache.get(key)
+    if not c:
+        c = _load_class("@GlobalScope")
+        if c:
+            _cache.add(key, c)
+    return c
+
+# Get the signals of a class, including inherited ones, as an OrderedDict of
+# signal names to (declaring class name, GodotSignal) tuples. Signals are
+# flattened across inheritance by 'gen_json.py', so no class files are loaded.
+def get_signals(name):
+    global _signals
+    get_version()
+    if _signals is None:
+        try:
+            obj = json.load(open(_get_path("@Signals.json"), "r"))
+        except (IOError, ValueError):
+            obj = {}
+        _signals = {}
+        for (c_name, signals) in obj.items():
+            table = OrderedDict()
+            for s in signals:
+                args = tuple(_intern_arg(a["name"], a["type"], None)
+                             for a in s.get("args", _NO_ARGS)) or _NO_ARGS
+                table[_intern(s["name"])] = (_intern(s["class"]),
+                                             GodotSignal(_intern(s["name"]), args))
+            _signals[c_name] = table
+    return _signals.get(name, OrderedDict())
+
+# Get a (declaring class name, GodotSignal) tuple, or None if the class has no
+# such signal.
+def get_signal(name, signal_name):
+    return get_signals(name).get(signal_name)
 
 def iter_class_names(type=0):
     _load_class_info()
-    def filter_fun(c):
-        return (type == 0 or
-                type == BUILT_IN and c.get("built_in") or
-                type == EXTENDABLE and not c.get("built_in") or
-                type == EXPORTABLE and c.get("exportable"))
-    return map(lambda c: c["name"], filter(filter_fun, _class_info))
+    return iter(_categories.get(type, ()))
+
+# The functions below answer hierarchy questions from '@ClassInfo.json',
+# without loading any class files.
+
+def get_parent_name(name):
+    _load_class_info()
+    info = _class_info.get(name)
+    if info:
+        return info.get("parent")
+
+# Get the names of the classes 'name' inherits, nearest first.
+def get_ancestors(name):
+    _load_class_info()
+    info = _class_info.get(name)
+    return info["ancestors"] if info else []
+
+def get_descendants(name):
+    _load_class_info()
+    info = _class_info.get(name)
+    return info["descendants"] if info else []
 
+def get_depth(name):
+    _load_class_info()
+    info = _class_info.get(name)
+    return info["depth"] if info else None
 
+def is_subclass(name, base):
+    if name == base:
+        return True
+    _load_class_info()
+    info = _class_info.get(name)
+    return bool(info) and base in info["ancestor_set"]
+
+def is_in_category(name, type):
+    _load_class_info()
+    info = _class_info.get(name)
+    if not info:
+        return False
+    if type == BUILT_IN:
+        return bool(info.get("built_in"))
+    elif type == EXTENDABLE:
+        return not info.get("built_in")
+    elif type == EXPORTABLE:
+        return bool(info.get("exportable"))
+    elif type == NODE:
+        return is_subclass(name, "Node")
+    elif type == RESOURCE:
+        return is_subclass(name, "Resource")
+    return True
 
+# Report the approximate memory used by loaded classes.
+# Returns a dict with the bytes used by each loaded class under "classes", the
+# bytes used by the shared string and argument tables under "shared", and the
+# sum of both under "total". If 'load_all' is True, every class is loaded first.
+def memory_stats(load_all=False):
+    if load_all:
+        for name in iter_class_names():
+            get_class(name)
+    # Shared objects are counted once, in "shared", rather than per class.
+    seen = set()
+    shared = _sizeof(_strings, seen) + _sizeof(_args, seen)
+    stats = {}
+    for ((version, name), c) in _cache.items():
+        # Classes of other versions than the selected one are "version/name".
+        if version != _version:
+            name = "{}/{}".format(version, name)
+        stats[name] = _sizeof(c, seen)
+    return {
+        "classes": stats,
+        "shared": shared,
+        "total": shared + sum(stats.values()),
+    }
 
+# Get the approximate size of an object and everything it holds.
+# If 'count_shared' is False, objects in the shared tables are skipped.
+def _sizeof(obj, seen, count_shared=True):
+    if id(obj) in seen or obj is None or type(obj) is bool:
+        return 0
+    if not count_shared and (type(obj) is str and _strings.get(obj) is obj or
+                             type(obj) is GodotMethodArg and _args.get(obj) is obj):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if type(obj) is dict:
+        for (key, value) in obj.items():
+            size += _sizeof(key, seen, count_shared)
+            size += _sizeof(value, seen, count_shared)
+    elif isinstance(obj, (tuple, list)):
+        for item in obj:
+            size += _sizeof(item, seen, count_shared)
+    elif type(obj) is GodotClass:
+        for slot in GodotClass.__slots__:
+            size += _sizeof(getattr(obj, slot), seen, count_shared)
+    return size
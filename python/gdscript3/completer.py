@@ -2,28 +2,163 @@
 
 import os
 import re
+import heapq
+import threading
 
 import classes
 import util
 import script
+import index
+import scene
+import docs
 
 # Flags for selecting which built-in items to complete.
 _MEMBERS = 1
 _METHODS = 2
 _CONSTANTS = 4
 
-_completions = None
+# Locality of completion items, from most to least relevant.
+LOCAL = 0
+MEMBER = 1
+INHERITED = 2
+GLOBAL = 3
 
+_max_completions = 100
+
+# Maps names to a counter value of when they were last chosen from the popup.
+# Shared by all requests, so it's guarded by a lock.
+_recent = {}
+_recent_counter = 0
+_recent_lock = threading.Lock()
+
+# The completions of one request. Only the best 'max_items' are kept, in a
+# bounded heap of (negated rank key, completion) pairs. The worst kept item is
+# at the top.
+class Completions:
+    def __init__(self, max_items):
+        self.max_items = max_items
+        self._heap = []
+        self._count = 0
+
+    def add(self, key, completion):
+        self._count += 1
+        # The count keeps ties in the order they were added.
+        item = (key + (-self._count,), completion)
+        if self.max_items <= 0 or len(self._heap) < self.max_items:
+            heapq.heappush(self._heap, item)
+        elif item[0] > self._heap[0][0]:
+            heapq.heapreplace(self._heap, item)
+
+    def get(self):
+        return [c for (key, c) in sorted(self._heap, key=lambda i: i[0], reverse=True)]
+
+def set_max_completions(n):
+    global _max_completions
+    _max_completions = n
+
+# Settings read from 'g:gdscript3_<name>' by every frontend (the omnifunc and
+# the deoplete and ncm2 sources), with their defaults.
+OPTIONS = (
+    ("class_cache_size", 128),
+    ("class_cache_bytes", 0),
+    ("api_version", ""),
+    ("project_api_versions", {}),
+    ("max_completions", 100),
+)
+
+# Apply the settings in 'options', a dict mapping the names in OPTIONS to
+# their values. Missing settings get their default.
+def configure(options):
+    values = dict(OPTIONS)
+    values.update(options)
+    classes.configure(max_classes=int(values["class_cache_size"]),
+                      max_bytes=int(values["class_cache_bytes"]),
+                      version=values["api_version"],
+                      project_versions=values["project_api_versions"])
+    set_max_completions(int(values["max_completions"]))
+
+# Start collecting completions in the active context.
 def clear_completions():
-    global _completions
-    _completions = []
+    util.get_context().completions = Completions(_max_completions)
+
+# Complete at the cursor of the current source. The cursor is expected at the
+# start of the completion base, as it is when Vim calls the omnifunc.
+def complete():
+    clear_completions()
+    classes.select_project(util.get_project_dir())
+    classes.pin_extends_chain(script.get_extended_class())
+
+    line = util.get_line()[0:util.get_cursor_col_num() - 1]
+    syn_attr = util.get_syn_attr()
+    if syn_attr == "gdComment":
+        return
+    elif syn_attr == "gdString":
+        complete_paths()
+        complete_node_paths()
+        complete_signals()
+    elif re.match("(\s*class\s+\w+\s+)?extends\s*", line):
+        complete_class_names(classes.EXTENDABLE)
+    elif re.match("export\(\s*", line):
+        complete_class_names(classes.EXPORTABLE)
+    elif re.match("\s*func", line):
+        complete_method_signatures()
+    elif re.search(r"(?<![\w.])\$[\w/]*$", line):
+        complete_node_paths()
+    elif line and line[-1] == ".":
+        complete_dot()
+    else:
+        complete_script(include_globals=True)
 
+# Complete in a list of lines rather than a Vim buffer, for completion
+# frameworks running outside of Vim's Python. 'line_num' and 'col' give the
+# cursor position (1-based), which may be past the typed base.
+# Returns (start column of the base, completions), with a 0-based column.
+def complete_lines(lines, path, line_num, col, ignore_case=False, bufnr=-1,
+                   changedtick=None):
+    source = util.LinesSource(lines, path, bufnr, changedtick)
+    with util.using_context(util.Context(source, (line_num, col))):
+        # Like 'GDScriptComplete', treat '-' as part of the word in strings.
+        line = util.get_line(line_num)[0:col - 1]
+        pattern = r"[-\w]*$" if util.get_syn_attr() == "gdString" else r"\w*$"
+        start = re.search(pattern, line).start()
+        util.set_context(util.Context(source, (line_num, start + 1), line[start:],
+                                      ignore_case))
+        complete()
+        return (start, get_completions())
+
+# Get the kept completions of the active context, best first.
 def get_completions():
-    return _completions
+    completions = util.get_context().completions
+    return completions.get() if completions else []
+
+# Rank a completion and keep it if it's among the best '_max_completions'.
+# Items are ranked by locality, then by whether they match the base
+# case-sensitively, then by how recently they were used. Ties keep the order
+# in which they were added.
+def append_completion(completion, locality=GLOBAL):
+    if not completion:
+        return
+    context = util.get_context()
+    if context.completions is None:
+        context.completions = Completions(_max_completions)
+    word = completion["word"]
+    base = context.get_base()
+    exact = 0 if not base or word.startswith(base) else 1
+    recency = _recent.get(_get_name(word), 0)
+    context.completions.add((-locality, -exact, recency), completion)
+
+# Remember that a completion was chosen, so it ranks higher next time.
+def record_use(word):
+    global _recent_counter
+    name = _get_name(word)
+    if name:
+        with _recent_lock:
+            _recent_counter += 1
+            _recent[name] = _recent_counter
 
-def append_completion(completion):
-    if completion:
-        _completions.append(completion)
+def _get_name(word):
+    m = re.match("[-\w]*", word)
+    return m.group(0)
 
 def complete_paths():
     line = util.get_line()[0:util.get_cursor_col_num() - 1]
@@ -47,25 +182,142 @@ def complete_paths():
                 else:
                     files.append(entry)
         for d in sorted(dirs):
-            append_completion(d)
+            append_completion(_make_completion(d))
         for f in sorted(files):
-            append_completion(f)
+            append_completion(_make_completion(f))
+
+# Complete node names in paths like '$Body/' or 'get_node("Body/'.
+def complete_node_paths():
+    line = util.get_line()[0:util.get_cursor_col_num() - 1]
+    m = re.search(r'(?:(?<![\w.])\$|\bget_node\(\s*)"?((?:[^"/]+/)*)$', line)
+    if not m:
+        return
+    for (name, node_type) in scene.get_child_nodes(m.group(1).rstrip("/")):
+        d = build_completion(name)
+        if d:
+            if node_type:
+                d["kind"] = node_type
+            append_completion(d, MEMBER)
+
+# Methods taking a signal name as their first argument.
+_SIGNAL_METHODS = ("connect", "disconnect", "emit_signal", "is_connected")
+
+# Matches the string argument of 'obj.connect("', 'emit_signal("' and the like,
+# or of 'yield(obj, "'. The object is whatever ends before the '.' or ','.
+_SIGNAL_ARG_PATTERN = re.compile(
+        r'(?:(?<![\w.])|(\.))(?:{})\(\s*"\w*$|\byield\((.+?)\s*,\s*"\w*$'.format(
+            "|".join(_SIGNAL_METHODS)))
+
+# Complete signal names in the string argument of signal methods and 'yield()'.
+def complete_signals():
+    line_num = util.get_cursor_line_num()
+    line = util.get_line()[0:util.get_cursor_col_num() - 1]
+    m = _SIGNAL_ARG_PATTERN.search(line)
+    if not m:
+        return
+    if m.group(1):
+        end_col = m.start(1)
+    elif m.group(2):
+        end_col = m.end(2)
+    else:
+        end_col = None
 
-def complete_class_names(type=0):
+    # Without an object, or with 'self', the signals are the script's own.
+    c_name = None
+    is_self = True
+    if end_col is not None:
+        chain = script.get_token_chain(line, line_num, end_col)
+        if not chain:
+            return
+        token = chain[-1]
+        token_type = type(token)
+        if token_type is script.VariableToken and token.name != "self":
+            c_name = token.type
+            is_self = False
+        elif token_type is script.MethodToken:
+            c_name = token.returns
+            is_self = False
+    if is_self:
+        c_name = script.get_extended_class(line_num)
+        _add_script_signals(line_num)
+
+    for (name, (decl_c_name, signal)) in classes.get_signals(c_name).items():
+        d = build_completion(signal, decl_c_name)
+        if d:
+            locality = INHERITED if is_self or decl_c_name != c_name else MEMBER
+            append_completion(d, locality)
+
+# Add the signals declared in the class containing 'line_num'.
+def _add_script_signals(line_num):
+    buffer_index = index.get_buffer_index()
+    scope = buffer_index.get_scope(line_num)
+    while scope and buffer_index.scope_kinds.get(scope) == "func":
+        scope = scope[:-1]
+    for symbol in buffer_index.decls:
+        if symbol.kind != "signal" or symbol.scope != scope:
+            continue
+        decl = script.parse_decl(symbol.line, util.get_line(symbol.line),
+                                 script.SIGNAL_DECLS)
+        append_completion(build_completion(decl), MEMBER)
+
+def complete_class_names(type=0, locality=GLOBAL):
     for name in classes.iter_class_names(type):
-        append_completion(build_completion(name))
+        d = build_completion(name)
+        if d:
+            d["user_data"] = docs.make_key(name)
+            append_completion(d, locality)
 
+# Complete signatures of inherited methods after 'func'.
+# Methods already defined in the current class are left out.
 def complete_method_signatures():
-    c = classes.get_class(script.get_extended_class())
+    buffer_index = index.get_buffer_index()
+    scope = buffer_index.get_scope(util.get_cursor_line_num())
+    while scope and buffer_index.scope_kinds.get(scope) == "func":
+        scope = scope[:-1]
+    defined = set(d.name for d in buffer_index.decls
+                  if d.kind == "func" and d.scope == scope)
+
+    for (name, template) in _get_override_catalog(script.get_extended_class()):
+        if name in defined or not util.filter(name):
+            continue
+        d = dict(template)
+        if util.get_ignore_case():
+            d["icase"] = 1
+        append_completion(d, MEMBER)
+
+# Override catalogs, keyed by API version and class name.
+_override_catalogs = {}
+
+# Get a list of (name, completion) pairs for every method that can be
+# overridden in a class extending 'c_name'. Methods shadowed further down the
+# extends chain are only listed once, and virtual callbacks like '_ready()'
+# come first. The list is built once per class.
+def _get_override_catalog(c_name):
+    key = (classes.get_version(), c_name)
+    catalog = _override_catalogs.get(key)
+    if catalog is not None:
+        return catalog
+    virtual = []
+    other = []
+    seen = set()
+    c = classes.get_class(c_name)
     while c:
         for method in c.iter_methods():
-            d = build_completion(method, c.get_name())
-            if not d:
+            if method.name in seen:
                 continue
+            seen.add(method.name)
+            d = _make_completion(method, c.get_name())
             mapped_args = map(lambda a: a.name, method.args)
             d["word"] = "{}({}):".format(method.name, ", ".join(mapped_args))
-            append_completion(d)
+            if method.qualifiers and "virtual" in method.qualifiers:
+                virtual.append((method.name, d))
+            else:
+                other.append((method.name, d))
         c = c.get_inherited_class()
+    catalog = virtual + other
+    if c_name:
+        _override_catalogs[key] = catalog
+    return catalog
 
 def complete_dot():
     line_num = util.get_cursor_line_num()
@@ -84,11 +336,11 @@ def complete_dot():
                 # Manually add an entry for 'new()' for core types.
                 if not c.is_built_in():
                     new_func = classes.GodotMethod("new", c.get_name(), [], None)
-                    append_completion(build_completion(new_func, c.get_name()))
+                    append_completion(build_completion(new_func, c.get_name()), MEMBER)
                 _add_class_items(c, _CONSTANTS)
             else:
                 for decl in script.iter_static_decls(last_token.line, script.ANY_DECLS):
-                    append_completion(build_completion(decl))
+                    append_completion(build_completion(decl), MEMBER)
             return
 
         # Treat 'self' like we're accessing script variables, but exclude globals.
@@ -98,10 +350,8 @@ def complete_dot():
 
         # Complete enum values.
         if last_token_type is script.EnumToken:
-            values = script.get_enum_values(last_token.line)
-            if values:
-                for value in values:
-                    append_completion(build_completion(value))
+            for value in index.get_buffer_index().get_enum_values(last_token.line):
+                append_completion(build_completion(value), MEMBER)
             return
 
         c_name = None
@@ -126,47 +376,61 @@ def complete_script(include_globals):
         if decl_type == script.ClassDecl:
             down_search_start = decl.line
         elif decl_type != script.FuncDecl:
-            append_completion(build_completion(decl))
+            append_completion(build_completion(decl), LOCAL)
     for decl in script.iter_decls(down_search_start, direction=1):
-        append_completion(build_completion(decl))
+        append_completion(build_completion(decl), MEMBER)
 
     # Complete extended class.
     c = classes.get_class(script.get_extended_class())
-    _add_class_items(c)
+    _add_class_items(c, locality=INHERITED)
 
     # Complete global scope.
     if include_globals:
         complete_class_names(classes.EXTENDABLE)
-        _add_class_items(classes.get_global_scope())
+        _add_class_items(classes.get_global_scope(), locality=GLOBAL)
 
 # Recursively add class items.
-def _add_class_items(c, flags=None):
+# Items of 'c' itself get 'locality', and items of inherited classes are
+# ranked as INHERITED.
+def _add_class_items(c, flags=None, locality=MEMBER):
     if not flags:
         flags = _MEMBERS | _METHODS | _CONSTANTS
     while c:
         c_name = c.get_name()
         if flags & _MEMBERS:
             for member in c.iter_members():
-                append_completion(build_completion(member, c_name))
+                append_completion(build_completion(member, c_name), locality)
         if flags & _METHODS:
             for method in c.iter_methods():
-                append_completion(build_completion(method, c_name))
+                append_completion(build_completion(method, c_name), locality)
         if flags & _CONSTANTS:
             for constant in c.iter_constants():
-                append_completion(build_completion(constant, c_name))
+                append_completion(build_completion(constant, c_name), locality)
         c = c.get_inherited_class()
+        locality = max(locality, INHERITED)
 
 # Generic function for building completion dicts.
 def build_completion(item, c_name=None):
+    if type(item) is str:
+        name = item
+    else:
+        name = item.name
+    if not name or not util.filter(name):
+        return
+    d = _make_completion(item, c_name)
+    if not d:
+        return
+    if util.get_ignore_case():
+        d["icase"] = 1
+    return d
+
+# Build a completion dict without filtering it against the completion base.
+def _make_completion(item, c_name=None):
     t = type(item)
     d = {}
     if t is str:
-        if util.filter(item):
-            d["word"] = item
+        d["word"] = item
     elif item.name:
-        if not util.filter(item.name):
-            return
-
         # Built-in
         if t is classes.GodotMember:
             d["word"] = item.name
@@ -218,9 +482,25 @@ def build_completion(item, c_name=None):
         elif t is script.ClassDecl:
             d["word"] = item.name
             d["kind"] = "class"
+
+        # Signals
+        elif t is classes.GodotSignal:
+            d["word"] = item.name
+            args = ", ".join("{} {}".format(a.type, a.name) for a in item.args)
+            if c_name:
+                d["abbr"] = "{}.{}({})".format(c_name, item.name, args)
+            else:
+                d["abbr"] = "{}({})".format(item.name, args)
+            d["kind"] = "signal"
+        elif t is script.SignalDecl:
+            d["word"] = item.name
+            d["abbr"] = "{}({})".format(item.name, ", ".join(item.args))
+            d["kind"] = "signal"
     if not d:
         return
+    # Docs of built-in items are looked up from this when they're selected.
+    if t is classes.GodotMember or t is classes.GodotConstant or \
+            t is classes.GodotMethod or t is classes.GodotSignal:
+        d["user_data"] = docs.make_key(c_name, item.name)
     d["dup"] = 1
-    if util.get_ignore_case():
-        d["icase"] = 1
     return d
@@ -0,0 +1,91 @@
+# Descriptions of Godot classes and their members, methods and constants.
+#
+# Descriptions are kept out of the class JSON so they cost nothing while
+# completing. 'gen_json.py' writes them to '@Docs.bin' as one zlib-compressed
+# JSON object per class, with each block's offset and length listed in
+# '@DocsIndex.json'. Nothing is read until a description is requested, and then
+# only the block of the requested class is decompressed.
+
+import json
+import zlib
+
+import classes
+
+# Maps data directories to their docs index, or None if they have no docs.
+_indexes = {}
+# The most recently read block, as (path, offset, {name: description}).
+# Consecutive lookups usually hit the same class, e.g. when moving through
+# completions.
+_last_block = None
+
+# Get the key identifying the docs of an item, for completion 'user_data'.
+# Items of the global scope are stored under '@GlobalScope'.
+def make_key(c_name, name=None):
+    return "{}.{}".format(c_name or "@GlobalScope", name or "")
+
+# Get the description for a key made by 'make_key()'.
+def get_doc_by_key(key):
+    (c_name, _, name) = key.partition(".")
+    return get_doc(c_name, name)
+
+# Get the description of an item in a class, or of the class itself if 'name'
+# is None. Returns None if there's no description.
+def get_doc(c_name, name=None):
+    c_name = c_name or "@GlobalScope"
+    for data_dir in classes.get_json_dirs():
+        index = _get_index(data_dir)
+        if index and c_name in index:
+            (offset, length) = index[c_name]
+            block = _read_block(data_dir + "@Docs.bin", offset, length)
+            return block.get(name or "")
+
+def _get_index(data_dir):
+    if data_dir not in _indexes:
+        try:
+            _indexes[data_dir] = json.load(open(data_dir + "@DocsIndex.json", "r"))
+        except (IOError, ValueError):
+            _indexes[data_dir] = None
+    return _indexes[data_dir]
+
+def _read_block(path, offset, length):
+    global _last_block
+    if _last_block and _last_block[0] == path and _last_block[1] == offset:
+        return _last_block[2]
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = zlib.decompress(f.read(length))
+        block = json.loads(data.decode("utf-8"))
+    except (IOError, ValueError, zlib.error):
+        block = {}
+    _last_block = (path, offset, block)
+    return block
+
+# Find the class that declares 'name', searching 'c' and the classes it
+# inherits, then the global scope. Returns (class name, item) or None.
+def find_declaring_class(c, name):
+    while c:
+        item = c.get_method(name, search_inherited=False) or \
+               c.get_member(name, search_inherited=False) or \
+               c.get_constant(name, search_inherited=False)
+        if item:
+            return (c.get_name(), item)
+        c = c.get_inherited_class()
+    global_scope = classes.get_global_scope()
+    item = global_scope.get_method(name, search_inherited=False) or \
+           global_scope.get_member(name, search_inherited=False) or \
+           global_scope.get_constant(name, search_inherited=False)
+    if item:
+        return (None, item)
+
+# Describe an item as a one-line signature, e.g. 'Vector2 Vector2.normalized()'.
+def format_signature(item, c_name=None):
+    prefix = "{}.".format(c_name) if c_name else ""
+    t = type(item)
+    if t is classes.GodotMethod:
+        args = ", ".join("{} {}".format(a.type, a.name) for a in item.args)
+        return "{} {}{}({})".format(item.returns, prefix, item.name, args)
+    elif t is classes.GodotMember:
+        return "{} {}{}".format(item.type, prefix, item.name)
+    elif t is classes.GodotConstant:
+        return "{}{} = {}".format(prefix, item.name, item.value)
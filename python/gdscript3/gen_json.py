@@ -12,52 +12,150 @@
 # Passing the wrong directory shouldn't cause any damage, but you should
 # really double-check the path anyway just in case.
 #
+# Several engine versions can be converted at once by passing one docs
+# directory per version, base version first. The base version is written in
+# full to the JSON directory. Every other version gets a subdirectory named
+# after it, holding its '@ClassInfo.json' plus only the classes that differ
+# from the base, stored as deltas. The versions and the 'config_version' of
+# their projects are listed in '@Versions.json'.
+#
+# Signals are written to '@Signals.json', flattened across inheritance, so
+# every signal a class has can be found with a single lookup. Versions whose
+# signals differ from the base get a full copy of the file.
+#
+# Names of classes, global constants and global functions are also written as
+# 'syn keyword' rules to '@Syntax.vim', which 'syntax/gdscript3.vim' sources
+# for the project's version. Run with '--syntax' to regenerate only these from
+# the JSON files, e.g. after editing them by hand.
+#
 # This script only needs to be run when new Godot types are added.
 # The resulting JSON files are checked into version control for simplicity's sake.
 
 import os
+import re
 import sys
 import json
+import zlib
+import shutil
 import xml.etree.cElementTree as ET
 
-if len(sys.argv) != 2:
-    print("Usage: python gen_json.py [path/to/docs]")
-    exit()
-
-DOCS_DIR = sys.argv[1]
-if not DOCS_DIR.endswith("/"):
-    DOCS_DIR += "/"
-
-if not os.path.isdir(DOCS_DIR):
-    print("'{}' is not a valid directory".format(DOCS_DIR))
-    exit()
-
 SCRIPT_DIR = os.path.dirname(os.path.realpath(__file__)) + "/"
 JSON_DIR = SCRIPT_DIR + "json/"
 
 classes = []
 class_info = []
 constructors = []
+# Maps class names to {item name: description}. The class's own description is
+# stored under "".
+descriptions = {}
 
 def dump(obj, path):
     out = open(JSON_DIR + path, "w")
     json.dump(obj, out, indent=2, separators=(",", ":"))
 
+# Projects made with Godot 3.0 have 'config_version=3', later 3.x versions
+# have 'config_version=4'. Since 3.1 and 3.2 projects can't be told apart,
+# the newest of them is used for 'config_version=4' unless the project's
+# version is set with 'g:gdscript3_project_api_versions'.
+def get_config_version(version):
+    numbers = tuple(int(n) for n in version.split(".")[:2] if n.isdigit())
+    return 3 if numbers <= (3, 0) else 4
+
+# Write descriptions to '@Docs.bin', one zlib-compressed JSON object per class,
+# and their offsets and lengths to '@DocsIndex.json'.
+def dump_docs(docs, prefix=""):
+    offsets = {}
+    with open(JSON_DIR + prefix + "@Docs.bin", "wb") as out:
+        for name in sorted(docs):
+            data = json.dumps(docs[name], sort_keys=True, separators=(",", ":"))
+            block = zlib.compress(data.encode("utf-8"), 9)
+            offsets[name] = [out.tell(), len(block)]
+            out.write(block)
+    dump(offsets, prefix + "@DocsIndex.json")
+
+# Convert the markup in a description to plain text.
+def clean_description(text):
+    if not text:
+        return ""
+    lines = [line.strip() for line in text.strip().splitlines()]
+    text = "\n".join(lines)
+    text = re.sub(r"\[/?(code|codeblock|b|i|u|center)\]", "", text)
+    text = re.sub(r"\[(?:method|member|signal|enum|constant) ([\w.@]+)\]", r"\1", text)
+    text = re.sub(r"\[(\w+)\]", r"\1", text)
+    return text.strip()
+
+# Words that 'syn keyword' would take as arguments rather than keywords.
+_SYNTAX_ARGUMENTS = set(["contained", "containedin", "nextgroup", "transparent",
+    "skipwhite", "skipnl", "skipempty", "conceal", "cchar", "fold", "display",
+    "extend", "oneline", "contains", "concealends", "excludenl", "keepend"])
+
+# Build the contents of '@Syntax.vim' from class names and the global scope.
+# Singletons like 'OS' are global members, and are highlighted as classes.
+def build_syntax(version, class_names, global_scope):
+    class_names = set(n for n in class_names if not n.startswith("@"))
+    class_names.update(m["name"] for m in global_scope.get("members", []))
+    constants = set(c["name"] for c in global_scope.get("constants", []))
+    functions = set(m["name"] for m in global_scope.get("methods", []))
+    # Constructors are global functions named after their class.
+    functions -= class_names
+    lines = ['" Godot {} API identifiers, generated by gen_json.py.'.format(version)]
+    for (group, names) in (("gdClass", class_names),
+                           ("gdConstant", constants),
+                           ("gdGlobalFunction", functions)):
+        names = sorted(n for n in names if re.match(r"[A-Za-z_]\w*$", n) and
+                       n not in _SYNTAX_ARGUMENTS)
+        line = "syn keyword " + group
+        for name in names:
+            if len(line) + len(name) >= 80:
+                lines.append(line)
+                line = "syn keyword " + group
+            line += " " + name
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+def dump_syntax(text, path):
+    with open(JSON_DIR + path, "w") as out:
+        out.write(text)
+
+# Regenerate '@Syntax.vim' for every version from the JSON files.
+def regenerate_syntax():
+    import classes
+    base_text = None
+    versions = json.load(open(JSON_DIR + "@Versions.json", "r"))
+    base = versions["base"]
+    for version in [base] + [v for v in versions["versions"] if v != base]:
+        classes.configure(version=version)
+        text = build_syntax(version, list(classes.iter_class_names()),
+                            classes._read_class("@GlobalScope"))
+        if version == base:
+            base_text = text
+            dump_syntax(text, "@Syntax.vim")
+        elif text.split("\n", 1)[1] != base_text.split("\n", 1)[1]:
+            dump_syntax(text, version + "/@Syntax.vim")
+
 def get_class_info(c):
     for info in class_info:
         if info["name"] == c["name"]:
             return info
 
 def xml_to_json(path):
-    c = {"members": [], "constants": [], "methods": []}
+    c = {"members": [], "constants": [], "methods": [], "signals": []}
     info = {}
+    docs = {}
+    tags = []
     current_method = None
+    current_signal = None
     for event, elem in ET.iterparse(path, events=("start", "end")):
         attrib = elem.attrib
         tag = elem.tag
         if event == "start":
+            tags.append(tag)
             if tag == "class":
                 c["name"] = attrib["name"]
+                # '@GDScript' is merged into '@GlobalScope', so its docs are too.
+                doc_name = "@GlobalScope" if attrib["name"].startswith("@") else attrib["name"]
+                docs = descriptions.setdefault(doc_name, {})
+                c["version"] = attrib.get("version")
                 c["inherits"] = attrib.get("inherits")
                 info["name"] = attrib["name"]
                 if attrib.get("category") == "Built-In Types":
@@ -85,7 +183,14 @@ def xml_to_json(path):
                 else:
                     c["methods"].append(method)
                 current_method = method
+            elif tag == "signal":
+                current_signal = {"name": attrib["name"]}
+                c["signals"].append(current_signal)
             elif tag == "argument":
+                if current_signal:
+                    arg = {"name": attrib["name"], "type": attrib["type"]}
+                    current_signal.setdefault("args", []).append(arg)
+                    continue
                 if not current_method:
                     continue
                 arg = {}
@@ -100,8 +205,35 @@ def xml_to_json(path):
                 if not current_method:
                     continue
                 current_method["returns"] = attrib.get("type", "void")
-        elif event == "end" and tag == "method":
-            current_method = None
+        elif event == "end":
+            tags.pop()
+            parent = tags[-1] if tags else None
+            if tag == "method":
+                current_method = None
+            elif tag == "signal":
+                current_signal = None
+            elif tag == "description" and parent == "method" and current_method:
+                text = clean_description(elem.text)
+                if not text:
+                    pass
+                elif current_method["name"] == c["name"]:
+                    # Constructors are global functions.
+                    descriptions.setdefault("@GlobalScope", {}).setdefault(c["name"], text)
+                else:
+                    docs.setdefault(current_method["name"], text)
+            elif tag == "description" and parent == "signal" and current_signal:
+                text = clean_description(elem.text)
+                if text:
+                    docs.setdefault(current_signal["name"], text)
+            elif tag in ("member", "constant") and parent in ("members", "constants"):
+                text = clean_description(elem.text)
+                if text:
+                    docs.setdefault(attrib["name"], text)
+            elif parent == "class" and c["name"] == doc_name and (tag == "description" or
+                    tag == "brief_description" and not docs.get("")):
+                text = clean_description(elem.text)
+                if text:
+                    docs[""] = text
     return (c, info)
 
 # Built-in types and types inherited from Resource are exportable.
@@ -115,40 +247,215 @@ def is_exportable(c):
                 return is_exportable(inherited[0])
     return False
 
-# Clear json directory
-for f in os.listdir(JSON_DIR):
-    os.remove(JSON_DIR + f)
-
-# Gather classes.
-for f in os.listdir(DOCS_DIR):
-    if f.endswith(".xml") and not f.startswith("@"):
-        path = DOCS_DIR + f
-        (c, info) = xml_to_json(path)
-        classes.append(c)
-        class_info.append(info)
-
-classes.sort(key=lambda c: c["name"])
-class_info.sort(key=lambda c: c["name"])
-
-# Combine global scope items into a single "class".
-global_scope = xml_to_json(DOCS_DIR + "@GlobalScope.xml")[0]
-gdscript = xml_to_json(DOCS_DIR + "@GDScript.xml")[0]
-global_scope["members"].extend(gdscript["members"])
-global_scope["constants"].extend(gdscript["constants"])
-global_scope["methods"].extend(gdscript["methods"])
-global_scope["methods"].extend(constructors)
-global_scope["methods"].sort(key=lambda m: m["name"])
-global_scope["name"] = None
-
-# Gather extra class info
-for c in classes:
-    if is_exportable(c):
-        get_class_info(c)["exportable"] = True
-
-# Write JSON to files
-dump(global_scope, "@GlobalScope.json")
-dump(class_info, "@ClassInfo.json")
-for c in classes:
-    out = open(JSON_DIR + c["name"] + ".json", "w")
-    dump(c, c["name"] + ".json")
+# Build the contents of '@ClassInfo.json' from the gathered classes.
+#
+# For every class, the table stores its parent, its depth in the hierarchy, and
+# lists of its ancestors (nearest first) and descendants, so subclass queries
+# don't require loading any class files. Name lists for each category are
+# sorted here, so they don't have to be filtered when completing.
+def build_class_info(classes, class_info):
+    parents = {}
+    for c in classes:
+        parents[c["name"]] = c.get("inherits")
+
+    table = {}
+    for info in class_info:
+        name = info["name"]
+        entry = {}
+        for (key, value) in info.items():
+            if key != "name":
+                entry[key] = value
+        ancestors = []
+        parent = parents.get(name)
+        while parent:
+            ancestors.append(parent)
+            parent = parents.get(parent)
+        if ancestors:
+            entry["parent"] = ancestors[0]
+        entry["depth"] = len(ancestors)
+        entry["ancestors"] = ancestors
+        entry["descendants"] = []
+        table[name] = entry
+    for (name, entry) in table.items():
+        for ancestor in entry["ancestors"]:
+            if ancestor in table:
+                table[ancestor]["descendants"].append(name)
+
+    names = sorted(table)
+    for name in names:
+        table[name]["descendants"].sort()
+    def derives(name, base):
+        return name == base or base in table[name]["ancestors"]
+    categories = {
+        "built_in": [n for n in names if table[n].get("built_in")],
+        "extendable": [n for n in names if not table[n].get("built_in")],
+        "exportable": [n for n in names if table[n].get("exportable")],
+        "node": [n for n in names if derives(n, "Node")],
+        "resource": [n for n in names if derives(n, "Resource")],
+    }
+    return {"classes": table, "categories": categories}
+
+# Build the contents of '@Signals.json'. Maps every class to a list of its
+# signals followed by the inherited ones, nearest first, each with the name of
+# the class that declares it. 'signals' maps class names to their own signals.
+def build_signals(classes, signals):
+    parents = {}
+    for c in classes:
+        parents[c["name"]] = c.get("inherits")
+    table = {}
+    for c in classes:
+        flattened = []
+        seen = set()
+        name = c["name"]
+        while name:
+            for signal in signals.get(name, []):
+                if signal["name"] not in seen:
+                    seen.add(signal["name"])
+                    flattened.append(dict(signal, **{"class": name}))
+            name = parents.get(name)
+        if flattened:
+            table[c["name"]] = flattened
+    return table
+
+# Convert the docs in 'docs_dir'.
+# Returns (version, global scope, classes, class info, signals, descriptions).
+def gather(docs_dir):
+    del classes[:]
+    del class_info[:]
+    del constructors[:]
+    descriptions.clear()
+    signals = {}
+
+    # Gather classes.
+    for f in os.listdir(docs_dir):
+        if f.endswith(".xml") and not f.startswith("@"):
+            path = docs_dir + f
+            (c, info) = xml_to_json(path)
+            c.pop("version")
+            signals[c["name"]] = c.pop("signals")
+            classes.append(c)
+            class_info.append(info)
+
+    classes.sort(key=lambda c: c["name"])
+    class_info.sort(key=lambda c: c["name"])
+
+    # Combine global scope items into a single "class".
+    global_scope = xml_to_json(docs_dir + "@GlobalScope.xml")[0]
+    gdscript = xml_to_json(docs_dir + "@GDScript.xml")[0]
+    global_scope["members"].extend(gdscript["members"])
+    global_scope["constants"].extend(gdscript["constants"])
+    global_scope["methods"].extend(gdscript["methods"])
+    global_scope["methods"].extend(constructors)
+    global_scope["methods"].sort(key=lambda m: m["name"])
+    global_scope["name"] = None
+    global_scope.pop("signals")
+    # Fall back to the directory name for docs without version attributes.
+    version = global_scope.pop("version") or os.path.basename(docs_dir.rstrip("/"))
+    gdscript.pop("version")
+
+    # Gather extra class info
+    for c in classes:
+        if is_exportable(c):
+            get_class_info(c)["exportable"] = True
+
+    return (version, global_scope, list(classes), list(class_info),
+            build_signals(classes, signals), dict(descriptions))
+
+# Get the changes to a class since the base version, or None if it's unchanged.
+# Members, constants and methods are compared by name, so all overloads of a
+# method are stored together when any of them changes.
+def diff_class(base, c):
+    delta = {"delta": True, "inherits": c.get("inherits")}
+    if c.get("built_in"):
+        delta["built_in"] = True
+    changed = base.get("inherits") != c.get("inherits") or \
+              base.get("built_in") != c.get("built_in")
+    removed = {}
+    for key in ("members", "constants", "methods"):
+        base_items = group_by_name(base.get(key, []))
+        items = group_by_name(c.get(key, []))
+        delta[key] = [item for (name, group) in items.items()
+                      if base_items.get(name) != group for item in group]
+        removed[key] = [name for name in base_items if name not in items]
+        changed = changed or delta[key] or removed[key]
+    if not changed:
+        return
+    delta["removed"] = removed
+    return delta
+
+def group_by_name(items):
+    groups = {}
+    for item in items:
+        groups.setdefault(item["name"], []).append(item)
+    return groups
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python gen_json.py [path/to/docs] [path/to/newer/docs]...")
+        print("       python gen_json.py --syntax")
+        exit()
+    if sys.argv[1] == "--syntax":
+        regenerate_syntax()
+        exit()
+
+    docs_dirs = []
+    for docs_dir in sys.argv[1:]:
+        if not docs_dir.endswith("/"):
+            docs_dir += "/"
+        if not os.path.isdir(docs_dir):
+            print("'{}' is not a valid directory".format(docs_dir))
+            exit()
+        docs_dirs.append(docs_dir)
+
+    # Clear json directory
+    for f in os.listdir(JSON_DIR):
+        if os.path.isdir(JSON_DIR + f):
+            shutil.rmtree(JSON_DIR + f)
+        else:
+            os.remove(JSON_DIR + f)
+
+    # Write JSON to files
+    (base_version, global_scope, base_classes, infos, base_signals,
+     base_docs) = gather(docs_dirs[0])
+    dump(global_scope, "@GlobalScope.json")
+    dump(base_signals, "@Signals.json")
+    base_syntax = build_syntax(base_version, [info["name"] for info in infos],
+                               global_scope)
+    dump_syntax(base_syntax, "@Syntax.vim")
+    dump_docs(base_docs)
+    dump(build_class_info(base_classes, infos), "@ClassInfo.json")
+    for c in base_classes:
+        dump(c, c["name"] + ".json")
+    versions = {base_version: get_config_version(base_version)}
+
+    # Write the differences of other versions.
+    base_global_scope = global_scope
+    base_classes = dict((c["name"], c) for c in base_classes)
+    for docs_dir in docs_dirs[1:]:
+        (version, global_scope, version_classes, infos, signals,
+         docs) = gather(docs_dir)
+        os.mkdir(JSON_DIR + version)
+        versions[version] = get_config_version(version)
+        dump(build_class_info(version_classes, infos), version + "/@ClassInfo.json")
+        if signals != base_signals:
+            dump(signals, version + "/@Signals.json")
+        syntax = build_syntax(version, [info["name"] for info in infos], global_scope)
+        # Only the header differs if the identifiers are the same.
+        if syntax.split("\n", 1)[1] != base_syntax.split("\n", 1)[1]:
+            dump_syntax(syntax, version + "/@Syntax.vim")
+        delta = diff_class(base_global_scope, global_scope)
+        if delta:
+            dump(delta, version + "/@GlobalScope.json")
+        for c in version_classes:
+            base = base_classes.get(c["name"])
+            delta = diff_class(base, c) if base else c
+            if delta:
+                dump(delta, "{}/{}.json".format(version, c["name"]))
+        # Descriptions are stored per class, for classes whose docs changed.
+        dump_docs(dict((name, d) for (name, d) in docs.items()
+                       if base_docs.get(name) != d), version + "/")
+
+    dump({"base": base_version, "versions": versions}, "@Versions.json")
 
+if __name__ == "__main__":
+    main()
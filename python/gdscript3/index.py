@@ -0,0 +1,488 @@
+# Symbol index for user declarations and identifier references.
+#
+# Scripts are indexed from plain lines of text, so the same code handles the
+# current buffer (using a snapshot of its lines) and every other script in the
+# project (read from disk). Buffer indexes are keyed on 'b:changedtick' and
+# file indexes on mtime, so repeated lookups are just dict accesses instead of
+# rescanning the buffer or grepping the project.
+
+import os
+import re
+import linecache
+from collections import namedtuple
+
+import util
+import script
+
+# A declaration found while indexing.
+# 'kind' is one of "var", "const", "func", "arg", "enum", "class", or "signal".
+# 'scope' is a tuple of the names of the enclosing inner classes and functions.
+Symbol = namedtuple("Symbol", "name, kind, path, line, col, scope")
+
+# An occurrence of an identifier. 'col' is zero-based.
+Reference = namedtuple("Reference", "path, line, col")
+
+# Token types yielded by 'iter_tokens()'.
+NAME = 1
+STRING = 2
+COMMENT = 3
+OP = 4
+
+_TOKEN_PATTERN = re.compile(
+        r'(?P<triple>""")'
+        r'|(?P<string>"(?:\\.|[^"\\])*"?|\'(?:\\.|[^\'\\])*\'?)'
+        r'|(?P<comment>#.*)'
+        r'|(?P<name>[A-Za-z_]\w*)'
+        r'|(?P<op>[()\[\]{}])')
+
+_EXTENDS_PATTERN = re.compile(r'extends\s+(\w+|"[^"]*")')
+_ANONYMOUS_ENUM_PATTERN = re.compile(r'\s*enum\s*\{')
+_ENUM_TOKEN_PATTERN = re.compile(r"0[xX][0-9a-fA-F]+|\d+(?:\.\d*)?|\w+|<<|>>|\S")
+_CLASS_NAME_PATTERN = re.compile(r'class_name\s+(\w+)')
+
+_KEYWORDS = frozenset([
+    "if", "elif", "else", "for", "while", "match", "break", "continue", "pass",
+    "return", "class", "extends", "is", "in", "as", "tool", "signal", "func",
+    "static", "const", "enum", "var", "onready", "export", "setget", "breakpoint",
+    "preload", "yield", "and", "or", "not", "self", "true", "false", "null",
+    "class_name", "remote", "sync", "master", "slave", "puppet"])
+
+# Maps buffer numbers to (changedtick, FileIndex).
+_buffer_indexes = {}
+# Maps project directories to ProjectIndex objects.
+_project_indexes = {}
+
+# Split a line of GDScript into tokens.
+# 'in_multiline' says whether the line starts inside a multi-line string.
+# Returns a list of (col, type, text) tuples with 0-based 'col', and whether
+# the next line starts inside a multi-line string.
+def tokenize_line(line, in_multiline=False):
+    tokens = []
+    pos = 0
+    if in_multiline:
+        end = line.find('"""')
+        if end < 0:
+            return ([(0, STRING, line)], True)
+        tokens.append((0, STRING, line[:end+3]))
+        pos = end + 3
+    while True:
+        m = _TOKEN_PATTERN.search(line, pos)
+        if not m:
+            break
+        col = m.start()
+        kind = m.lastgroup
+        if kind == "triple":
+            end = line.find('"""', col + 3)
+            if end < 0:
+                tokens.append((col, STRING, line[col:]))
+                return (tokens, True)
+            tokens.append((col, STRING, line[col:end+3]))
+            pos = end + 3
+            continue
+        tokens.append((col, _TOKEN_TYPES[kind], m.group(0)))
+        pos = m.end()
+    return (tokens, False)
+
+_TOKEN_TYPES = {"name": NAME, "string": STRING, "comment": COMMENT, "op": OP}
+
+# Generator that splits lines of GDScript into tokens.
+# Yields (lnum, col, type, text) tuples, with 1-based 'lnum'.
+def iter_tokens(lines):
+    in_multiline = False
+    for lnum, line in enumerate(lines, 1):
+        (tokens, in_multiline) = tokenize_line(line, in_multiline)
+        for (col, kind, text) in tokens:
+            yield (lnum, col, kind, text)
+
+# Index of a single script.
+class FileIndex:
+    def __init__(self, path):
+        self.path = path
+        self.decls = []
+        # Maps names to lists of (line, col) tuples.
+        self.refs = {}
+        # Maps decl names to lists of Symbols.
+        self.names = {}
+        # (start line, end line, scope) for every class and function.
+        self.ranges = []
+        # Maps scopes to "class" or "func".
+        self.scope_kinds = {}
+        # Maps the lines of enum decls to lists of ConstDecls for their values.
+        self.enums = {}
+        # The top-level 'extends' target, as a class name or quoted path.
+        self.extends = None
+        self.class_name = None
+
+    def add_decl(self, symbol):
+        self.decls.append(symbol)
+        self.names.setdefault(symbol.name, []).append(symbol)
+
+    def find_decls(self, name):
+        return self.names.get(name, [])
+
+    def get_enum_values(self, line):
+        return self.enums.get(line, [])
+
+    def find_refs(self, name):
+        return [Reference(self.path, l, c) for (l, c) in self.refs.get(name, [])]
+
+    # Check whether a decl is local to a function, i.e. it's an argument or
+    # declared anywhere inside a function.
+    def is_local(self, decl):
+        if decl.kind == "arg":
+            return True
+        for i in range(len(decl.scope)):
+            if self.scope_kinds.get(decl.scope[:i+1]) == "func":
+                return True
+        return False
+
+    # Get the scope (tuple of class and function names) containing a line.
+    def get_scope(self, lnum):
+        scope = ()
+        for (start, end, s) in self.ranges:
+            if start <= lnum <= end and len(s) > len(scope):
+                scope = s
+        return scope
+
+    # Find the declaration that 'name' most likely refers to at 'lnum'.
+    # Decls in the innermost enclosing scope win. Function locals only count
+    # if they're declared before 'lnum'.
+    def resolve(self, name, lnum):
+        scope = self.get_scope(lnum)
+        best = None
+        for decl in self.find_decls(name):
+            if decl.scope != scope[:len(decl.scope)]:
+                continue
+            if decl.line > lnum and self.scope_kinds.get(decl.scope) == "func":
+                continue
+            if not best or len(decl.scope) > len(best.scope):
+                best = decl
+        return best
+
+# Build a FileIndex from a list of lines.
+def index_lines(lines, path=None):
+    index = FileIndex(path)
+    # Stack of (indent, name, start line) for open classes and functions.
+    stack = []
+    last_line = 0
+    depth = 0
+    in_multiline = False
+    continued = False
+    for lnum, line in enumerate(lines, 1):
+        # Only lines that start a new statement can open or close a scope.
+        starts_statement = depth <= 0 and not in_multiline and not continued
+        (tokens, in_multiline) = tokenize_line(line, in_multiline)
+        for (col, kind, text) in tokens:
+            if kind == NAME:
+                if text not in _KEYWORDS:
+                    index.refs.setdefault(text, []).append((lnum, col))
+            elif kind == OP:
+                depth += 1 if text in "([{" else -1
+        continued = line.endswith("\\")
+        if not starts_statement or not tokens or tokens[0][1] == COMMENT:
+            continue
+        last_line = lnum
+
+        indent = _get_indent(line)
+        while stack and stack[-1][0] >= indent:
+            _close_scope(index, stack, lnum - 1)
+        scope = tuple(s[1] for s in stack)
+
+        if indent == 0:
+            m = _EXTENDS_PATTERN.match(line)
+            if m:
+                index.extends = m.group(1)
+                continue
+            m = _CLASS_NAME_PATTERN.match(line)
+            if m:
+                index.class_name = m.group(1)
+                index.add_decl(Symbol(m.group(1), "class", path, lnum,
+                                      m.start(1), scope))
+                continue
+
+        decl = script.parse_decl(lnum, line, script.ANY_DECLS | script.SIGNAL_DECLS)
+        if not decl:
+            # Values of anonymous enums are constants of the enclosing class.
+            if _ANONYMOUS_ENUM_PATTERN.match(line):
+                for value in parse_enum(lines, lnum):
+                    index.add_decl(Symbol(value.name, "const", path, value.line,
+                                          _find_name(lines[value.line-1], value.name),
+                                          scope))
+            continue
+        decl_type = type(decl)
+        kind = _DECL_KINDS[decl_type]
+        index.add_decl(Symbol(decl.name, kind, path, lnum,
+                              _find_name(line, decl.name), scope))
+        if decl_type is script.EnumDecl:
+            values = parse_enum(lines, lnum)
+            index.enums[lnum] = values
+            for value in values:
+                index.add_decl(Symbol(value.name, "const", path, value.line,
+                                      _find_name(lines[value.line-1], value.name),
+                                      scope + (decl.name,)))
+        if decl_type is script.FuncDecl or decl_type is script.ClassDecl:
+            new_scope = scope + (decl.name,)
+            index.scope_kinds[new_scope] = kind
+            stack.append((indent, decl.name, lnum))
+            if decl_type is script.FuncDecl:
+                for arg in decl.args:
+                    index.add_decl(Symbol(arg, "arg", path, lnum,
+                                          _find_name(line, arg), new_scope))
+    while stack:
+        _close_scope(index, stack, last_line)
+    return index
+
+# Parse the values of the enum declared on line 'lnum'.
+# The body may span several lines and contain comments. Returns a list of
+# ConstDecls holding the line, name and value of each enum value. Values that
+# aren't given explicitly are computed from the previous one, as Godot does.
+def parse_enum(lines, lnum):
+    # Gather (line, text) tokens between the enum's braces.
+    tokens = []
+    depth = 0
+    in_multiline = False
+    for i in range(lnum - 1, len(lines)):
+        (line_tokens, in_multiline) = tokenize_line(lines[i], in_multiline)
+        code = _blank_strings(lines[i], line_tokens)
+        for m in _ENUM_TOKEN_PATTERN.finditer(code):
+            text = m.group(0)
+            if text in "([{":
+                depth += 1
+                if depth == 1:
+                    continue
+            elif text in ")]}":
+                depth -= 1
+                if depth == 0:
+                    return _map_enum_values(tokens)
+            if depth > 0:
+                tokens.append((i + 1, text))
+    return _map_enum_values(tokens)
+
+def _map_enum_values(tokens):
+    values = []
+    # Split on commas that aren't nested inside brackets.
+    items = [[]]
+    depth = 0
+    for token in tokens:
+        text = token[1]
+        if text in "([{":
+            depth += 1
+        elif text in ")]}":
+            depth -= 1
+        elif text == "," and depth == 0:
+            items.append([])
+            continue
+        items[-1].append(token)
+
+    # The last explicit value, and the offset of implicit values from it.
+    base = None
+    offset = 0
+    for item in items:
+        if not item or not re.match(r"[A-Za-z_]\w*$", item[0][1]):
+            continue
+        (line, name) = item[0]
+        if len(item) > 2 and item[1][1] == "=":
+            expr = " ".join(t[1] for t in item[2:])
+            expr = re.sub(r"^([-+~]) ", r"\1", expr)
+            try:
+                base = int(expr.replace(" ", ""), 0)
+            except ValueError:
+                base = "({})".format(expr) if " " in expr else expr
+            offset = 0
+            value = expr
+        else:
+            if base is None:
+                base = 0
+                offset = 0
+            else:
+                offset += 1
+            if type(base) is int:
+                value = str(base + offset)
+            else:
+                value = "{} + {}".format(base, offset)
+        values.append(script.ConstDecl(line, name, value))
+    return values
+
+# Replace the contents of strings and comments in a line with spaces.
+def _blank_strings(line, tokens):
+    chars = list(line)
+    for (col, kind, text) in tokens:
+        if kind == STRING or kind == COMMENT:
+            chars[col:col+len(text)] = " " * len(text)
+    return "".join(chars)
+
+_DECL_KINDS = {
+    script.VarDecl: "var",
+    script.ConstDecl: "const",
+    script.FuncDecl: "func",
+    script.EnumDecl: "enum",
+    script.ClassDecl: "class",
+    script.SignalDecl: "signal",
+}
+
+def _close_scope(index, stack, end_line):
+    scope = tuple(s[1] for s in stack)
+    start_line = stack.pop()[2]
+    index.ranges.append((start_line, max(start_line, end_line), scope))
+
+def _get_indent(line):
+    return len(line.expandtabs(4)) - len(line.lstrip())
+
+# Get the column where a declared name appears in its line.
+def _find_name(line, name):
+    m = re.search(r"\b{}\b".format(name), line)
+    return m.start() if m else 0
+
+# Get the index of the current buffer, rebuilding it if the buffer changed.
+def get_buffer_index():
+    bufnr = util.get_buffer_number()
+    tick = util.get_changedtick()
+    cached = _buffer_indexes.get(bufnr)
+    if cached and cached[0] == tick:
+        return cached[1]
+    index = index_lines(util.get_buffer_lines(), util.get_buffer_path())
+    _buffer_indexes[bufnr] = (tick, index)
+    return index
+
+def clear_buffer_index(bufnr):
+    _buffer_indexes.pop(bufnr, None)
+
+# Index of every script in a Godot project.
+class ProjectIndex:
+    def __init__(self, root):
+        self.root = root
+        # Maps file paths to (mtime, FileIndex).
+        self.files = {}
+        # Maps decl names to lists of Symbols across all files. Rebuilt lazily.
+        self._names = None
+
+    # Index new and modified scripts, and drop deleted ones.
+    def scan(self):
+        seen = set()
+        for (dirpath, dirnames, filenames) in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for f in filenames:
+                if f.endswith(".gd"):
+                    path = os.path.join(dirpath, f)
+                    seen.add(path)
+                    self.update_file(path)
+        for path in list(self.files):
+            if path not in seen:
+                del self.files[path]
+                self._names = None
+
+    # Reindex a single script if it changed on disk.
+    def update_file(self, path):
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            if self.files.pop(path, None):
+                self._names = None
+            return
+        cached = self.files.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        lines = read_lines(path)
+        if lines is None:
+            return
+        index = index_lines(lines, path)
+        self.files[path] = (mtime, index)
+        self._names = None
+        return index
+
+    def find_decls(self, name):
+        if self._names is None:
+            self._names = {}
+            for (mtime, index) in self.files.values():
+                for (n, decls) in index.names.items():
+                    self._names.setdefault(n, []).extend(decls)
+        return self._names.get(name, [])
+
+    def find_refs(self, name, exclude=None):
+        refs = []
+        for path in sorted(self.files):
+            if path != exclude:
+                refs.extend(self.files[path][1].find_refs(name))
+        return refs
+
+    # Get the names declared with 'class_name' in the project.
+    def get_class_names(self):
+        return set(index.class_name for (mtime, index) in self.files.values()
+                   if index.class_name)
+
+    # Find the script declaring 'class_name name'.
+    def find_class(self, name):
+        for decl in self.find_decls(name):
+            if decl.kind == "class" and not decl.scope and \
+                    self.files[decl.path][1].class_name == name:
+                return decl
+
+    def res_to_path(self, res_path):
+        return os.path.join(self.root, res_path[len("res://"):])
+
+def read_lines(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().splitlines()
+    except (IOError, UnicodeDecodeError):
+        return
+
+# Get the index of the current project, scanning it the first time.
+# Returns None if the current file isn't inside a Godot project.
+def get_project_index():
+    root = util.get_project_dir()
+    if not root:
+        return
+    project = _project_indexes.get(root)
+    if not project:
+        project = ProjectIndex(root)
+        project.scan()
+        _project_indexes[root] = project
+    return project
+
+# Reindex a script in the current project after it's written.
+# Projects that haven't been indexed yet are left alone.
+def update_file(path):
+    project = _project_indexes.get(util.get_project_dir())
+    if project:
+        project.update_file(path)
+
+def rescan_project():
+    project = get_project_index()
+    if project:
+        project.scan()
+
+# Find where 'name' is declared, as seen from line 'lnum' in the current buffer.
+# Returns a list of Symbols, best match first.
+def find_definitions(name, lnum):
+    buffer_index = get_buffer_index()
+    decl = buffer_index.resolve(name, lnum)
+    if decl:
+        return [decl]
+    results = list(buffer_index.find_decls(name))
+    project = get_project_index()
+    if project:
+        c = project.find_class(name)
+        if c:
+            return [c]
+        path = buffer_index.path
+        for decl in project.find_decls(name):
+            if decl.path != path and not decl.scope:
+                results.append(decl)
+    return results
+
+# Find every occurrence of 'name' in the current buffer and the project.
+def find_references(name):
+    buffer_index = get_buffer_index()
+    refs = buffer_index.find_refs(name)
+    project = get_project_index()
+    if project:
+        refs.extend(project.find_refs(name, exclude=buffer_index.path))
+    return refs
+
+# Get the text of a line in an indexed file, for displaying search results.
+def get_line_text(path, lnum):
+    if path == util.get_buffer_path():
+        return util.get_line(lnum)
+    linecache.checkcache(path)
+    return linecache.getline(path, lnum).rstrip("\n")
@@ -1,40 +1,147 @@
 import sys
 import re
+import functools
 import vim
 
-sys.path.append(vim.eval("expand('<sfile>:p:h')") + "/../python/gdscript3/")
+# Run by 's:LoadPython()' in 'ftplugin/gdscript3.vim', the first time the
+# plugin needs Python.
+sys.path.append(vim.eval("python_dir"))
 
 import util
 import completer
 import classes
 import script
+import index
+import scene
+import docs
+import checker
+import symbols
+import lint
 
+completer.configure(dict(
+        (name, vim.eval("get(g:, 'gdscript3_{}', {})".format(name, util.to_vim(default))))
+        for (name, default) in completer.OPTIONS))
+
+# Run an entry point with a fresh context reading from Vim, cleared once it
+# returns, so nothing read during one request leaks into the next.
+def _request(func):
+    @functools.wraps(func)
+    def wrapper():
+        with util.using_context(util.Context()):
+            return func()
+    return wrapper
+
+@_request
 def gdscript_complete():
-    util.clear_cache()
-    completer.clear_completions()
+    completer.complete()
+    completions = completer.get_completions()
+    vim.command("let gdscript_completions = " + str(completions))
+
+# Load the classes used by the current script before they're first needed.
+@_request
+def gdscript_warmup():
+    classes.select_project(util.get_project_dir())
+    classes.get_global_scope()
+    extended_class = script.get_extended_class(1)
+    classes.pin_extends_chain(extended_class)
+    for c_name in [extended_class] + classes.get_ancestors(extended_class):
+        classes.get_class(c_name)
 
-    line = util.get_line()[0:util.get_cursor_col_num() - 1]
-    syn_attr = util.get_syn_attr()
-    if syn_attr == "gdComment":
+# Highlight the classes declared with 'class_name' in the project, and the
+# inner classes of the current buffer, with keywords. Sets
+# 'b:gdscript3_user_classes', which the syntax file reads when it's reloaded.
+@_request
+def gdscript_highlight_classes():
+    names = set(d.name for d in index.get_buffer_index().decls if d.kind == "class")
+    project = index.get_project_index()
+    if project:
+        names.update(project.get_class_names())
+    names = sorted(names)
+    if vim.eval("get(b:, 'gdscript3_user_classes', [])") == names:
         return
-    elif syn_attr == "gdString":
-        completer.complete_paths()
-    elif re.match("(\s*class\s+\w+\s+)?extends\s*", line):
-        completer.complete_class_names(classes.EXTENDABLE)
-    elif re.match("export\(\s*", line):
-        completer.complete_class_names(classes.EXPORTABLE)
-    elif re.match("\s*func", line):
-        completer.complete_method_signatures()
-    elif line and line[-1] == ".":
-        completer.complete_dot()
+    vim.command("let b:gdscript3_user_classes = " + util.to_vim(names))
+    vim.command("silent! syn clear gdUserClass")
+    if names:
+        vim.command("syn keyword gdUserClass " + " ".join(names))
+
+def gdscript_complete_done():
+    item = vim.eval("v:completed_item")
+    if item and item.get("word"):
+        completer.record_use(item["word"])
+
+# Look up the description of the selected completion for the info popup.
+def gdscript_complete_doc():
+    vim.command("unlet! gdscript_doc")
+    item = vim.eval("v:event").get("completed_item", {})
+    key = item.get("user_data")
+    if not key or not isinstance(key, str):
+        return
+    doc = docs.get_doc_by_key(key)
+    if doc:
+        vim.command("let gdscript_doc = " + util.to_vim(doc))
+
+# Show the description of the built-in class, method, member or constant under
+# the cursor.
+@_request
+def gdscript_show_doc():
+    classes.select_project(util.get_project_dir())
+    line_num = util.get_cursor_line_num()
+    col = util.get_cursor_col_num() - 1
+    line = util.get_line(line_num)
+    m = None
+    for m in re.finditer("\w+", line):
+        if m.start() <= col < m.end():
+            break
     else:
-        completer.complete_script(include_globals=True)
+        return
+    name = m.group(0)
 
-    completions = completer.get_completions()
-    vim.command("let gdscript_completions = " + str(completions))
+    if m.start() > 0 and line[m.start()-1] == ".":
+        tokens = script.get_token_chain(line, line_num, m.start() - 1)
+        if not tokens:
+            _echo("No documentation found for '{}'".format(name))
+            return
+        token = tokens[-1]
+        token_type = type(token)
+        if token_type is script.ClassToken and token.line == -1:
+            c = classes.get_class(token.name)
+        elif token_type is script.MethodToken:
+            c = classes.get_class(token.returns)
+        elif token_type is script.VariableToken:
+            c = classes.get_class(token.type)
+        elif token_type is script.SuperAccessorToken:
+            c = classes.get_class(script.get_extended_class(line_num))
+        else:
+            c = None
+        found = docs.find_declaring_class(c, name) if c else None
+    elif classes.get_class(name):
+        found = (name, None)
+    else:
+        c = classes.get_class(script.get_extended_class(line_num))
+        found = docs.find_declaring_class(c, name)
 
+    if not found:
+        _echo("No documentation found for '{}'".format(name))
+        return
+    (c_name, item) = found
+    lines = []
+    if item:
+        lines.append(docs.format_signature(item, c_name))
+        doc = docs.get_doc(c_name, item.name)
+    else:
+        lines.append("class " + c_name)
+        doc = docs.get_doc(c_name)
+    if doc:
+        lines.append("")
+        lines.extend(doc.splitlines())
+    if int(vim.eval("exists('*popup_atcursor')")):
+        vim.command("call popup_atcursor({}, {{}})".format(util.to_vim(lines)))
+    else:
+        vim.command("echo " + util.to_vim("\n".join(lines)))
+
+@_request
 def echodoc_search():
-    util.clear_cache()
+    classes.select_project(util.get_project_dir())
 
     text = vim.eval("a:text")
     text_len = len(text)
@@ -95,3 +202,154 @@ def echodoc_search():
     echodoc.append({"text": ")"})
 
     vim.command("let echodoc_search_result = {}".format(str(echodoc)))
+
+# Check the current buffer's file. Sets 'gdscript_loclist', and
+# 'gdscript_check_pending' if the engine hasn't answered yet, in which case the
+# loclist holds the errors of the last finished check.
+@_request
+def gdscript_check():
+    vim.command("unlet! gdscript_loclist")
+    bufnr = util.get_buffer_number()
+    debounce = int(vim.eval("get(g:, 'gdscript3_checker_debounce', 100)"))
+    wait = int(vim.eval("get(g:, 'gdscript3_checker_wait', 200)"))
+    timeout = int(vim.eval("get(g:, 'gdscript3_checker_timeout', 10000)"))
+    (errors, pending) = checker.check(util.get_buffer_path(), util.get_project_dir(),
+                                      vim.eval("a:exe"), debounce=debounce / 1000.0,
+                                      wait=wait / 1000.0, timeout=timeout / 1000.0)
+    vim.command("let gdscript_check_pending = {}".format(int(pending)))
+    loclist = []
+    for e in errors:
+        loclist.append({
+            "bufnr": bufnr,
+            "lnum": e.line,
+            "col": e.col,
+            "text": e.text,
+            "type": "E",
+            "valid": 1,
+        })
+    vim.command("let gdscript_loclist = " + util.to_vim(loclist))
+
+# Check whether the engine is still checking the current buffer's file.
+@_request
+def gdscript_check_pending():
+    pending = checker.is_pending(util.get_buffer_path(), util.get_project_dir())
+    vim.command("let gdscript_check_pending = {}".format(int(pending)))
+
+# Check the current buffer against the class database for up to
+# 'g:gdscript3_lint_budget' milliseconds. Sets 'gdscript_lint_items' to a
+# location list once every line has been checked.
+@_request
+def gdscript_lint():
+    vim.command("unlet! gdscript_lint_items")
+    budget = float(vim.eval("get(g:, 'gdscript3_lint_budget', 20)")) / 1000
+    (done, diagnostics) = lint.check_buffer(budget)
+    if not done:
+        return
+    bufnr = util.get_buffer_number()
+    items = []
+    for d in diagnostics:
+        items.append({
+            "bufnr": bufnr,
+            "lnum": d["line"],
+            "col": d["col"],
+            "text": d["message"],
+            "type": "E",
+        })
+    vim.command("let gdscript_lint_items = " + util.to_vim(items))
+
+def gdscript_clear_buffer():
+    bufnr = int(vim.eval("expand('<abuf>')"))
+    index.clear_buffer_index(bufnr)
+    lint.clear_buffer(bufnr)
+
+@_request
+def gdscript_goto_definition():
+    line_num = util.get_cursor_line_num()
+    col = util.get_cursor_col_num() - 1
+    line = util.get_line(line_num)
+
+    # Paths to scripts, e.g. 'extends "res://base.gd"', open the script.
+    for m in re.finditer('"(res://[^"]*)"', line):
+        if m.start() <= col < m.end():
+            project = index.get_project_index()
+            if project:
+                _jump(project.res_to_path(m.group(1)), 1, 0)
+            return
+
+    name = vim.eval("expand('<cword>')")
+    if not name:
+        return
+    decls = index.find_definitions(name, line_num)
+    if not decls:
+        if classes.get_class(name):
+            _echo("'{}' is a built-in type".format(name))
+        else:
+            _echo("No definition found for '{}'".format(name))
+        return
+    if len(decls) > 1:
+        _set_qflist(decls)
+    _jump(decls[0].path, decls[0].line, decls[0].col)
+
+@_request
+def gdscript_find_references():
+    name = vim.eval("expand('<cword>')")
+    if not name:
+        return
+    refs = index.find_references(name)
+    _set_qflist(refs)
+    _echo("{} reference(s) to '{}'".format(len(refs), name))
+
+@_request
+def gdscript_update_index():
+    path = vim.eval("expand('<afile>:p')")
+    index.update_file(path)
+    symbols.update_file(path)
+
+@_request
+def gdscript_reindex():
+    index.rescan_project()
+    symbols.rescan_project()
+    scene.rescan_scenes()
+
+# Fuzzy search the symbols of the project for 'a:query'.
+@_request
+def gdscript_search_symbols():
+    query = vim.eval("a:query")
+    limit = int(vim.eval("limit"))
+    include_api = bool(int(vim.eval("get(g:, 'gdscript3_symbols_api', 0)")))
+    results = []
+    for m in symbols.search(query, limit, include_api):
+        name = "{}.{}".format(m.container, m.name) if m.container else m.name
+        result = {"name": m.name, "kind": m.kind, "text": "{} ({})".format(name, m.kind)}
+        if m.container:
+            result["container"] = m.container
+        if m.path:
+            result["filename"] = m.path
+            result["lnum"] = m.line
+            result["col"] = m.col + 1
+        results.append(result)
+    vim.command("let gdscript_symbols = " + util.to_vim(results))
+
+def gdscript_save_symbols():
+    symbols.save()
+
+def _jump(path, line, col):
+    vim.command("normal! m'")
+    if path and path != util.get_buffer_path():
+        vim.command("edit " + vim.eval("fnameescape({})".format(util.to_vim(path))))
+    vim.current.window.cursor = (line, col)
+
+# Fill the quickfix list with Symbols or References.
+def _set_qflist(items):
+    qf = []
+    for item in items:
+        qf.append({
+            "filename": item.path,
+            "lnum": item.line,
+            "col": item.col + 1,
+            "text": index.get_line_text(item.path, item.line).strip(),
+        })
+    vim.command("call setqflist({}, 'r')".format(util.to_vim(qf)))
+
+def _echo(msg):
+    vim.command("echo {}".format(util.to_vim(msg)))
@@ -0,0 +1,249 @@
+" Godot 3.0 API identifiers, generated by gen_json.py.
+syn keyword gdClass AABB ARVRAnchor ARVRCamera ARVRController ARVRInterface
+syn keyword gdClass ARVROrigin ARVRPositionalTracker ARVRServer AStar
+syn keyword gdClass AcceptDialog AnimatedSprite AnimatedSprite3D Animation
+syn keyword gdClass AnimationPlayer AnimationTreePlayer Area Area2D Array
+syn keyword gdClass ArrayMesh AtlasTexture AudioBusLayout AudioEffect
+syn keyword gdClass AudioEffectAmplify AudioEffectBandLimitFilter
+syn keyword gdClass AudioEffectBandPassFilter AudioEffectChorus
+syn keyword gdClass AudioEffectCompressor AudioEffectDelay AudioEffectDistortion
+syn keyword gdClass AudioEffectEQ AudioEffectEQ10 AudioEffectEQ21 AudioEffectEQ6
+syn keyword gdClass AudioEffectFilter AudioEffectHighPassFilter
+syn keyword gdClass AudioEffectHighShelfFilter AudioEffectLimiter
+syn keyword gdClass AudioEffectLowPassFilter AudioEffectLowShelfFilter
+syn keyword gdClass AudioEffectNotchFilter AudioEffectPanner AudioEffectPhaser
+syn keyword gdClass AudioEffectPitchShift AudioEffectReverb
+syn keyword gdClass AudioEffectStereoEnhance AudioServer AudioStream
+syn keyword gdClass AudioStreamPlayback AudioStreamPlayer AudioStreamPlayer2D
+syn keyword gdClass AudioStreamPlayer3D AudioStreamRandomPitch AudioStreamSample
+syn keyword gdClass BackBufferCopy BakedLightmap BakedLightmapData BaseButton
+syn keyword gdClass Basis BitMap BitmapFont BoneAttachment BoxContainer BoxShape
+syn keyword gdClass Button ButtonGroup Camera Camera2D CanvasItem
+syn keyword gdClass CanvasItemMaterial CanvasLayer CanvasModulate CapsuleMesh
+syn keyword gdClass CapsuleShape CapsuleShape2D CenterContainer CheckBox
+syn keyword gdClass CheckButton CircleShape2D ClassDB CollisionObject
+syn keyword gdClass CollisionObject2D CollisionPolygon CollisionPolygon2D
+syn keyword gdClass CollisionShape CollisionShape2D Color ColorPicker
+syn keyword gdClass ColorPickerButton ColorRect ConcavePolygonShape
+syn keyword gdClass ConcavePolygonShape2D ConeTwistJoint ConfigFile
+syn keyword gdClass ConfirmationDialog Container Control ConvexPolygonShape
+syn keyword gdClass ConvexPolygonShape2D CubeMap CubeMesh Curve Curve2D Curve3D
+syn keyword gdClass CurveTexture CylinderMesh DampedSpringJoint2D Dictionary
+syn keyword gdClass DirectionalLight Directory DynamicFont DynamicFontData
+syn keyword gdClass EditorExportPlugin EditorFileDialog EditorFileSystem
+syn keyword gdClass EditorFileSystemDirectory EditorImportPlugin EditorInterface
+syn keyword gdClass EditorPlugin EditorResourceConversionPlugin
+syn keyword gdClass EditorResourcePreview EditorResourcePreviewGenerator
+syn keyword gdClass EditorSceneImporter EditorScenePostImport EditorScript
+syn keyword gdClass EditorSelection EditorSettings EditorSpatialGizmo
+syn keyword gdClass EncodedObjectAsID Engine Environment File FileDialog Font
+syn keyword gdClass FuncRef GIProbe GIProbeData Generic6DOFJoint Geometry
+syn keyword gdClass GeometryInstance GodotSharp Gradient GradientTexture
+syn keyword gdClass GraphEdit GraphNode GridContainer GrooveJoint2D
+syn keyword gdClass HBoxContainer HScrollBar HSeparator HSlider HSplitContainer
+syn keyword gdClass HTTPClient HTTPRequest HingeJoint IP IP_Unix Image
+syn keyword gdClass ImageTexture ImmediateGeometry Input InputDefault InputEvent
+syn keyword gdClass InputEventAction InputEventGesture InputEventJoypadButton
+syn keyword gdClass InputEventJoypadMotion InputEventKey
+syn keyword gdClass InputEventMagnifyGesture InputEventMouse
+syn keyword gdClass InputEventMouseButton InputEventMouseMotion
+syn keyword gdClass InputEventPanGesture InputEventScreenDrag
+syn keyword gdClass InputEventScreenTouch InputEventWithModifiers InputMap
+syn keyword gdClass InstancePlaceholder InterpolatedCamera ItemList JSON
+syn keyword gdClass JSONParseResult JavaScript Joint Joint2D KinematicBody
+syn keyword gdClass KinematicBody2D KinematicCollision KinematicCollision2D
+syn keyword gdClass Label LargeTexture Light Light2D LightOccluder2D Line2D
+syn keyword gdClass LineEdit LineShape2D LinkButton Listener MainLoop
+syn keyword gdClass MarginContainer Marshalls Material MenuButton Mesh
+syn keyword gdClass MeshDataTool MeshInstance MeshLibrary MultiMesh
+syn keyword gdClass MultiMeshInstance Mutex Navigation Navigation2D
+syn keyword gdClass NavigationMesh NavigationMeshInstance NavigationPolygon
+syn keyword gdClass NavigationPolygonInstance NetworkedMultiplayerPeer Nil
+syn keyword gdClass NinePatchRect Node Node2D NodePath OS Object
+syn keyword gdClass OccluderPolygon2D OmniLight OptionButton PCKPacker
+syn keyword gdClass PHashTranslation PackedDataContainer PackedDataContainerRef
+syn keyword gdClass PackedScene PacketPeer PacketPeerStream PacketPeerUDP Panel
+syn keyword gdClass PanelContainer PanoramaSky ParallaxBackground ParallaxLayer
+syn keyword gdClass Particles Particles2D ParticlesMaterial Path Path2D
+syn keyword gdClass PathFollow PathFollow2D Performance Physics2DDirectBodyState
+syn keyword gdClass Physics2DDirectBodyStateSW Physics2DDirectSpaceState
+syn keyword gdClass Physics2DServer Physics2DServerSW
+syn keyword gdClass Physics2DShapeQueryParameters Physics2DShapeQueryResult
+syn keyword gdClass Physics2DTestMotionResult PhysicsBody PhysicsBody2D
+syn keyword gdClass PhysicsDirectBodyState PhysicsDirectSpaceState PhysicsServer
+syn keyword gdClass PhysicsShapeQueryParameters PhysicsShapeQueryResult PinJoint
+syn keyword gdClass PinJoint2D Plane PlaneMesh PlaneShape Polygon2D
+syn keyword gdClass PolygonPathFinder PoolByteArray PoolColorArray PoolIntArray
+syn keyword gdClass PoolRealArray PoolStringArray PoolVector2Array
+syn keyword gdClass PoolVector3Array Popup PopupDialog PopupMenu PopupPanel
+syn keyword gdClass Position2D Position3D PrimitiveMesh PrismMesh ProceduralSky
+syn keyword gdClass ProgressBar ProjectSettings ProximityGroup ProxyTexture
+syn keyword gdClass QuadMesh Quat RID Range RayCast RayCast2D RayShape
+syn keyword gdClass RayShape2D Rect2 RectangleShape2D Reference ReferenceRect
+syn keyword gdClass ReflectionProbe RemoteTransform RemoteTransform2D Resource
+syn keyword gdClass ResourceImporter ResourceInteractiveLoader ResourceLoader
+syn keyword gdClass ResourcePreloader ResourceSaver RichTextLabel RigidBody
+syn keyword gdClass RigidBody2D SceneState SceneTree SceneTreeTimer Script
+syn keyword gdClass ScriptEditor ScrollBar ScrollContainer SegmentShape2D
+syn keyword gdClass Semaphore Separator Shader ShaderMaterial Shape Shape2D
+syn keyword gdClass ShortCut Skeleton Sky Slider SliderJoint Spatial
+syn keyword gdClass SpatialGizmo SpatialMaterial SpatialVelocityTracker
+syn keyword gdClass SphereMesh SphereShape SpinBox SplitContainer SpotLight
+syn keyword gdClass Sprite Sprite3D SpriteBase3D SpriteFrames StaticBody
+syn keyword gdClass StaticBody2D StreamPeer StreamPeerBuffer StreamPeerSSL
+syn keyword gdClass StreamPeerTCP StreamTexture String StyleBox StyleBoxEmpty
+syn keyword gdClass StyleBoxFlat StyleBoxLine StyleBoxTexture SurfaceTool
+syn keyword gdClass TCP_Server TabContainer Tabs TextEdit Texture TextureButton
+syn keyword gdClass TextureProgress TextureRect Theme Thread TileMap TileSet
+syn keyword gdClass Timer ToolButton TouchScreenButton Transform Transform2D
+syn keyword gdClass Translation TranslationServer Tree TreeItem TriangleMesh
+syn keyword gdClass Tween UndoRedo VBoxContainer VScrollBar VSeparator VSlider
+syn keyword gdClass VSplitContainer Variant Vector2 Vector3 VehicleBody
+syn keyword gdClass VehicleWheel VideoPlayer VideoStream Viewport
+syn keyword gdClass ViewportContainer ViewportTexture VisibilityEnabler
+syn keyword gdClass VisibilityEnabler2D VisibilityNotifier VisibilityNotifier2D
+syn keyword gdClass VisualInstance VisualScriptEditor VisualServer WeakRef
+syn keyword gdClass WindowDialog World World2D WorldEnvironment XMLParser YSort
+syn keyword gdClass bool float int
+syn keyword gdConstant BUTTON_LEFT BUTTON_MASK_LEFT BUTTON_MASK_MIDDLE
+syn keyword gdConstant BUTTON_MASK_RIGHT BUTTON_MIDDLE BUTTON_RIGHT
+syn keyword gdConstant BUTTON_WHEEL_DOWN BUTTON_WHEEL_LEFT BUTTON_WHEEL_RIGHT
+syn keyword gdConstant BUTTON_WHEEL_UP CORNER_BOTTOM_LEFT CORNER_BOTTOM_RIGHT
+syn keyword gdConstant CORNER_TOP_LEFT CORNER_TOP_RIGHT ERR_ALREADY_EXISTS
+syn keyword gdConstant ERR_ALREADY_IN_USE ERR_BUG ERR_BUSY
+syn keyword gdConstant ERR_CANT_ACQUIRE_RESOURCE ERR_CANT_CREATE ERR_CANT_OPEN
+syn keyword gdConstant ERR_COMPILATION_FAILED ERR_CYCLIC_LINK
+syn keyword gdConstant ERR_DATABASE_CANT_READ ERR_DATABASE_CANT_WRITE
+syn keyword gdConstant ERR_DOES_NOT_EXIST ERR_FILE_ALREADY_IN_USE
+syn keyword gdConstant ERR_FILE_BAD_DRIVE ERR_FILE_BAD_PATH ERR_FILE_CANT_OPEN
+syn keyword gdConstant ERR_FILE_CANT_READ ERR_FILE_CANT_WRITE ERR_FILE_CORRUPT
+syn keyword gdConstant ERR_FILE_EOF ERR_FILE_MISSING_DEPENDENCIES
+syn keyword gdConstant ERR_FILE_NOT_FOUND ERR_FILE_NO_PERMISSION
+syn keyword gdConstant ERR_FILE_UNRECOGNIZED ERR_HELP ERR_INVALID_DATA
+syn keyword gdConstant ERR_INVALID_PARAMETER ERR_LINK_FAILED ERR_LOCKED
+syn keyword gdConstant ERR_METHOD_NOT_FOUND ERR_OUT_OF_MEMORY
+syn keyword gdConstant ERR_PARAMETER_RANGE_ERROR ERR_PARSE_ERROR
+syn keyword gdConstant ERR_QUERY_FAILED ERR_SCRIPT_FAILED ERR_TIMEOUT
+syn keyword gdConstant ERR_UNAUTHORIZED ERR_UNAVAILABLE ERR_UNCONFIGURED FAILED
+syn keyword gdConstant HALIGN_CENTER HALIGN_LEFT HALIGN_RIGHT HORIZONTAL INF
+syn keyword gdConstant JOY_ANALOG_L2 JOY_ANALOG_LX JOY_ANALOG_LY JOY_ANALOG_R2
+syn keyword gdConstant JOY_ANALOG_RX JOY_ANALOG_RY JOY_AXIS_0 JOY_AXIS_1
+syn keyword gdConstant JOY_AXIS_2 JOY_AXIS_3 JOY_AXIS_4 JOY_AXIS_5 JOY_AXIS_6
+syn keyword gdConstant JOY_AXIS_7 JOY_AXIS_8 JOY_AXIS_9 JOY_AXIS_MAX
+syn keyword gdConstant JOY_BUTTON_0 JOY_BUTTON_1 JOY_BUTTON_10 JOY_BUTTON_11
+syn keyword gdConstant JOY_BUTTON_12 JOY_BUTTON_13 JOY_BUTTON_14 JOY_BUTTON_15
+syn keyword gdConstant JOY_BUTTON_2 JOY_BUTTON_3 JOY_BUTTON_4 JOY_BUTTON_5
+syn keyword gdConstant JOY_BUTTON_6 JOY_BUTTON_7 JOY_BUTTON_8 JOY_BUTTON_9
+syn keyword gdConstant JOY_BUTTON_MAX JOY_DPAD_DOWN JOY_DPAD_LEFT JOY_DPAD_RIGHT
+syn keyword gdConstant JOY_DPAD_UP JOY_DS_A JOY_DS_B JOY_DS_X JOY_DS_Y JOY_L
+syn keyword gdConstant JOY_L2 JOY_L3 JOY_R JOY_R2 JOY_R3 JOY_SELECT
+syn keyword gdConstant JOY_SONY_CIRCLE JOY_SONY_SQUARE JOY_SONY_TRIANGLE
+syn keyword gdConstant JOY_SONY_X JOY_START JOY_XBOX_A JOY_XBOX_B JOY_XBOX_X
+syn keyword gdConstant JOY_XBOX_Y KEY_0 KEY_1 KEY_2 KEY_3 KEY_4 KEY_5 KEY_6
+syn keyword gdConstant KEY_7 KEY_8 KEY_9 KEY_A KEY_AACUTE KEY_ACIRCUMFLEX
+syn keyword gdConstant KEY_ACUTE KEY_ADIAERESIS KEY_AE KEY_AGRAVE KEY_ALT
+syn keyword gdConstant KEY_AMPERSAND KEY_APOSTROPHE KEY_ARING KEY_ASCIICIRCUM
+syn keyword gdConstant KEY_ASCIITILDE KEY_ASTERISK KEY_AT KEY_ATILDE KEY_B
+syn keyword gdConstant KEY_BACK KEY_BACKSLASH KEY_BACKSPACE KEY_BACKTAB KEY_BAR
+syn keyword gdConstant KEY_BASSBOOST KEY_BASSDOWN KEY_BASSUP KEY_BRACELEFT
+syn keyword gdConstant KEY_BRACERIGHT KEY_BRACKETLEFT KEY_BRACKETRIGHT
+syn keyword gdConstant KEY_BROKENBAR KEY_C KEY_CAPSLOCK KEY_CCEDILLA KEY_CEDILLA
+syn keyword gdConstant KEY_CENT KEY_CLEAR KEY_CODE_MASK KEY_COLON KEY_COMMA
+syn keyword gdConstant KEY_CONTROL KEY_COPYRIGHT KEY_CURRENCY KEY_D KEY_DEGREE
+syn keyword gdConstant KEY_DELETE KEY_DIAERESIS KEY_DIRECTION_L KEY_DIRECTION_R
+syn keyword gdConstant KEY_DIVISION KEY_DOLLAR KEY_DOWN KEY_E KEY_EACUTE
+syn keyword gdConstant KEY_ECIRCUMFLEX KEY_EDIAERESIS KEY_EGRAVE KEY_END
+syn keyword gdConstant KEY_ENTER KEY_EQUAL KEY_ESCAPE KEY_ETH KEY_EXCLAM
+syn keyword gdConstant KEY_EXCLAMDOWN KEY_F KEY_F1 KEY_F10 KEY_F11 KEY_F12
+syn keyword gdConstant KEY_F13 KEY_F14 KEY_F15 KEY_F16 KEY_F2 KEY_F3 KEY_F4
+syn keyword gdConstant KEY_F5 KEY_F6 KEY_F7 KEY_F8 KEY_F9 KEY_FAVORITES
+syn keyword gdConstant KEY_FORWARD KEY_G KEY_GREATER KEY_GUILLEMOTLEFT
+syn keyword gdConstant KEY_GUILLEMOTRIGHT KEY_H KEY_HELP KEY_HOME KEY_HOMEPAGE
+syn keyword gdConstant KEY_HYPER_L KEY_HYPER_R KEY_HYPHEN KEY_I KEY_IACUTE
+syn keyword gdConstant KEY_ICIRCUMFLEX KEY_IDIAERESIS KEY_IGRAVE KEY_INSERT
+syn keyword gdConstant KEY_J KEY_K KEY_KP_0 KEY_KP_1 KEY_KP_2 KEY_KP_3 KEY_KP_4
+syn keyword gdConstant KEY_KP_5 KEY_KP_6 KEY_KP_7 KEY_KP_8 KEY_KP_9 KEY_KP_ADD
+syn keyword gdConstant KEY_KP_DIVIDE KEY_KP_ENTER KEY_KP_MULTIPLY KEY_KP_PERIOD
+syn keyword gdConstant KEY_KP_SUBTRACT KEY_L KEY_LAUNCH0 KEY_LAUNCH1 KEY_LAUNCH2
+syn keyword gdConstant KEY_LAUNCH3 KEY_LAUNCH4 KEY_LAUNCH5 KEY_LAUNCH6
+syn keyword gdConstant KEY_LAUNCH7 KEY_LAUNCH8 KEY_LAUNCH9 KEY_LAUNCHA
+syn keyword gdConstant KEY_LAUNCHB KEY_LAUNCHC KEY_LAUNCHD KEY_LAUNCHE
+syn keyword gdConstant KEY_LAUNCHF KEY_LAUNCHMAIL KEY_LAUNCHMEDIA KEY_LEFT
+syn keyword gdConstant KEY_LESS KEY_M KEY_MACRON KEY_MASCULINE KEY_MASK_ALT
+syn keyword gdConstant KEY_MASK_CMD KEY_MASK_CTRL KEY_MASK_GROUP_SWITCH
+syn keyword gdConstant KEY_MASK_KPAD KEY_MASK_META KEY_MASK_SHIFT KEY_MEDIANEXT
+syn keyword gdConstant KEY_MEDIAPLAY KEY_MEDIAPREVIOUS KEY_MEDIARECORD
+syn keyword gdConstant KEY_MEDIASTOP KEY_MENU KEY_META KEY_MINUS
+syn keyword gdConstant KEY_MODIFIER_MASK KEY_MU KEY_MULTIPLY KEY_N
+syn keyword gdConstant KEY_NOBREAKSPACE KEY_NOTSIGN KEY_NTILDE KEY_NUMBERSIGN
+syn keyword gdConstant KEY_NUMLOCK KEY_O KEY_OACUTE KEY_OCIRCUMFLEX
+syn keyword gdConstant KEY_ODIAERESIS KEY_OGRAVE KEY_ONEHALF KEY_ONEQUARTER
+syn keyword gdConstant KEY_ONESUPERIOR KEY_OOBLIQUE KEY_OPENURL KEY_ORDFEMININE
+syn keyword gdConstant KEY_OTILDE KEY_P KEY_PAGEDOWN KEY_PAGEUP KEY_PARAGRAPH
+syn keyword gdConstant KEY_PARENLEFT KEY_PARENRIGHT KEY_PAUSE KEY_PERCENT
+syn keyword gdConstant KEY_PERIOD KEY_PERIODCENTERED KEY_PLUS KEY_PLUSMINUS
+syn keyword gdConstant KEY_PRINT KEY_Q KEY_QUESTION KEY_QUESTIONDOWN
+syn keyword gdConstant KEY_QUOTEDBL KEY_QUOTELEFT KEY_R KEY_REFRESH
+syn keyword gdConstant KEY_REGISTERED KEY_RIGHT KEY_S KEY_SCROLLLOCK KEY_SEARCH
+syn keyword gdConstant KEY_SECTION KEY_SEMICOLON KEY_SHIFT KEY_SLASH KEY_SPACE
+syn keyword gdConstant KEY_SSHARP KEY_STANDBY KEY_STERLING KEY_STOP KEY_SUPER_L
+syn keyword gdConstant KEY_SUPER_R KEY_SYSREQ KEY_T KEY_TAB KEY_THORN
+syn keyword gdConstant KEY_THREEQUARTERS KEY_THREESUPERIOR KEY_TREBLEDOWN
+syn keyword gdConstant KEY_TREBLEUP KEY_TWOSUPERIOR KEY_U KEY_UACUTE
+syn keyword gdConstant KEY_UCIRCUMFLEX KEY_UDIAERESIS KEY_UGRAVE KEY_UNDERSCORE
+syn keyword gdConstant KEY_UNKNOWN KEY_UP KEY_V KEY_VOLUMEDOWN KEY_VOLUMEMUTE
+syn keyword gdConstant KEY_VOLUMEUP KEY_W KEY_X KEY_Y KEY_YACUTE KEY_YDIAERESIS
+syn keyword gdConstant KEY_YEN KEY_Z MARGIN_BOTTOM MARGIN_LEFT MARGIN_RIGHT
+syn keyword gdConstant MARGIN_TOP METHOD_FLAGS_DEFAULT METHOD_FLAG_CONST
+syn keyword gdConstant METHOD_FLAG_EDITOR METHOD_FLAG_FROM_SCRIPT
+syn keyword gdConstant METHOD_FLAG_NORMAL METHOD_FLAG_NOSCRIPT
+syn keyword gdConstant METHOD_FLAG_REVERSE METHOD_FLAG_VIRTUAL NAN OK OP_ADD
+syn keyword gdConstant OP_AND OP_BIT_AND OP_BIT_NEGATE OP_BIT_OR OP_BIT_XOR
+syn keyword gdConstant OP_DIVIDE OP_EQUAL OP_GREATER OP_GREATER_EQUAL OP_IN
+syn keyword gdConstant OP_LESS OP_LESS_EQUAL OP_MAX OP_MODULE OP_MULTIPLY
+syn keyword gdConstant OP_NEGATE OP_NOT OP_NOT_EQUAL OP_OR OP_POSITIVE
+syn keyword gdConstant OP_SHIFT_LEFT OP_SHIFT_RIGHT OP_STRING_CONCAT OP_SUBTRACT
+syn keyword gdConstant OP_XOR PI PROPERTY_HINT_COLOR_NO_ALPHA PROPERTY_HINT_DIR
+syn keyword gdConstant PROPERTY_HINT_ENUM PROPERTY_HINT_EXP_EASING
+syn keyword gdConstant PROPERTY_HINT_EXP_RANGE PROPERTY_HINT_FILE
+syn keyword gdConstant PROPERTY_HINT_FLAGS PROPERTY_HINT_GLOBAL_DIR
+syn keyword gdConstant PROPERTY_HINT_GLOBAL_FILE
+syn keyword gdConstant PROPERTY_HINT_IMAGE_COMPRESS_LOSSLESS
+syn keyword gdConstant PROPERTY_HINT_IMAGE_COMPRESS_LOSSY
+syn keyword gdConstant PROPERTY_HINT_KEY_ACCEL PROPERTY_HINT_LAYERS_2D_PHYSICS
+syn keyword gdConstant PROPERTY_HINT_LAYERS_2D_RENDER
+syn keyword gdConstant PROPERTY_HINT_LAYERS_3D_PHYSICS
+syn keyword gdConstant PROPERTY_HINT_LAYERS_3D_RENDER PROPERTY_HINT_LENGTH
+syn keyword gdConstant PROPERTY_HINT_MULTILINE_TEXT PROPERTY_HINT_NONE
+syn keyword gdConstant PROPERTY_HINT_RANGE PROPERTY_HINT_RESOURCE_TYPE
+syn keyword gdConstant PROPERTY_USAGE_CATEGORY PROPERTY_USAGE_CHECKABLE
+syn keyword gdConstant PROPERTY_USAGE_CHECKED PROPERTY_USAGE_DEFAULT
+syn keyword gdConstant PROPERTY_USAGE_DEFAULT_INTL PROPERTY_USAGE_EDITOR
+syn keyword gdConstant PROPERTY_USAGE_EDITOR_HELPER PROPERTY_USAGE_GROUP
+syn keyword gdConstant PROPERTY_USAGE_INTERNATIONALIZED PROPERTY_USAGE_NETWORK
+syn keyword gdConstant PROPERTY_USAGE_NOEDITOR PROPERTY_USAGE_NO_INSTANCE_STATE
+syn keyword gdConstant PROPERTY_USAGE_RESTART_IF_CHANGED
+syn keyword gdConstant PROPERTY_USAGE_SCRIPT_VARIABLE PROPERTY_USAGE_STORAGE
+syn keyword gdConstant PROPERTY_USAGE_STORE_IF_NONONE
+syn keyword gdConstant PROPERTY_USAGE_STORE_IF_NONZERO SPKEY TAU TYPE_AABB
+syn keyword gdConstant TYPE_ARRAY TYPE_BASIS TYPE_BOOL TYPE_COLOR
+syn keyword gdConstant TYPE_COLOR_ARRAY TYPE_DICTIONARY TYPE_INT TYPE_INT_ARRAY
+syn keyword gdConstant TYPE_MAX TYPE_NIL TYPE_NODE_PATH TYPE_OBJECT TYPE_PLANE
+syn keyword gdConstant TYPE_QUAT TYPE_RAW_ARRAY TYPE_REAL TYPE_REAL_ARRAY
+syn keyword gdConstant TYPE_RECT2 TYPE_RID TYPE_STRING TYPE_STRING_ARRAY
+syn keyword gdConstant TYPE_TRANSFORM TYPE_TRANSFORM2D TYPE_VECTOR2
+syn keyword gdConstant TYPE_VECTOR2_ARRAY TYPE_VECTOR3 TYPE_VECTOR3_ARRAY
+syn keyword gdConstant VALIGN_BOTTOM VALIGN_CENTER VALIGN_TOP VERTICAL
+syn keyword gdGlobalFunction Color8 ColorN abs acos asin assert atan atan2
+syn keyword gdGlobalFunction bytes2var cartesian2polar ceil char clamp convert
+syn keyword gdGlobalFunction cos cosh db2linear decimals dectime deg2rad
+syn keyword gdGlobalFunction dict2inst ease exp floor fmod fposmod funcref hash
+syn keyword gdGlobalFunction inst2dict instance_from_id inverse_lerp is_inf
+syn keyword gdGlobalFunction is_nan len lerp linear2db load log max min
+syn keyword gdGlobalFunction nearest_po2 parse_json polar2cartesian pow preload
+syn keyword gdGlobalFunction print print_stack printerr printraw prints printt
+syn keyword gdGlobalFunction rad2deg rand_range rand_seed randf randi randomize
+syn keyword gdGlobalFunction range range_lerp round seed sign sin sinh sqrt
+syn keyword gdGlobalFunction stepify str str2var tan tanh to_json type_exists
+syn keyword gdGlobalFunction typeof validate_json var2bytes var2str weakref
+syn keyword gdGlobalFunction wrapf wrapi yield
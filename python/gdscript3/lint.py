@@ -0,0 +1,320 @@
+# Semantic checks of scripts against the class database, without the engine.
+#
+# Accesses to members, methods and constants are resolved with the token chain
+# (see 'script.get_token_chain()'), and reported if they don't exist on a
+# built-in type, an engine singleton or a Godot class. Calls of the script's
+# own methods ('name()' or 'self.name()') are checked against its declarations
+# and the class it extends. Nothing is checked unless the project's API version
+# is known (see 'classes.is_version_exact()'). The batch analyzer
+# (see 'analyze.py') checks whole files. In Vim, 'BufferLint' checks a buffer
+# incrementally: only lines that changed since the last check, and the scopes
+# of changed declarations, are checked again, a few milliseconds at a time.
+
+import time
+
+import util
+import script
+import classes
+import index
+
+# Built-in types whose members can't be checked, because they also allow
+# arbitrary keys to be accessed like members (e.g. 'dict.key').
+_DYNAMIC_MEMBER_TYPES = ("Dictionary",)
+
+# Keywords followed by the name of a declaration with parentheses, which isn't
+# a call.
+_DECL_KEYWORDS = ("func", "signal")
+
+# Check every '.name' access and call on a line.
+# 'tokens' are the line's tokens from 'index.tokenize_line()', and
+# 'file_index' is the FileIndex of the script. The active context must be on
+# the line. Returns a list of diagnostic dicts.
+def check_line(path, lnum, line, tokens, file_index):
+    diagnostics = []
+    if not classes.is_version_exact():
+        return diagnostics
+    prev_name = None
+    for (col, kind, name) in tokens:
+        if kind != index.NAME:
+            continue
+        (name_before, prev_name) = (prev_name, name)
+        rest = line[col+len(name):].lstrip()
+        is_method = rest.startswith("(")
+        if not line[:col].rstrip().endswith("."):
+            if is_method and name not in index._KEYWORDS and \
+                    name_before not in _DECL_KEYWORDS:
+                message = _check_own_method(file_index, lnum, name)
+                if message:
+                    diagnostics.append(make_diagnostic(path, lnum, col + 1,
+                                                       "unknown-method", message))
+            continue
+        if col < 2 or line[col-1] != ".":
+            continue
+        try:
+            chain = script.get_token_chain(line, lnum, col - 1)
+        except IndexError:
+            continue
+        if not chain:
+            continue
+        token = chain[-1]
+        if len(chain) == 1 and token == script.VariableToken("self", None):
+            message = _check_own_method(file_index, lnum, name) if is_method else None
+            if message:
+                diagnostics.append(make_diagnostic(path, lnum, col + 1,
+                                                   "unknown-method", message))
+            continue
+        if type(token) is script.ClassToken:
+            message = _check_class_access(token, name, is_method)
+            if message:
+                diagnostics.append(make_diagnostic(path, lnum, col + 1,
+                                                   "unknown-constant", message))
+            continue
+        c = _get_checked_class(chain)
+        if not c:
+            continue
+        if is_method:
+            if c.get_method(name):
+                continue
+            message = "Nonexistent method '{}' in '{}'".format(name, c.get_name())
+            diagnostics.append(make_diagnostic(path, lnum, col + 1, "unknown-method", message))
+        else:
+            if c.get_name() in _DYNAMIC_MEMBER_TYPES:
+                continue
+            if c.get_member(name) or c.get_constant(name) or c.get_method(name):
+                continue
+            message = "Nonexistent member '{}' in '{}'".format(name, c.get_name())
+            diagnostics.append(make_diagnostic(path, lnum, col + 1, "unknown-member", message))
+    return diagnostics
+
+# Check a static access on a Godot class, e.g. 'Node.PAUSE_MODE_STOP'.
+# Built-in types are skipped, since the database doesn't list their constants
+# (e.g. 'Vector2.ZERO'). Returns an error message, or None if the access is
+# fine.
+def _check_class_access(token, name, is_method):
+    if token.line != -1 or is_method:
+        return
+    c = classes.get_class(token.name)
+    if c and not c.is_built_in() and not c.get_constant(name):
+        return "Nonexistent constant '{}' in '{}'".format(name, c.get_name())
+
+# Check a call of one of the script's own methods, e.g. 'get_node()' or
+# 'self.get_node()' on line 'lnum'. The method must be declared in the class
+# containing the line, or exist in the extended class or the global scope.
+# Functions of the script itself are accepted in inner classes too, since
+# they may be static, and so are class names, which may be called like
+# constructors (e.g. 'Dictionary()'). Scripts extending another script or a
+# class the database doesn't know are skipped, since their inherited methods
+# are unknown. Returns an error message, or None if the call is fine.
+def _check_own_method(file_index, lnum, name):
+    c = classes.get_class(script.get_extended_class(lnum))
+    if not c or c.get_method(name, search_global=True) or \
+            classes.is_in_category(name, 0):
+        return
+    scope = file_index.get_scope(lnum)
+    while scope and file_index.scope_kinds.get(scope) != "class":
+        scope = scope[:-1]
+    for decl in file_index.find_decls(name):
+        if decl.kind == "func" and decl.scope in (scope, ()):
+            return
+    return "Nonexistent method '{}' in '{}'".format(name, c.get_name())
+
+# Get the class to check accesses against for the last token of a chain.
+# Only built-in types and engine singletons are checked, since objects of any
+# other type may have a script attached that adds members.
+def _get_checked_class(chain):
+    token = chain[-1]
+    token_type = type(token)
+    if token_type is script.VariableToken:
+        c_name = token.type
+        # Engine singletons, e.g. 'OS', are global members of their own type.
+        is_singleton = len(chain) == 1 and token.name == c_name and \
+                classes.get_global_scope().get_member(token.name)
+    elif token_type is script.MethodToken:
+        c_name = token.returns
+        is_singleton = False
+    else:
+        return
+    if is_singleton or classes.is_in_category(c_name, classes.BUILT_IN):
+        return classes.get_class(c_name)
+
+def make_diagnostic(path, line, col, code, message):
+    return {
+        "path": path,
+        "line": line,
+        "col": col,
+        "severity": "error",
+        "code": code,
+        "message": message,
+    }
+
+# Check every line of a script. Returns a list of diagnostic dicts.
+def check_lines(lines, path):
+    source = util.LinesSource(lines, path)
+    file_index = index.index_lines(lines, path)
+    diagnostics = []
+    in_multiline = False
+    with util.using_context(util.Context(source)):
+        for lnum, line in enumerate(lines, 1):
+            (tokens, in_multiline) = index.tokenize_line(line, in_multiline)
+            if not any(t[1] == index.NAME for t in tokens):
+                continue
+            util.set_context(util.Context(source, (lnum, len(line) + 1), "", False))
+            diagnostics.extend(check_line(path, lnum, line, tokens, file_index))
+    return diagnostics
+
+# Diagnostics of a buffer, kept up to date as it changes.
+#
+# Results are stored per line, so they move along with lines inserted or
+# deleted above them. Lines waiting to be checked have no results yet.
+class BufferLint:
+    def __init__(self, bufnr):
+        self.bufnr = bufnr
+        self.tick = None
+        self.lines = []
+        # Whether each line starts inside a multiline string.
+        self._states = []
+        # Lists of diagnostic dicts for each line, or None if the line hasn't
+        # been checked since it changed.
+        self._results = []
+        self._pending = set()
+
+    def is_done(self):
+        return not self._pending
+
+    # Compare the lines of a new version of the buffer with the last one, and
+    # queue the lines that need to be checked again.
+    def update(self, lines, tick):
+        if tick == self.tick:
+            return
+        old_lines = self.lines
+        # Only the lines between the common prefix and suffix changed.
+        start = 0
+        limit = min(len(old_lines), len(lines))
+        while start < limit and old_lines[start] == lines[start]:
+            start += 1
+        old_end = len(old_lines)
+        new_end = len(lines)
+        while old_end > start and new_end > start and \
+                old_lines[old_end-1] == lines[new_end-1]:
+            old_end -= 1
+            new_end -= 1
+        changed = new_end - start
+        shift = changed - (old_end - start)
+        self._results = self._results[:start] + [None] * changed + \
+                        self._results[old_end:]
+        old_states = self._states[:start] + [None] * changed + self._states[old_end:]
+        self._pending = set(i for i in self._pending if i < start) | \
+                        set(i + shift for i in self._pending if i >= old_end) | \
+                        set(range(start, new_end))
+        self.lines = lines
+        self.tick = tick
+
+        # Lines after the change that now start in or out of a multiline
+        # string are changed too.
+        self._states = old_states
+        state = self._states[start - 1] if start > 0 else False
+        if start > 0:
+            state = index.tokenize_line(lines[start - 1], state)[1]
+        for i in range(start, len(lines)):
+            if i >= new_end and self._states[i] == state:
+                break
+            if self._states[i] != state:
+                self._states[i] = state
+                self._results[i] = None
+                self._pending.add(i)
+            state = index.tokenize_line(lines[i], state)[1]
+
+        # Changed declarations can change how any line in their scope
+        # resolves, e.g. 'extends' or the type of a var. Functions and classes
+        # can be called from anywhere in the class declaring them.
+        changed_lines = old_lines[start:old_end] + lines[start:new_end]
+        decls = [script.parse_decl(0, line, script.ANY_DECLS) for line in changed_lines]
+        if any(type(decl) in (script.FuncDecl, script.ClassDecl) or
+               line.lstrip().startswith("extends")
+               for (decl, line) in zip(decls, changed_lines)):
+            self._queue_scope(start + 1, True)
+        elif any(decls):
+            self._queue_scope(start + 1)
+
+    # Queue every line of the innermost scope containing 'lnum', or of the
+    # whole buffer if it's at the top level. If 'class_scope' is True, the
+    # innermost class is queued instead.
+    def _queue_scope(self, lnum, class_scope=False):
+        buffer_index = index.get_buffer_index()
+        scope = buffer_index.get_scope(lnum)
+        while class_scope and scope and buffer_index.scope_kinds.get(scope) != "class":
+            scope = scope[:-1]
+        start = 1
+        end = len(self.lines)
+        for (s_start, s_end, s) in buffer_index.ranges:
+            if s == scope and s_start <= lnum <= s_end:
+                (start, end) = (s_start, s_end)
+        for i in range(start - 1, min(end, len(self.lines))):
+            self._results[i] = None
+            self._pending.add(i)
+
+    # Check pending lines, nearest to the cursor first, for up to 'budget'
+    # seconds. Returns True once no lines are pending.
+    def run(self, budget, path, cursor_line=1):
+        deadline = time.time() + budget
+        source = util.get_context().source
+        file_index = index.get_buffer_index()
+        order = sorted(self._pending, key=lambda i: abs(i + 1 - cursor_line))
+        for i in order:
+            self._results[i] = self._check(source, file_index, path, i)
+            self._pending.discard(i)
+            if time.time() > deadline:
+                break
+        return self.is_done()
+
+    def _check(self, source, file_index, path, i):
+        line = self.lines[i]
+        (tokens, _) = index.tokenize_line(line, self._states[i])
+        if not any(t[1] == index.NAME for t in tokens):
+            return []
+        lnum = i + 1
+        util.set_context(util.Context(source, (lnum, len(line) + 1), "", False))
+        return check_line(path, lnum, line, tokens, file_index)
+
+    # Get the diagnostics of every checked line, with their current line
+    # numbers.
+    def get_diagnostics(self, path):
+        diagnostics = []
+        for (i, results) in enumerate(self._results):
+            for d in results or ():
+                d = dict(d, path=path, line=i + 1)
+                diagnostics.append(d)
+        return diagnostics
+
+# Maps buffer numbers to their BufferLint.
+_buffers = {}
+
+# Check the buffer of the active context for up to 'budget' seconds.
+# Returns (done, diagnostics). Diagnostics are only returned once every line
+# has been checked, so partial results don't flicker.
+def check_buffer(budget):
+    bufnr = util.get_buffer_number()
+    lint = _buffers.get(bufnr)
+    if not lint:
+        lint = _buffers[bufnr] = BufferLint(bufnr)
+    context = util.get_context()
+    tick = util.get_changedtick()
+    path = util.get_buffer_path()
+    cursor_line = util.get_cursor_line_num()
+    # Other buffers may have selected another project's version since.
+    classes.select_project(util.get_project_dir())
+    if tick != lint.tick:
+        lines = list(util.get_buffer_lines())
+        context.source = util.LinesSource(lines, path, bufnr, tick)
+        classes.pin_extends_chain(script.get_extended_class(1))
+        lint.update(lines, tick)
+    else:
+        context.source = util.LinesSource(lint.lines, path, bufnr, tick)
+    done = lint.run(budget, path, cursor_line)
+    util.set_context(context)
+    if not done:
+        return (False, None)
+    return (True, lint.get_diagnostics(path))
+
+def clear_buffer(bufnr):
+    _buffers.pop(bufnr, None)
@@ -0,0 +1,323 @@
+# Index of the nodes in a project's scenes, used to resolve node paths like
+# '$Sprite' or 'get_node("Body/Sprite")' to their types.
+#
+# A script can be attached to nodes in any number of scenes. When the project
+# is scanned, only the 'ext_resource' headers at the top of each '.tscn' file
+# are read, to map every script to the scenes using it. Looking up a node path
+# then only parses the scenes using the current script. Scene files are read
+# one line at a time rather than loaded whole, since only their section
+# headers and 'script' properties matter, and parsed scenes are cached until
+# the file's mtime changes.
+
+import io
+import os
+import re
+import time
+import posixpath
+from collections import namedtuple, OrderedDict
+
+import util
+
+# 'instance' is the res:// path of the scene the node is an instance of.
+SceneNode = namedtuple("SceneNode", "path, type, instance")
+
+_HEADER_PATTERN = re.compile(r"\[(\w+)\s*(.*)\]\s*$")
+_ATTR_PATTERN = re.compile(r'(\w+)\s*=\s*("(?:\\.|[^"\\])*"|\w+\([^)]*\)|[^\s\]]+)')
+_SCRIPT_PATTERN = re.compile(r"script\s*=\s*ExtResource\(\s*(\w+)\s*\)")
+_EXT_RESOURCE_PATTERN = re.compile(r"ExtResource\(\s*(\w+)\s*\)")
+
+# How long a project's list of scene files is trusted before it's refreshed.
+_RESCAN_INTERVAL = 30
+
+# Instanced scenes are followed at most this deep, in case of cycles.
+_MAX_INSTANCE_DEPTH = 8
+
+# Maps project directories to SceneIndex objects.
+_scene_indexes = {}
+
+# The nodes of a scene file.
+class Scene:
+    def __init__(self):
+        # Maps node paths to SceneNodes. The root node's path is ".", and
+        # other paths are relative to it.
+        self.nodes = OrderedDict()
+        # Maps node paths to the names of their children.
+        self.children = {}
+        # Maps res:// paths of scripts to the paths of the nodes using them.
+        self.scripts = {}
+
+    def add_node(self, node):
+        self.nodes[node.path] = node
+        if node.path != ".":
+            parent = posixpath.dirname(node.path) or "."
+            self.children.setdefault(parent, []).append(posixpath.basename(node.path))
+
+# Parse a scene file, or return None if it can't be read.
+def parse_scene(path):
+    scene = Scene()
+    ext_resources = {}
+    node = None
+    in_string = False
+    try:
+        with io.open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if in_string:
+                    in_string = _count_quotes(line) % 2 == 0
+                    continue
+                if _count_quotes(line) % 2 == 1:
+                    in_string = True
+                    continue
+                if line.startswith("["):
+                    node = None
+                    m = _HEADER_PATTERN.match(line)
+                    if not m:
+                        continue
+                    attrs = _parse_attrs(m.group(2))
+                    if m.group(1) == "ext_resource":
+                        ext_resources[attrs.get("id")] = attrs.get("path")
+                    elif m.group(1) == "node":
+                        node = _make_node(attrs, ext_resources)
+                        if node:
+                            scene.add_node(node)
+                elif node:
+                    m = _SCRIPT_PATTERN.match(line)
+                    if m and m.group(1) in ext_resources:
+                        script_path = ext_resources[m.group(1)]
+                        scene.scripts.setdefault(script_path, []).append(node.path)
+    except IOError:
+        return
+    return scene
+
+# Get the res:// paths of the scripts a scene file refers to, from the
+# 'ext_resource' headers that come before its nodes. Returns an empty set if
+# the file can't be read.
+def read_script_refs(path):
+    refs = set()
+    try:
+        with io.open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                if not line.startswith("["):
+                    continue
+                m = _HEADER_PATTERN.match(line)
+                if not m:
+                    continue
+                if m.group(1) == "ext_resource":
+                    attrs = _parse_attrs(m.group(2))
+                    if attrs.get("type") == "Script" and attrs.get("path"):
+                        refs.add(attrs["path"])
+                elif m.group(1) != "gd_scene":
+                    break
+    except IOError:
+        pass
+    return refs
+
+def _count_quotes(line):
+    return len(re.findall(r'(?<!\\)"', line.replace("\\\\", "")))
+
+def _parse_attrs(text):
+    attrs = {}
+    for (key, value) in _ATTR_PATTERN.findall(text):
+        if value.startswith('"'):
+            value = value[1:-1]
+        attrs[key] = value
+    return attrs
+
+def _make_node(attrs, ext_resources):
+    name = attrs.get("name")
+    if not name:
+        return
+    parent = attrs.get("parent")
+    if parent is None:
+        path = "."
+    elif parent == ".":
+        path = name
+    else:
+        path = "{}/{}".format(parent, name)
+    instance = None
+    m = _EXT_RESOURCE_PATTERN.match(attrs.get("instance", ""))
+    if m:
+        instance = ext_resources.get(m.group(1))
+    return SceneNode(path, attrs.get("type"), instance)
+
+# All scenes of a project, parsed on demand.
+class SceneIndex:
+    def __init__(self, root):
+        self.root = root
+        # Maps paths of scene files to (mtime, Scene), for parsed scenes.
+        self.files = {}
+        # Maps paths of scene files to (mtime, set of res:// script paths).
+        self._script_refs = {}
+        # Maps res:// script paths to the set of paths of scene files using
+        # them.
+        self._script_users = {}
+        self._scan_time = 0
+
+    # Refresh the list of scene files, and the scripts of the ones that
+    # changed since the last scan.
+    def scan(self):
+        mtimes = {}
+        for (dirpath, dirnames, filenames) in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for f in filenames:
+                if f.endswith(".tscn"):
+                    path = os.path.join(dirpath, f)
+                    try:
+                        mtimes[path] = os.path.getmtime(path)
+                    except OSError:
+                        pass
+        for path in list(self._script_refs):
+            if path not in mtimes:
+                self._set_script_refs(path, None, set())
+                del self._script_refs[path]
+        for path in list(self.files):
+            if path not in mtimes:
+                del self.files[path]
+        for (path, mtime) in mtimes.items():
+            entry = self._script_refs.get(path)
+            if not entry or entry[0] != mtime:
+                self._set_script_refs(path, mtime, read_script_refs(path))
+        self._scan_time = time.time()
+
+    def _set_script_refs(self, path, mtime, refs):
+        old = self._script_refs.get(path)
+        for res_path in old[1] if old else ():
+            users = self._script_users.get(res_path)
+            if users:
+                users.discard(path)
+        for res_path in refs:
+            self._script_users.setdefault(res_path, set()).add(path)
+        self._script_refs[path] = (mtime, refs)
+
+    # Get a parsed scene, reparsing it if the file changed.
+    def get_scene(self, path):
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            self.files.pop(path, None)
+            return
+        entry = self.files.get(path)
+        if entry and entry[0] == mtime:
+            return entry[1]
+        scene = parse_scene(path)
+        self.files[path] = (mtime, scene)
+        # Keep the scripts of scenes in the project up to date between scans.
+        if scene and path in self._script_refs:
+            self._set_script_refs(path, mtime, set(scene.scripts))
+        return scene
+
+    # Find the nodes a script is attached to, in the scenes that used it as of
+    # the last scan. Returns a list of (Scene, node path) pairs.
+    def find_script_nodes(self, script_path):
+        if time.time() - self._scan_time > _RESCAN_INTERVAL:
+            self.scan()
+        res_path = self.path_to_res(script_path)
+        results = []
+        for path in sorted(self._script_users.get(res_path, ())):
+            scene = self.get_scene(path)
+            if scene:
+                for node_path in scene.scripts.get(res_path, []):
+                    results.append((scene, node_path))
+        return results
+
+    # Get the type of the node at 'path' in 'scene'. Nodes of instanced and
+    # inherited scenes are looked up in the scene they come from.
+    def get_node_type(self, scene, path, depth=0):
+        node = scene.nodes.get(path)
+        if node and node.type:
+            return node.type
+        (instanced, rest) = self._find_instance(scene, path, depth)
+        if instanced:
+            return self.get_node_type(instanced, rest, depth + 1)
+
+    # Get (name, type) pairs for the children of the node at 'path' in 'scene'.
+    def get_children(self, scene, path, depth=0):
+        children = OrderedDict()
+        (instanced, rest) = self._find_instance(scene, path, depth)
+        if instanced:
+            for (name, node_type) in self.get_children(instanced, rest, depth + 1):
+                children[name] = node_type
+        for name in scene.children.get(path, []):
+            child_path = name if path == "." else "{}/{}".format(path, name)
+            children[name] = self.get_node_type(scene, child_path, depth)
+        return list(children.items())
+
+    # Find the nearest node at or above 'path' that is an instance of another
+    # scene. Returns (instanced Scene, path relative to its root).
+    def _find_instance(self, scene, path, depth):
+        if depth >= _MAX_INSTANCE_DEPTH:
+            return (None, None)
+        prefix = path
+        while True:
+            node = scene.nodes.get(prefix)
+            if node and node.instance:
+                instanced = self.get_scene(self.res_to_path(node.instance))
+                if not instanced:
+                    return (None, None)
+                if prefix == path:
+                    return (instanced, ".")
+                rest = path if prefix == "." else path[len(prefix)+1:]
+                return (instanced, rest)
+            if prefix == ".":
+                return (None, None)
+            prefix = posixpath.dirname(prefix) or "."
+
+    def path_to_res(self, path):
+        return "res://" + os.path.relpath(path, self.root).replace(os.sep, "/")
+
+    def res_to_path(self, res_path):
+        return os.path.join(self.root, res_path[len("res://"):])
+
+# Get the scene index of the current project.
+# Returns None if the current file isn't inside a Godot project.
+def get_scene_index():
+    root = util.get_project_dir()
+    if not root:
+        return
+    scenes = _scene_indexes.get(root)
+    if not scenes:
+        scenes = SceneIndex(root)
+        _scene_indexes[root] = scenes
+    return scenes
+
+def rescan_scenes():
+    scenes = get_scene_index()
+    if scenes:
+        scenes.scan()
+
+# Join a node path relative to the node at 'base'. Returns None for absolute
+# paths and paths leading out of the scene.
+def _join_path(base, path):
+    if path.startswith("/"):
+        return
+    joined = posixpath.normpath(posixpath.join(base, path))
+    if joined == ".." or joined.startswith("../"):
+        return
+    return joined
+
+# Get the type of the node at 'path', relative to the node the current script
+# is attached to. The first scene resolving the path wins.
+def get_node_type(path):
+    scenes = get_scene_index()
+    if not scenes:
+        return
+    for (scene, node_path) in scenes.find_script_nodes(util.get_buffer_path()):
+        joined = _join_path(node_path, path)
+        if joined:
+            node_type = scenes.get_node_type(scene, joined)
+            if node_type:
+                return node_type
+
+# Get (name, type) pairs for the children of the node at 'path', relative to
+# the node the current script is attached to, across every scene using it.
+def get_child_nodes(path):
+    scenes = get_scene_index()
+    if not scenes:
+        return []
+    children = OrderedDict()
+    for (scene, node_path) in scenes.find_script_nodes(util.get_buffer_path()):
+        joined = _join_path(node_path, path or ".")
+        if joined:
+            for (name, node_type) in scenes.get_children(scene, joined):
+                if not children.get(name):
+                    children[name] = node_type
+    return list(children.items())
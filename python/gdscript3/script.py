@@ -5,14 +5,20 @@ from collections import namedtuple
 
 import util
 import classes
+import scene
 
 # Regex patterns for user declarations.
 _VAR_PATTERN = "\s*(?:export(?:\(.*\)\s+)?)?var\s+(\w+)"
 _CONST_PATTERN = "\s*const\s+(\w+)\s*=\s*(.+)"
-_FUNC_PATTERN = "\s*(static\s+)?func\s+(\w+)\(((\w|,|\s)*)\):"
+_FUNC_PATTERN = "\s*(static\s+)?func\s+(\w+)\s*\((.*)\)"
 _ENUM_PATTERN = "\s*enum\s+(\w+)"
-_ENUM_VALUES_PATTERN = "\s*enum\s+\w+\s*\{(.*)\}"
 _CLASS_PATTERN = "\s*class\s+(\w+)(?:\s+extends\s+(\w+))?"
+_SIGNAL_PATTERN = "\s*signal\s+(\w+)\s*(?:\((.*)\))?"
+
+# Node paths at the end of a line: '$Path/To/Node', '$"Path"' or 'get_node("Path")'.
+_NODE_PATH_PATTERN = re.compile(
+        r'(?:(?<![\w.])|(?<=\bself\.))'
+        r'(?:\$(?:"([^"]*)"|([\w/]+))|get_node\(\s*"([^"]*)"\s*\))$')
 
 # Flags for choosing which decl types to gather.
 VAR_DECLS = 1
@@ -21,6 +27,8 @@ FUNC_DECLS = 4
 ENUM_DECLS = 8
 CLASS_DECLS = 16
 ANY_DECLS = VAR_DECLS | CONST_DECLS | FUNC_DECLS | ENUM_DECLS | CLASS_DECLS
+# Signals can't be referenced by name in code, so they're not in ANY_DECLS.
+SIGNAL_DECLS = 32
 
 # These store info about user-declared items in the script.
 VarDecl = namedtuple("VarDecl", "line, name, type")
@@ -28,6 +36,7 @@ ConstDecl = namedtuple("ConstDecl", "line, name, value")
 FuncDecl = namedtuple("FuncDecl", "line, static, name, args")
 EnumDecl = namedtuple("EnumDecl", "line, name")
 ClassDecl = namedtuple("ClassDecl", "line, name, extends")
+SignalDecl = namedtuple("SignalDecl", "line, name, args")
 
 # These store parts of a "token chain". See 'get_token_chain()' for more info.
 VariableToken = namedtuple("VariableToken", "name, type")
@@ -41,8 +50,12 @@ class SuperAccessorToken: pass
 # Parse a user declaration.
 # 'flags' indicates which decl types to look for.
 def _get_decl(lnum, flags):
-    line = util.get_line(lnum)
+    return parse_decl(lnum, util.get_line(lnum), flags)
 
+# Parse a user declaration from the text of a line.
+# Unlike '_get_decl()', this doesn't touch the buffer, so it can be used on
+# lines read from any file.
+def parse_decl(lnum, line, flags):
     if flags & VAR_DECLS:
         m = re.match(_VAR_PATTERN, line)
         if m:
@@ -58,9 +71,7 @@ def _get_decl(lnum, flags):
         if m:
             static = m.group(1) != None
             name = m.group(2)
-            args = m.group(3)
-            if args:
-                args = [a.strip() for a in args.split(",")]
+            args = _split_args(m.group(3))
             return FuncDecl(lnum, static, name, args)
 
     if flags & ENUM_DECLS:
@@ -73,6 +84,32 @@ def _get_decl(lnum, flags):
         if m:
             return ClassDecl(lnum, m.group(1), m.group(2))
 
+    if flags & SIGNAL_DECLS:
+        m = re.match(_SIGNAL_PATTERN, line)
+        if m:
+            return SignalDecl(lnum, m.group(1), _split_args(m.group(2) or ""))
+
+# Split a function's argument list into argument names, ignoring default
+# values and type hints. Commas nested in brackets don't separate arguments,
+# and an unmatched ')' ends the list.
+def _split_args(text):
+    args = []
+    depth = 0
+    start = 0
+    for i, char in enumerate(text + ")"):
+        if char in "([{":
+            depth += 1
+        elif char in "]}" or char == ")" and depth > 0:
+            depth -= 1
+        elif char == "," and depth == 0 or char == ")":
+            m = re.match("\s*([A-Za-z_]\w*)", text[start:i])
+            if m:
+                args.append(m.group(1))
+            if char == ")":
+                break
+            start = i + 1
+    return args
+
 # Map function arguments to VarDecls.
 # Arguments are treated as VarDecls for simplicity's sake.
 # If the function overrides a built-in method, the arg types are mapped as well.
@@ -267,24 +304,6 @@ def get_extended_class(start_line=None):
         elif line and not re.match("tool\s*$", line) and not re.match("\s*\#", line):
             return None
 
-def get_enum_values(line_num):
-    lines = [util.strip_line(line_num, util.get_line(line_num))]
-    line_count = util.get_line_count()
-    while not lines[-1].endswith("}"):
-        line_num += 1
-        if line_num > line_count:
-            return
-        lines.append(util.strip_line(line_num, util.get_line(line_num)))
-    m = re.match(_ENUM_VALUES_PATTERN, "\n".join(lines), re.DOTALL)
-    if m:
-        values = [v.strip() for v in m.group(1).replace("\n", ",").split(",")]
-        def map_value(v):
-            m = re.match("(\w+)(?:\s*=\s*(.*))?", v)
-            if m:
-                return ConstDecl(-1, m.group(1), m.group(2))
-        return list(filter(lambda v: v, map(map_value, values)))
-
-
 # A token chain is a group of tokens chained via dot accessors.
 # "Token" is a loose term referring to anything that produces a value.
 # Example:
@@ -293,6 +312,16 @@ def get_enum_values(line_num):
 #
 # A token chain is only considered valid if every token has a discernible type.
 def get_token_chain(line, line_num, start_col):
+    # Node paths get their type from the scenes using this script.
+    m = _NODE_PATH_PATTERN.search(line[:start_col])
+    if m:
+        path = m.group(1) or m.group(2) or m.group(3)
+        node_type = scene.get_node_type(path)
+        if node_type:
+            return [VariableToken(path, node_type)]
+        elif m.group(3) is None:
+            return [VariableToken(path, "Node")]
+
     i = start_col
     paren_count = 0
     is_method = False
@@ -0,0 +1,378 @@
+# Fuzzy search over the declarations of every script in a project, and
+# optionally the Godot API.
+#
+# Names are indexed by their trigrams, and by the trigrams of their initials
+# (e.g. "gnm" for 'get_node_map'). A query only looks at names sharing most of
+# its trigrams, which are then scored by how well they match. The index is
+# cached on disk, along with the mtime and size of each script, so opening a
+# project only parses scripts that changed since the last session.
+
+import os
+import re
+import json
+import heapq
+import hashlib
+from array import array
+from collections import namedtuple, Counter
+
+import util
+import classes
+import index
+
+# Bump this when the cached data changes, to reparse every script.
+SYMBOLS_VERSION = 1
+
+# A search result. 'path' is None for items of the Godot API. 'container' is
+# the dotted name of the enclosing class or enum, if any.
+SymbolMatch = namedtuple("SymbolMatch", "name, kind, path, line, col, container, score")
+
+# Candidates are the names sharing the most trigrams with the query. Only this
+# many are scored.
+_MAX_CANDIDATES = 2000
+
+_WORD_PATTERN = re.compile(r"[A-Z]+(?![a-z])|[A-Z]?[a-z0-9]+")
+
+# Get the trigrams of a lowercase name. The name is padded at the start, so
+# queries of one or two characters match name prefixes.
+def _trigrams(key):
+    padded = "^^" + key
+    return set(padded[i:i+3] for i in range(len(padded) - 2))
+
+# Get the lowercase initials of the words of a name, e.g. "gnm" for
+# 'get_node_map' or "kb" for 'KinematicBody'.
+def _initials(name):
+    return "".join(w[0] for w in _WORD_PATTERN.findall(name)).lower()
+
+class SymbolIndex:
+    def __init__(self):
+        # Symbols are numbered by their position in these lists.
+        self._names = []
+        self._keys = []
+        # (kind, path, line, col, container) of each symbol.
+        self._info = []
+        # Maps trigrams to arrays of symbol numbers.
+        self._grams = {}
+        # Maps names to their trigrams. Most names are declared many times,
+        # e.g. '_ready'.
+        self._name_grams = {}
+        # Maps file paths to [stat key, list of symbol numbers].
+        self.files = {}
+        # Numbers of symbols of removed or changed files. They're skipped when
+        # searching, and dropped from the tables by 'compact()'.
+        self._dead = set()
+
+    def __len__(self):
+        return len(self._names) - len(self._dead)
+
+    # Add symbols, given as (name, kind, line, col, container) tuples.
+    # Symbols of a file replace the ones it had before.
+    def add_file(self, path, key, symbols):
+        self.remove_file(path)
+        numbers = []
+        # Maps trigrams to the numbers of this file's symbols having them, so
+        # each posting is extended once per file.
+        file_grams = {}
+        for (name, kind, line, col, container) in symbols:
+            n = len(self._names)
+            key_name = name.lower()
+            self._names.append(name)
+            self._keys.append(key_name)
+            self._info.append((kind, path, line, col, container))
+            grams = self._name_grams.get(name)
+            if grams is None:
+                grams = _trigrams(key_name) | _trigrams(_initials(name))
+                self._name_grams[name] = grams
+            for gram in grams:
+                file_grams.setdefault(gram, []).append(n)
+            numbers.append(n)
+        for (gram, gram_numbers) in file_grams.items():
+            posting = self._grams.get(gram)
+            if posting is None:
+                posting = self._grams[gram] = array("i")
+            posting.extend(gram_numbers)
+        self.files[path] = [key, numbers]
+
+    def remove_file(self, path):
+        entry = self.files.pop(path, None)
+        if entry:
+            self._dead.update(entry[1])
+            # Rebuild once most of the tables are dead weight.
+            if len(self._dead) > len(self._names) // 2:
+                self.compact()
+
+    # Get the symbols of a file as (name, kind, line, col, container) tuples.
+    def get_file_symbols(self, path):
+        entry = self.files.get(path)
+        if not entry:
+            return []
+        symbols = []
+        for n in entry[1]:
+            (kind, _, line, col, container) = self._info[n]
+            symbols.append((self._names[n], kind, line, col, container))
+        return symbols
+
+    # Rebuild the tables without the symbols of removed files.
+    def compact(self):
+        files = [(path, entry[0], self.get_file_symbols(path))
+                 for (path, entry) in self.files.items()]
+        self.__init__()
+        for (path, key, symbols) in files:
+            self.add_file(path, key, symbols)
+
+    # Get the tables as a JSON-compatible dict. The trigram postings are
+    # included, so loading doesn't have to compute them again. Symbols of
+    # removed files are kept, and are found again when loading, as the ones
+    # no file refers to.
+    def to_json(self):
+        return {
+            "names": self._names,
+            "info": [(kind, line, col, container)
+                     for (kind, path, line, col, container) in self._info],
+            "grams": dict((g, p.tolist()) for (g, p) in self._grams.items()),
+            "files": self.files,
+        }
+
+    @classmethod
+    def from_json(cls, obj):
+        self = cls()
+        self._names = obj["names"]
+        self._keys = [name.lower() for name in self._names]
+        paths = [None] * len(self._names)
+        dead = set(range(len(self._names)))
+        for (path, (key, numbers)) in obj["files"].items():
+            for n in numbers:
+                paths[n] = path
+            dead.difference_update(numbers)
+        self._dead = dead
+        self._info = [(kind, paths[n], line, col, container)
+                      for (n, (kind, line, col, container)) in enumerate(obj["info"])]
+        self._grams = dict((g, array("i", p)) for (g, p) in obj["grams"].items())
+        self.files = obj["files"]
+        return self
+
+    # Get the best 'limit' symbols matching 'query', best first.
+    def search(self, query, limit=50):
+        query = query.lower()
+        if len(query) < 3:
+            grams = _trigrams(query)
+        else:
+            # The padded trigrams would only match names starting with the
+            # query, which is left to the scoring.
+            grams = set(query[i:i+3] for i in range(len(query) - 2))
+        if not grams:
+            return []
+        counts = Counter()
+        for gram in grams:
+            posting = self._grams.get(gram)
+            if posting is not None:
+                counts.update(posting)
+        # Allow a few trigrams to be missing, for typos.
+        min_count = max(1, len(grams) - len(grams) // 3)
+        results = []
+        for (n, count) in counts.most_common(_MAX_CANDIDATES):
+            if count < min_count:
+                break
+            if n in self._dead:
+                continue
+            score = _score(query, self._keys[n], count / float(len(grams)))
+            results.append((score, -n))
+        matches = []
+        for (score, n) in heapq.nlargest(limit, results):
+            (kind, path, line, col, container) = self._info[-n]
+            matches.append(SymbolMatch(self._names[-n], kind, path, line, col,
+                                       container, score))
+        return matches
+
+# Score how well a lowercase name matches a query, given the fraction of the
+# query's trigrams it has. Exact and prefix matches come first, then matches at
+# word boundaries, then other substrings and subsequences. Shorter names win
+# ties.
+def _score(query, key, fraction):
+    score = fraction * 100
+    if key == query:
+        score += 400
+    else:
+        pos = key.find(query)
+        if pos == 0:
+            score += 300
+        elif pos > 0:
+            score += 200 if key[pos-1] == "_" else 150
+        elif _is_subsequence(query, key):
+            score += 50
+    return score - len(key) * 0.5
+
+def _is_subsequence(query, key):
+    it = iter(key)
+    return all(c in it for c in query)
+
+# Get the symbols worth searching for in a script, as (name, kind, line, col,
+# container) tuples. Locals are left out.
+def get_script_symbols(lines):
+    file_index = index.index_lines(lines)
+    symbols = []
+    for decl in file_index.decls:
+        if not file_index.is_local(decl):
+            symbols.append((decl.name, decl.kind, decl.line, decl.col,
+                            ".".join(decl.scope) or None))
+    return symbols
+
+# Get the symbols of the Godot API, as (name, kind, line, col, container)
+# tuples. Classes are read with 'classes.read_class', so building the index
+# doesn't push the classes in use out of the class cache.
+def get_api_symbols():
+    symbols = []
+    for c_name in classes.iter_class_names():
+        symbols.append((c_name, "class", 0, 0, None))
+        obj = classes.read_class(c_name)
+        if not obj:
+            continue
+        for member in obj.get("members", []):
+            symbols.append((member["name"], "var", 0, 0, c_name))
+        for constant in obj.get("constants", []):
+            symbols.append((constant["name"], "const", 0, 0, c_name))
+        for method in obj.get("methods", []):
+            symbols.append((method["name"], "func", 0, 0, c_name))
+    for (name, (c_name, signal)) in _iter_own_signals():
+        symbols.append((name, "signal", 0, 0, c_name))
+    global_scope = classes.get_global_scope()
+    if global_scope:
+        for constant in global_scope.iter_constants():
+            symbols.append((constant.name, "const", 0, 0, None))
+        for method in global_scope.iter_methods():
+            symbols.append((method.name, "func", 0, 0, None))
+    return symbols
+
+def _iter_own_signals():
+    for c_name in classes.iter_class_names():
+        for (name, signal) in classes.get_signals(c_name).items():
+            if signal[0] == c_name:
+                yield (name, signal)
+
+# Symbols of the scripts in a project, cached on disk between sessions.
+class ProjectSymbols:
+    def __init__(self, root):
+        self.root = root
+        self.index = SymbolIndex()
+        self.cache_path = _get_cache_path(root)
+        self.dirty = False
+
+    # Parse new and modified scripts, and drop deleted ones.
+    def scan(self):
+        seen = set()
+        for (dirpath, dirnames, filenames) in os.walk(self.root):
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for f in filenames:
+                if f.endswith(".gd"):
+                    path = os.path.join(dirpath, f)
+                    seen.add(path)
+                    self.update_file(path)
+        for path in list(self.index.files):
+            if path not in seen:
+                self.index.remove_file(path)
+                self.dirty = True
+
+    # Reparse a single script if it changed on disk.
+    def update_file(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            if path in self.index.files:
+                self.index.remove_file(path)
+                self.dirty = True
+            return
+        key = [st.st_mtime, st.st_size]
+        entry = self.index.files.get(path)
+        if entry and entry[0] == key:
+            return
+        lines = index.read_lines(path)
+        if lines is None:
+            return
+        self.index.add_file(path, key, get_script_symbols(lines))
+        self.dirty = True
+
+    def load(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                cache = json.load(f)
+            if cache.get("version") == SYMBOLS_VERSION:
+                self.index = SymbolIndex.from_json(cache["index"])
+        except (IOError, ValueError, KeyError, TypeError):
+            pass
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp_path = self.cache_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": SYMBOLS_VERSION, "index": self.index.to_json()},
+                          f, separators=(",", ":"))
+            os.rename(tmp_path, self.cache_path)
+            self.dirty = False
+        except (IOError, OSError):
+            pass
+
+def _get_cache_path(root):
+    digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(util.get_cache_dir(), "symbols-{}.json".format(digest))
+
+# Maps project directories to their ProjectSymbols.
+_projects = {}
+# Maps API versions to the SymbolIndex of their API.
+_api_indexes = {}
+
+# Get the symbols of the current project, loading the cache and scanning the
+# project the first time. Returns None outside of a Godot project.
+def get_project_symbols():
+    root = util.get_project_dir()
+    if not root:
+        return
+    project = _projects.get(root)
+    if not project:
+        project = ProjectSymbols(root)
+        project.load()
+        project.scan()
+        project.save()
+        _projects[root] = project
+    return project
+
+def get_api_index():
+    version = classes.get_version()
+    api_index = _api_indexes.get(version)
+    if not api_index:
+        api_index = SymbolIndex()
+        api_index.add_file(None, None, get_api_symbols())
+        _api_indexes[version] = api_index
+    return api_index
+
+# Search the symbols of the current project, and those of the Godot API if
+# 'include_api' is True. Returns a list of SymbolMatches, best first.
+def search(query, limit=50, include_api=False):
+    matches = []
+    project = get_project_symbols()
+    if project:
+        matches.extend(project.index.search(query, limit))
+    if include_api:
+        classes.select_project(util.get_project_dir())
+        matches.extend(get_api_index().search(query, limit))
+    # Project symbols win ties with API symbols.
+    matches.sort(key=lambda m: (-m.score, m.path is None))
+    return matches[:limit]
+
+# Update the symbols of a script in the current project after it's written.
+# Projects that haven't been searched yet are left alone.
+def update_file(path):
+    project = _projects.get(util.get_project_dir())
+    if project:
+        project.update_file(path)
+
+def rescan_project():
+    project = get_project_symbols()
+    if project:
+        project.scan()
+        project.save()
+
+# Write the symbols of every loaded project to the cache.
+def save():
+    for project in _projects.values():
+        project.save()
@@ -0,0 +1,229 @@
+# This is a standalone script that generates a ctags-format tags file for a
+# Godot project, without Vim or an external ctags. Declarations are found with
+# the plugin's own parser (see 'index.index_lines()'), so inner classes,
+# enums and their values get proper scope fields.
+#
+# Usage: python tags.py [options] [path/to/project]
+#        python tags.py --outline path/to/script.gd
+#
+# Scripts are parsed in a process pool. The tags file is updated in place:
+# entries of scripts that haven't changed since the last run (by mtime and
+# size) are kept, and only the entries of changed scripts are rewritten.
+# '--outline' prints the tags of a single script to stdout in source order,
+# which is what Tagbar expects (see 'ftplugin/gdscript3.vim').
+
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+import multiprocessing
+
+import util
+import script
+import index
+
+# Bump this when the output changes, to regenerate every entry.
+TAGS_VERSION = 2
+
+# Maps index decl kinds to ctags kind letters, following universal-ctags'
+# GDScript kinds. Enum values are "e" (enumerator).
+_INDEX_KINDS = {
+    "class": "c",
+    "func": "m",
+    "var": "v",
+    "const": "C",
+    "enum": "g",
+    "signal": "s",
+}
+
+# Scope field names for the kinds of the enclosing declaration.
+_SCOPE_FIELDS = {
+    "class": "class",
+    "enum": "enum",
+}
+
+_HEADER = [
+    "!_TAG_FILE_FORMAT\t2\t/extended format/",
+    "!_TAG_FILE_SORTED\t1\t/0=unsorted, 1=sorted, 2=foldcase/",
+    "!_TAG_PROGRAM_NAME\tgdscript3.vim tags.py\t//",
+]
+
+# Get the ctags lines for a list of lines, in source order.
+# 'tag_path' is the path written in each entry.
+def get_file_tags(lines, tag_path):
+    file_index = index.index_lines(lines)
+    tags = []
+    for decl in file_index.decls:
+        kind = _get_kind(file_index, decl)
+        if not kind:
+            continue
+        line = lines[decl.line - 1]
+        fields = [kind, "line:{}".format(decl.line)]
+        if decl.scope:
+            scope_kind = file_index.scope_kinds.get(decl.scope, "enum")
+            fields.append("{}:{}".format(_SCOPE_FIELDS[scope_kind],
+                                         ".".join(decl.scope)))
+        if kind == "m" or kind == "s":
+            func = script.parse_decl(decl.line, line,
+                                     script.FUNC_DECLS | script.SIGNAL_DECLS)
+            if func:
+                fields.append("signature:({})".format(", ".join(func.args)))
+        tags.append("{}\t{}\t/^{}$/;\"\t{}".format(
+            decl.name, tag_path, _escape_pattern(line), "\t".join(fields)))
+    return tags
+
+# Get the ctags kind letter of a decl, or None if it's a local.
+def _get_kind(file_index, decl):
+    if file_index.is_local(decl):
+        return
+    # Enums don't open a scope of their own in the index, so a scope without
+    # a kind is the enum a value belongs to.
+    if decl.kind == "const" and decl.scope and \
+            decl.scope not in file_index.scope_kinds:
+        return "e"
+    return _INDEX_KINDS[decl.kind]
+
+def _escape_pattern(line):
+    return line.replace("\\", "\\\\").replace("/", "\\/")
+
+# Worker entry point. Returns (relative path, stat key, tag lines).
+def _tags_job(job):
+    (path, rel_path, key) = job
+    lines = index.read_lines(path)
+    return (rel_path, key, get_file_tags(lines, rel_path) if lines else [])
+
+def _find_scripts(root):
+    paths = []
+    for (dirpath, dirnames, filenames) in os.walk(root):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for f in filenames:
+            if f.endswith(".gd"):
+                paths.append(os.path.join(dirpath, f))
+    return sorted(paths)
+
+def _stat_key(path):
+    st = os.stat(path)
+    return [st.st_mtime, st.st_size]
+
+def _default_state_path(tags_path):
+    digest = hashlib.sha1(tags_path.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(util.get_cache_dir(), "tags-{}.json".format(digest))
+
+def _load_state(path):
+    try:
+        with open(path, "r") as f:
+            state = json.load(f)
+        if state.get("version") == TAGS_VERSION:
+            return state.get("files", {})
+    except (IOError, ValueError):
+        pass
+    return {}
+
+def _save_state(path, files):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"version": TAGS_VERSION, "files": files}, f)
+    os.rename(tmp_path, path)
+
+# Read the entries of an existing tags file, grouped by file.
+# Returns None if there's no tags file.
+def _read_tags(path):
+    entries = {}
+    try:
+        with open(path, "r") as f:
+            for line in f:
+                if line.startswith("!_TAG_"):
+                    continue
+                fields = line.rstrip("\n").split("\t", 2)
+                if len(fields) == 3:
+                    entries.setdefault(fields[1], []).append(line.rstrip("\n"))
+    except IOError:
+        return
+    return entries
+
+def _write_tags(path, entries):
+    tags = [t for file_tags in entries.values() for t in file_tags]
+    # Sorted by name, as bytes, so Vim can binary search the file.
+    tags.sort(key=lambda t: t.encode("utf-8"))
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write("\n".join(_HEADER + tags) + "\n")
+    os.rename(tmp_path, path)
+
+def _print_outline(path):
+    lines = index.read_lines(path)
+    if lines is None:
+        print("Couldn't read '{}'".format(path), file=sys.stderr)
+        exit(2)
+    for tag in get_file_tags(lines, path):
+        print(tag)
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate tags for GDScript files.")
+    parser.add_argument("project", nargs="?", default=".",
+                        help="project directory, or any directory inside it")
+    parser.add_argument("-j", "--jobs", type=int, default=0,
+                        help="number of worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output",
+                        help="tags file (default: 'tags' in the project directory)")
+    parser.add_argument("--state", help="state file (default: in ~/.cache)")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="regenerate every entry, ignoring the existing file")
+    parser.add_argument("--outline", metavar="FILE",
+                        help="print the tags of a single script and exit")
+    args = parser.parse_args()
+
+    if args.outline:
+        _print_outline(args.outline)
+        return
+
+    root = util.find_project_dir(args.project)
+    if not root:
+        print("'{}' is not inside a Godot project".format(args.project), file=sys.stderr)
+        exit(2)
+
+    start = time.time()
+    tags_path = os.path.abspath(args.output or os.path.join(root, "tags"))
+    tags_dir = os.path.dirname(tags_path)
+    state_path = args.state or _default_state_path(tags_path)
+    old_entries = None if args.rebuild else _read_tags(tags_path)
+    # Without the old entries, every script has to be tagged again.
+    state = _load_state(state_path) if old_entries is not None else {}
+    old_entries = old_entries or {}
+
+    files = {}
+    entries = {}
+    jobs = []
+    for path in _find_scripts(root):
+        rel_path = os.path.relpath(path, tags_dir)
+        key = _stat_key(path)
+        if state.get(rel_path) == key:
+            files[rel_path] = key
+            entries[rel_path] = old_entries.get(rel_path, [])
+        else:
+            jobs.append((path, rel_path, key))
+    kept_count = len(files)
+
+    if jobs:
+        pool = multiprocessing.Pool(args.jobs or None)
+        try:
+            for (rel_path, key, tags) in pool.imap_unordered(_tags_job, jobs, 8):
+                files[rel_path] = key
+                entries[rel_path] = tags
+        finally:
+            pool.close()
+            pool.join()
+    # Skip rewriting the file if nothing changed, so Vim doesn't reread it.
+    if jobs or len(files) != len(state) or not os.path.exists(tags_path):
+        _write_tags(tags_path, entries)
+    _save_state(state_path, files)
+
+    elapsed = time.time() - start
+    print("Tagged {} script(s) ({} unchanged) in {:.2f}s: {} tag(s)".format(
+          len(files), kept_count, elapsed,
+          sum(len(t) for t in entries.values())), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
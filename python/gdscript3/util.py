@@ -1,115 +1,275 @@
 # Miscellaneous utility functions
 
 import os
-import vim
 import re
+import json
+import threading
+import contextlib
+
+try:
+    import vim
+except ImportError:
+    # Running outside of Vim, e.g. in the batch analyzer.
+    vim = None
 
 import util
 import script
 import classes
+import index
+
+# Buffer access goes through a "source". Inside Vim this is the current
+# buffer, but the batch analyzer reads scripts from disk with a LinesSource.
+class VimSource:
+    def get_cursor(self):
+        return (int(vim.eval("line('.')")), int(vim.eval("col('.')")))
+
+    def get_base(self):
+        return vim.eval("a:base")
+
+    def get_ignore_case(self, base):
+        ic = int(vim.eval("&ignorecase"))
+        sc = int(vim.eval("&smartcase"))
+        return ic and (not sc or not any(x.isupper() for x in base))
+
+    def get_line(self, line_num):
+        return vim.eval("getline({})".format(line_num))
+
+    def get_indent(self, line_num):
+        return int(vim.eval("indent({})".format(line_num)))
+
+    def get_syn_attr(self, line_num, col_num):
+        return vim.eval("synIDattr(synID({}, {}, 1), 'name')".format(line_num, col_num))
+
+    def get_line_count(self):
+        return int(vim.eval("line('$')"))
+
+    def get_buffer_number(self):
+        return int(vim.eval("bufnr('%')"))
+
+    def get_changedtick(self):
+        return int(vim.eval("b:changedtick"))
+
+    def get_lines(self):
+        return vim.current.buffer[:]
+
+    def get_path(self):
+        return vim.eval("expand('%:p')")
+
+# A script held in memory as a list of lines.
+# Syntax attributes are emulated with the tokenizer from 'index', covering the
+# "gdString" and "gdComment" groups that the completion code checks for.
+# Completion frameworks pass the buffer number and changedtick of the buffer
+# the lines came from, so buffer indexes are shared between requests.
+# The cursor and completion base aren't part of a source, so contexts using a
+# LinesSource have to be given them.
+class LinesSource:
+    _count = 0
+
+    def __init__(self, lines, path=None, bufnr=-1, changedtick=None):
+        self.lines = lines
+        self.path = path
+        self._bufnr = bufnr
+        # Without a changedtick, every source gets a unique tick, since its
+        # lines never change.
+        if changedtick is None:
+            LinesSource._count += 1
+            changedtick = -LinesSource._count
+        self._tick = changedtick
+        self._tokens = None
+
+    def get_cursor(self):
+        return (1, 1)
+
+    def get_base(self):
+        return ""
+
+    def get_ignore_case(self, base):
+        return False
+
+    def get_line(self, line_num):
+        if 0 < line_num <= len(self.lines):
+            return self.lines[line_num-1]
+        return ""
+
+    def get_indent(self, line_num):
+        return index._get_indent(self.get_line(line_num))
+
+    def get_syn_attr(self, line_num, col_num):
+        if self._tokens is None:
+            self._tokens = {}
+            for (lnum, col, kind, text) in index.iter_tokens(self.lines):
+                if kind == index.STRING or kind == index.COMMENT:
+                    self._tokens.setdefault(lnum, []).append((col, kind, text))
+        for (col, kind, text) in self._tokens.get(line_num, []):
+            if col < col_num <= col + len(text):
+                return "gdString" if kind == index.STRING else "gdComment"
+        return ""
 
-# Some commonly used values are cached every time completion is invoked
-# to minimize vim calls.
-_cursor_line_num = None
-_cursor_col_num = None
-_base = None
-_ignore_case = None
-
-_project_dir = None
-
-def clear_cache():
-    global _cursor_line_num
-    global _cursor_col_num
-    global _base
-    global _ignore_case
-    _cursor_line_num = None
-    _cursor_col_num = None
-    _base = None
-    _ignore_case = None
+    def get_line_count(self):
+        return len(self.lines)
+
+    def get_buffer_number(self):
+        return self._bufnr
+
+    def get_changedtick(self):
+        return self._tick
+
+    def get_lines(self):
+        return self.lines
+
+    def get_path(self):
+        return self.path
+
+# Everything a request works with: the buffer (as a source), the cursor, the
+# completion base, the case policy, and a sink for completions. Values not
+# given are read from the source the first time they're needed, then kept for
+# the rest of the request.
+#
+# Each thread has its own active context, so requests running in different
+# threads don't clobber each other's cursor or completions. Contexts reading
+# from Vim must only be used in Vim's thread. The module-level caches (classes,
+# index, scenes) are shared and not locked, so requests in different threads
+# must not run at the same time.
+class Context:
+    def __init__(self, source=None, cursor=None, base=None, ignore_case=None):
+        self.source = source or VimSource()
+        self._cursor = cursor
+        self._base = base
+        self._ignore_case = ignore_case
+        # Filled by 'completer'.
+        self.completions = None
+
+    def get_cursor(self):
+        if self._cursor is None:
+            self._cursor = tuple(self.source.get_cursor())
+        return self._cursor
+
+    def get_base(self):
+        if self._base is None:
+            self._base = self.source.get_base()
+        return self._base
+
+    def get_ignore_case(self):
+        if self._ignore_case is None:
+            self._ignore_case = bool(self.source.get_ignore_case(self.get_base()))
+        return self._ignore_case
+
+_local = threading.local()
+
+# Make 'context' the active context of the current thread.
+def set_context(context):
+    _local.context = context
+    return context
+
+# Get the active context of the current thread. Without one, a new context
+# reading from Vim is returned every time, so nothing is cached.
+def get_context():
+    context = getattr(_local, "context", None)
+    if context is None:
+        return Context()
+    return context
+
+# Make 'context' the active context for the duration of a 'with' block, then
+# restore the one that was active before, so a request's context doesn't
+# outlive it.
+@contextlib.contextmanager
+def using_context(context):
+    previous = getattr(_local, "context", None)
+    _local.context = context
+    try:
+        yield context
+    finally:
+        _local.context = previous
+
+# Maps directories to the root of the Godot project containing them.
+_project_dirs = {}
 
 def get_cursor_line_num():
-    global _cursor_line_num
-    if not _cursor_line_num:
-        _cursor_line_num = int(vim.eval("line('.')"))
-    return _cursor_line_num
+    return get_context().get_cursor()[0]
 
 def get_cursor_col_num():
-    global _cursor_col_num
-    if not _cursor_col_num:
-        _cursor_col_num = int(vim.eval("col('.')"))
-    return _cursor_col_num
+    return get_context().get_cursor()[1]
 
 def get_base():
-    global _base
-    if not _base:
-        _base = vim.eval("a:base")
-    return _base
+    return get_context().get_base()
 
 def get_ignore_case():
-    global _ignore_case
-    if not _ignore_case:
-        ic = int(vim.eval("&ignorecase"))
-        sc = int(vim.eval("&smartcase"))
-        _ignore_case = ic and (not sc or not any(x.isupper() for x in get_base()))
-    return _ignore_case
+    return get_context().get_ignore_case()
 
 def get_line(line_num=None):
-    if not line_num:
+    if line_num is None:
         line_num = get_cursor_line_num()
-    return vim.eval("getline({})".format(line_num))
+    return get_context().source.get_line(line_num)
 
 def get_indent(line_num):
     cur_line_num = get_cursor_line_num()
     cur_col_num = get_cursor_col_num()
-    indent = int(vim.eval("indent({})".format(line_num)))
+    indent = get_context().source.get_indent(line_num)
     if line_num == cur_line_num and cur_col_num < indent:
         return cur_col_num
     else:
         return indent
 
 def get_syn_attr(line_num=None, col_num=None):
-    if not line_num:
+    if line_num is None:
         line_num = get_cursor_line_num()
-    if not col_num:
+    if col_num is None:
         col_num = get_cursor_col_num() - 1
-    return vim.eval("synIDattr(synID({}, {}, 1), 'name')".  format(line_num, col_num))
+    return get_context().source.get_syn_attr(line_num, col_num)
 
 def get_line_count():
-    return int(vim.eval("line('$')"))
+    return get_context().source.get_line_count()
+
+def get_buffer_number():
+    return get_context().source.get_buffer_number()
+
+def get_changedtick():
+    return get_context().source.get_changedtick()
+
+def get_buffer_lines():
+    return get_context().source.get_lines()
+
+def get_buffer_path():
+    return get_context().source.get_path()
 
 def filter(s):
     base = get_base()
     ignore_case = get_ignore_case()
     return not base or re.match(base, s, re.I if ignore_case else 0)
 
-# Remove comment and trailing whitespace from a line.
-def strip_line(lnum, line):
-    # Check if a comment is present.
-    # Since comments extend all the way to the end of the line, all we have to
-    # do is check the syntax attribute of the last character.
-    if get_syn_attr(lnum, len(line)) != "gdComment":
-        return line.rstrip()
-    # Search for the start of the comment.
-    for i, char in enumerate(line):
-        if char == "#" and get_syn_attr(lnum, i+1) == "gdComment":
-            return line[0:i].rstrip()
-
-# Get the root directory of the current Godot project.
+# Convert a Python value to a Vim expression.
+# Unlike 'str()', this escapes strings in a way Vim understands.
+def to_vim(value):
+    return json.dumps(value, ensure_ascii=False)
+
+# Get the root directory of the Godot project containing the current file.
 # Once retrieved, the path is cached indefinitely.
 def get_project_dir():
-    global _project_dir
-    if not _project_dir:
-        cwd = os.getcwd()
-        os.chdir(vim.eval("expand('%:p:h')")) # Directory of current file.
-        try:
-            while not os.path.isfile("project.godot"):
-                os.chdir("..")
-                if os.getcwd() == "/":
-                    return
-            _project_dir = os.getcwd()
-        except:
-            pass
-        finally:
-            os.chdir(cwd)
-    return _project_dir
+    path = get_buffer_path()
+    if not path:
+        return
+    return find_project_dir(os.path.dirname(path))
+
+# Get the root directory of the Godot project containing 'path'.
+def find_project_dir(path):
+    path = os.path.abspath(path)
+    if path in _project_dirs:
+        return _project_dirs[path]
+    project_dir = path
+    while not os.path.isfile(os.path.join(project_dir, "project.godot")):
+        parent = os.path.dirname(project_dir)
+        if parent == project_dir:
+            project_dir = None
+            break
+        project_dir = parent
+    if project_dir:
+        _project_dirs[path] = project_dir
+    return project_dir
 
+# Get the directory for caches that persist between sessions.
+def get_cache_dir():
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    cache_dir = os.path.join(base, "vim-gdscript3")
+    if not os.path.isdir(cache_dir):
+        os.makedirs(cache_dir)
+    return cache_dir
@@ -0,0 +1,37 @@
+# ncm2 source calling the completion engine directly, instead of going
+# through the omnifunc and back. Runs in ncm2's own Python process.
+
+import os
+import sys
+import json
+
+import vim
+from ncm2 import Ncm2Source
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "python", "gdscript3"))
+
+import completer
+
+class Source(Ncm2Source):
+    def __init__(self, nvim):
+        super(Source, self).__init__(nvim)
+        completer.configure(dict(
+                (name, nvim.eval("get(g:, 'gdscript3_{}', {})".format(
+                                 name, json.dumps(default))))
+                for (name, default) in completer.OPTIONS))
+
+    def on_complete(self, ctx, lines, changedtick):
+        # ncm2 filters the results itself, so don't filter case-sensitively.
+        (start, completions) = completer.complete_lines(
+                lines, ctx["filepath"], ctx["lnum"], len(ctx["typed"]) + 1,
+                ignore_case=True, bufnr=ctx["bufnr"], changedtick=changedtick)
+        # ncm2 columns are 1-based byte offsets.
+        startccol = len(ctx["typed"][:start].encode("utf-8")) + 1
+        # Only the best matches are returned, so ask to be called again as the
+        # base changes.
+        self.complete(ctx, startccol, completions, True)
+
+source = Source(vim)
+
+on_complete = source.on_complete
@@ -0,0 +1,65 @@
+# Deoplete source calling the completion engine directly, instead of going
+# through the omnifunc and back.
+
+import os
+import re
+import sys
+
+try:
+    from deoplete.base.source import Base
+except ImportError:
+    from deoplete.source.base import Base
+
+sys.path.append(os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                             "..", "..", "..", "..", "python", "gdscript3"))
+
+import completer
+
+class Source(Base):
+    def __init__(self, vim):
+        super().__init__(vim)
+        self.name = "gdscript3"
+        self.mark = "[gd]"
+        self.filetypes = ["gdscript3"]
+        self.rank = 500
+        self.input_pattern = (r'\.\w*$|\bextends\s+\w*$|\bexport\(\w*$|'
+                              r'\bfunc\s+\w*$|"res://[^"]*$|\$[\w/]*$|'
+                              r'\bget_node\("[^"]*$|'
+                              r'\b(connect|disconnect|emit_signal|is_connected)'
+                              r'\(\s*"\w*$|\byield\(.+,\s*"\w*$')
+        # Only the best matches are returned, so they have to be gathered again
+        # as the base changes. They're already ranked.
+        self.is_volatile = True
+        self.sorters = []
+        self._start = None
+        self._completions = []
+
+    def on_init(self, context):
+        completer.configure(dict(
+                (name, self.vim.vars.get("gdscript3_" + name, default))
+                for (name, default) in completer.OPTIONS))
+
+    def get_complete_position(self, context):
+        (self._start, self._completions) = self._complete(context)
+        return self._start
+
+    def gather_candidates(self, context):
+        if self._start is None or context["complete_position"] != self._start:
+            (self._start, self._completions) = self._complete(context)
+        completions = self._completions
+        self._start = None
+        self._completions = []
+        return completions
+
+    def _complete(self, context):
+        buf = self.vim.current.buffer
+        line_num = context["position"][1]
+        col = len(context["input"]) + 1
+        base = re.search(r"[-\w]*$", context["input"]).group(0)
+        ignore_case = context.get("ignorecase") and not (
+                context.get("smartcase") and any(c.isupper() for c in base))
+        return completer.complete_lines(
+                buf[:], buf.name, line_num, col,
+                ignore_case=bool(ignore_case),
+                bufnr=context.get("bufnr", buf.number),
+                changedtick=context.get("changedtick"))
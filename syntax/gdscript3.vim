@@ -20,7 +20,7 @@ syn match   gdKeyword     "\v^\s*((static\s*)=func|class)"
                         \ nextgroup=gdFunction skipwhite
 syn keyword gdBoolean     true false
 
-syn match   gdMember   "\v<(\.)@<=[a-z_]+\w*>"
+syn match   gdMember   "\v(\.)@1<=<[a-z_]+\w*>"
 syn match   gdFunction "\v<\w*>(\()@="
 syn match   gdSignal "\v(<signal>\s+)@<=<\w+>"
 syn match   gdSetGet "\v(<setget>\s+)@<=<\w+>"
@@ -28,10 +28,90 @@ syn match   gdSetGet "\v(<setget>\s+\w*\s*,\s*)@<=<\w+>"
 
 syn keyword gdNull      null
 syn keyword gdClass     int float bool
-syn match   gdClass     "\v<\u\w+>"
-syn match   gdConstant  "\v<[A-Z_]+[A-Z0-9_]*>"
-syn keyword gdClass     AABB IP JSON OS RID
-syn match   gdNode      "\v\$\a+\w*"
+
+" Godot classes, global constants and global functions are keywords generated
+"" from the API database for the project's version (see 'gen_json.py'), which
+" Vim looks up in a hash table. The regexes matching any capitalized or upper
+" case word are tried at every position on every redraw, so they're only used
+" without a generated file, or with 'g:gdscript3_syntax_regex' set. Classes
+" declared with 'class_name' in the project and inner classes of the buffer
+" are keywords too, once the Python side has listed them (see
+" 'gdscript_highlight_classes()' in 'init.py').
+let s:json_dir = expand('<sfile>:p:h:h') . '/python/gdscript3/json/'
+" Maps project directories to the syntax file for their API version.
+if !exists('s:api_syntax_files')
+    let s:api_syntax_files = {}
+endif
+
+fun! s:CompareVersions(a, b)
+    let a = map(split(a:a, '\.'), 'str2nr(v:val)')
+    let b = map(split(a:b, '\.'), 'str2nr(v:val)')
+    return a == b ? 0 : a > b ? 1 : -1
+endfun
+
+" Pick the API version like 'classes.select_project()': the newest version
+" matching the project's 'config_version', or the base version.
+fun! s:NormalizeDir(dir)
+    return substitute(resolve(fnamemodify(expand(a:dir), ':p')), '/$', '', '')
+endfun
+
+fun! s:FindApiVersion(project_dir)
+    try
+        let versions = json_decode(join(readfile(s:json_dir . '@Versions.json'), ''))
+    catch
+        return ''
+    endtry
+    let api_version = get(g:, 'gdscript3_api_version', '')
+    if has_key(versions.versions, api_version)
+        return api_version
+    endif
+    for [dir, api_version] in items(get(g:, 'gdscript3_project_api_versions', {}))
+        if s:NormalizeDir(dir) ==# s:NormalizeDir(a:project_dir)
+                    \ && has_key(versions.versions, api_version)
+            return api_version
+        endif
+    endfor
+    let config_version = -1
+    if filereadable(a:project_dir . '/project.godot')
+        for line in readfile(a:project_dir . '/project.godot')
+            let m = matchlist(line, '\v^\s*config_version\s*\=\s*(\d+)')
+            if !empty(m)
+                let config_version = str2nr(m[1])
+                break
+            endif
+        endfor
+    endif
+    let matches = filter(keys(versions.versions),
+                       \ 'versions.versions[v:val] == config_version')
+    return empty(matches) ? versions.base : sort(matches, 's:CompareVersions')[-1]
+endfun
+
+fun! s:GetApiSyntaxFile()
+    let project_dir = fnamemodify(findfile('project.godot', expand('%:p:h') . ';'), ':p:h')
+    if !has_key(s:api_syntax_files, project_dir)
+        let api_version = exists('*json_decode') ? s:FindApiVersion(project_dir) : ''
+        let path = s:json_dir . api_version . '/@Syntax.vim'
+        if empty(api_version) || !filereadable(path)
+            let path = s:json_dir . '@Syntax.vim'
+        endif
+        let s:api_syntax_files[project_dir] = filereadable(path) ? path : ''
+    endif
+    return s:api_syntax_files[project_dir]
+endfun
+
+let s:api_syntax_file = s:GetApiSyntaxFile()
+if !empty(s:api_syntax_file)
+    execute 'source ' . fnameescape(s:api_syntax_file)
+endif
+if empty(s:api_syntax_file) || get(g:, 'gdscript3_syntax_regex', 0)
+    syn match   gdClass     "\v<\u\w+>"
+    syn match   gdConstant  "\v<[A-Z_]+[A-Z0-9_]*>"
+    syn keyword gdClass     AABB IP JSON OS RID
+endif
+if !empty(get(b:, 'gdscript3_user_classes', []))
+    execute 'syn keyword gdUserClass ' . join(b:gdscript3_user_classes)
+endif
+syn match   gdNode      "\v\$\a+\w*(/\a+\w*)*"
 
 syn region  gdString      start='\v\"' end='\v\"'
 syn region  gdString      start='\v\'' end='\v\''
@@ -78,7 +158,9 @@ hi def link gdSetGet   Function
 
 hi def link gdNull     Constant
 hi def link gdClass    Type
+hi def link gdUserClass gdClass
 hi def link gdConstant Constant
+hi def link gdGlobalFunction Function
 hi def link gdNode     Identifier
 
 hi def link gdString   String
@@ -18,6 +18,12 @@ let s:save_cpo = &cpo
 set cpo&vim
 
 function! SyntaxCheckers_gdscript3_godot_server_GetLocList() dict
+    " Use the persistent checker process when Python is available, instead of
+    " booting the engine for every check.
+    if get(g:, 'gdscript3_checker_persistent', 1) && exists('*GDScriptCheck')
+        return GDScriptCheck(self.getExec())
+    endif
+
     let makeprg = self.makeprgBuild({ 'args': '-s' })
 
     let errorformat =
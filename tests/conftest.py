@@ -0,0 +1,8 @@
+# The plugin's modules import each other as top-level modules, the way Vim
+# and the standalone scripts load them.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                                "..", "python", "gdscript3"))
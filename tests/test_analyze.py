@@ -0,0 +1,36 @@
+import os
+import sys
+import subprocess
+
+ANALYZE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                       "python", "gdscript3", "analyze.py")
+
+def analyze(tmp_path, config_version, *args):
+    project_dir = tmp_path.joinpath("project")
+    project_dir.mkdir()
+    project_dir.joinpath("project.godot").write_text(
+        "config_version={}\n".format(config_version))
+    project_dir.joinpath("a.gd").write_text("extends Node\nfunc _ready():\n    get_nod('x')\n")
+    cmd = [sys.executable, ANALYZE, "-f", "text", "-j", "1",
+           "--cache", str(tmp_path.joinpath("cache.json"))] + list(args) + [str(project_dir)]
+    p = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                         universal_newlines=True)
+    (out, err) = p.communicate()
+    return (p.returncode, out, err)
+
+def test_reports_diagnostics(tmp_path):
+    (status, out, err) = analyze(tmp_path, 3)
+    assert status == 1
+    assert out == "a.gd:3:5: error: Nonexistent method 'get_nod' in 'Node'\n"
+
+def test_unknown_version_fails(tmp_path):
+    (status, out, err) = analyze(tmp_path, 4)
+    assert status == 2
+    assert out == ""
+    assert "nothing was checked" in err
+
+def test_unknown_version_allowed(tmp_path):
+    assert analyze(tmp_path, 4, "--allow-unknown-version")[0] == 0
+
+def test_api_version_given(tmp_path):
+    assert analyze(tmp_path, 4, "--api-version", "3.0")[0] == 1
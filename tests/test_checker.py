@@ -0,0 +1,114 @@
+import os
+import sys
+import time
+
+import checker
+
+def _precheck(text):
+    return [(e.line, e.col, e.text) for e in checker.precheck(text.splitlines())]
+
+def test_precheck_accepts_valid_script():
+    assert _precheck('''extends Node
+
+func _ready():
+    var d = {
+        "a": [1, 2],
+    }
+    if d.has("a"): print("a")
+    var s = """
+    unbalanced ( in a string
+    """
+    for i in range(3):
+        print(i, \\
+              "x")
+''') == []
+
+def test_precheck_brackets():
+    assert _precheck("var a = foo(1, [2)\n") == [(1, 18, "Unexpected ')'"),
+                                                (1, 12, "Unclosed '('"),
+                                                (1, 16, "Unclosed '['")]
+    assert _precheck("var a = (\n") == [(1, 9, "Unclosed '('")]
+
+def test_precheck_strings_and_colons():
+    assert _precheck('var a = "abc\n') == [(1, 9, "Unterminated string")]
+    assert _precheck("func f()\n    pass\n") == [(1, 1, "Expected ':' after 'func' statement")]
+    assert _precheck("var a = 1\n    var b = 2\n") == [(2, 5, "Unexpected indent")]
+
+# Write an executable standing in for godot_server, running 'body' with the
+# queue directory as 'queue_dir'.
+def _fake_server(tmp_path, body):
+    path = tmp_path / "godot_server"
+    path.write_text("#!{}\nimport os, sys, time\nqueue_dir = sys.argv[-1]\n{}".format(
+                    sys.executable, body))
+    path.chmod(0o755)
+    return str(path)
+
+_ANSWERING_SERVER = '''
+while os.path.isdir(queue_dir):
+    for name in os.listdir(queue_dir):
+        if name.endswith(".req"):
+            req = os.path.join(queue_dir, name)
+            for res_path in open(req).read().split():
+                print("SCRIPT ERROR: GDScript::reload: Parse Error: bad")
+                print("   At: {}:3".format(res_path))
+            os.remove(req)
+            print("gdscript3:done " + name[:-4])
+            sys.stdout.flush()
+    time.sleep(0.01)
+'''
+
+def _make_script(tmp_path):
+    (tmp_path / "project.godot").write_text("config_version=3\n")
+    script = tmp_path / "a.gd"
+    script.write_text("extends Node\n")
+    return str(script)
+
+def _wait_until_done(path, project_dir):
+    deadline = time.time() + 5
+    while checker.is_pending(path, project_dir):
+        assert time.time() < deadline
+        time.sleep(0.02)
+
+def test_check_returns_engine_errors(tmp_path):
+    path = _make_script(tmp_path)
+    godot = _fake_server(tmp_path, _ANSWERING_SERVER)
+    (errors, pending) = checker.check(path, str(tmp_path), godot, debounce=0, wait=2)
+    assert not pending
+    assert [(e.path, e.line, e.text) for e in errors] == [(path, 3, "Parse Error: bad")]
+    checker._checkers.pop(str(tmp_path)).stop()
+
+def test_check_does_not_block(tmp_path):
+    path = _make_script(tmp_path)
+    godot = _fake_server(tmp_path, "time.sleep(0.5)\n" + _ANSWERING_SERVER)
+    start = time.time()
+    (errors, pending) = checker.check(path, str(tmp_path), godot, debounce=0, wait=0.05)
+    assert time.time() - start < 0.4
+    assert pending and errors == []
+    _wait_until_done(path, str(tmp_path))
+    (errors, pending) = checker.check(path, str(tmp_path), godot, debounce=0, wait=0)
+    assert not pending and len(errors) == 1
+    checker._checkers.pop(str(tmp_path)).stop()
+
+def test_check_reports_failures(tmp_path):
+    path = _make_script(tmp_path)
+    missing = str(tmp_path / "missing_godot")
+    (errors, pending) = checker.check(path, str(tmp_path), missing, debounce=0, wait=2)
+    assert not pending
+    assert errors[0].line == 1 and "Couldn't run godot_server" in errors[0].text
+    checker._checkers.pop(str(tmp_path)).stop()
+
+    hanging = _fake_server(tmp_path, "time.sleep(60)\n")
+    (errors, pending) = checker.check(path, str(tmp_path), hanging, debounce=0,
+                                      wait=0, timeout=0.2)
+    assert pending
+    _wait_until_done(path, str(tmp_path))
+    (errors, pending) = checker.check(path, str(tmp_path), hanging, debounce=0, wait=0)
+    assert "didn't answer within" in errors[0].text
+    checker._checkers.pop(str(tmp_path)).stop()
+
+    crashing = _fake_server(tmp_path, "sys.exit(3)\n")
+    os.utime(path, None)
+    (tmp_path / "a.gd").write_text("extends Node2D\n")
+    (errors, pending) = checker.check(path, str(tmp_path), crashing, debounce=0, wait=2)
+    assert not pending and "exited with status 3" in errors[0].text
+    checker._checkers.pop(str(tmp_path)).stop()
@@ -0,0 +1,17 @@
+import classes
+
+def test_missing_parent():
+    member = classes.GodotMember("size", "int")
+    c = classes.GodotClass("Orphan", "NoSuchClass", False, (member,), (), ())
+    assert c.get_inherited_class() is None
+    assert c.get_member("size") == member
+    assert c.get_member("other") is None
+    assert c.get_constant("OTHER") is None
+    assert c.get_method("other") is None
+    assert c.get_method("print", search_global=True).name == "print"
+
+def test_inherited_lookups():
+    c = classes.get_class("Node2D")
+    assert c.get_method("get_node").name == "get_node"
+    assert c.get_method("get_node", search_inherited=False) is None
+    assert c.get_constant("PAUSE_MODE_STOP").name == "PAUSE_MODE_STOP"
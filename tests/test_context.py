@@ -0,0 +1,36 @@
+import util
+import completer
+import lint
+
+LINES = [
+    "extends Node",
+    "func _ready():",
+    "    get_",
+]
+
+def test_using_context_restores_previous():
+    outer = util.Context(util.LinesSource(LINES, "/tmp/outer.gd"))
+    inner = util.Context(util.LinesSource(LINES, "/tmp/inner.gd"))
+    with util.using_context(outer):
+        with util.using_context(inner):
+            assert util.get_context() is inner
+        assert util.get_context() is outer
+    assert getattr(util._local, "context", None) is None
+
+def test_using_context_restores_on_error():
+    try:
+        with util.using_context(util.Context(util.LinesSource(LINES, "/tmp/a.gd"))):
+            raise ValueError()
+    except ValueError:
+        pass
+    assert getattr(util._local, "context", None) is None
+
+def test_complete_lines_leaves_no_context():
+    (start, completions) = completer.complete_lines(LINES, "/tmp/a.gd", 3, 9)
+    assert start == 4
+    assert "get_child(" in [c["word"] for c in completions]
+    assert getattr(util._local, "context", None) is None
+
+def test_check_lines_leaves_no_context():
+    lint.check_lines(LINES, "/tmp/a.gd")
+    assert getattr(util._local, "context", None) is None
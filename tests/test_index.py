@@ -0,0 +1,145 @@
+import index
+
+SCRIPT = """extends "res://base.gd"
+class_name Player
+
+signal hit(damage)
+
+const SPEED = 200
+var health = 100 # the "var" in this comment isn't a decl
+
+func take_damage(amount, source):
+    var left = health - amount
+    health = left
+    return left
+
+class Weapon extends Node:
+    var damage = 10
+
+    func fire(target):
+        target.take_damage(damage, self)
+
+func _ready():
+    var text = \"\"\"
+    var not_a_decl = 1
+    func not_a_func():
+    \"\"\"
+    take_damage(1, null)
+""".splitlines()
+
+def _decls(file_index, name):
+    return [(d.kind, d.line, d.scope) for d in file_index.find_decls(name)]
+
+def test_decls_and_scopes():
+    file_index = index.index_lines(SCRIPT, "player.gd")
+    assert file_index.extends == '"res://base.gd"'
+    assert file_index.class_name == "Player"
+    assert _decls(file_index, "hit") == [("signal", 4, ())]
+    assert _decls(file_index, "SPEED") == [("const", 6, ())]
+    assert _decls(file_index, "take_damage") == [("func", 9, ())]
+    assert _decls(file_index, "amount") == [("arg", 9, ("take_damage",))]
+    assert _decls(file_index, "left") == [("var", 10, ("take_damage",))]
+    assert _decls(file_index, "Weapon") == [("class", 14, ())]
+    assert _decls(file_index, "damage") == [("var", 15, ("Weapon",))]
+    assert _decls(file_index, "fire") == [("func", 17, ("Weapon",))]
+    assert file_index.scope_kinds[("Weapon",)] == "class"
+    assert file_index.scope_kinds[("Weapon", "fire")] == "func"
+
+def test_multiline_strings_are_not_indexed():
+    file_index = index.index_lines(SCRIPT)
+    assert file_index.find_decls("not_a_decl") == []
+    assert file_index.find_decls("not_a_func") == []
+    assert file_index.find_refs("not_a_decl") == []
+    # The function after the string still closes at the end of the file.
+    assert (20, 25, ("_ready",)) in file_index.ranges
+
+def test_get_scope():
+    file_index = index.index_lines(SCRIPT)
+    assert file_index.get_scope(7) == ()
+    assert file_index.get_scope(11) == ("take_damage",)
+    assert file_index.get_scope(18) == ("Weapon", "fire")
+
+def test_refs_skip_comments_and_keywords():
+    file_index = index.index_lines(SCRIPT, "player.gd")
+    refs = [(r.line, r.col) for r in file_index.find_refs("health")]
+    assert refs == [(7, 4), (10, 15), (11, 4)]
+    assert file_index.find_refs("var") == []
+
+def test_resolve_prefers_innermost_scope():
+    lines = """var value = 1
+
+func f():
+    print(value)
+    var value = 2
+    print(value)
+""".splitlines()
+    file_index = index.index_lines(lines)
+    # Locals only count once they're declared.
+    assert file_index.resolve("value", 4).line == 1
+    assert file_index.resolve("value", 6).line == 5
+
+def test_is_local():
+    file_index = index.index_lines(SCRIPT)
+    (left,) = file_index.find_decls("left")
+    (damage,) = file_index.find_decls("damage")
+    (amount,) = file_index.find_decls("amount")
+    assert file_index.is_local(left)
+    assert file_index.is_local(amount)
+    assert not file_index.is_local(damage)
+
+def test_continued_lines_dont_open_scopes():
+    lines = """var x = foo(1,
+    2)
+var y = \\
+    3
+func g():
+    pass
+""".splitlines()
+    file_index = index.index_lines(lines)
+    assert _decls(file_index, "y") == [("var", 3, ())]
+    assert _decls(file_index, "g") == [("func", 5, ())]
+
+ENUMS = """enum State { IDLE, RUN = 5, JUMP }
+enum Flags {
+    A = 1 << 0, # first
+    B = 1 << 1,
+    C, D = -2, E
+}
+enum { TOP, BOTTOM = TOP + 3, LEFT }
+""".splitlines()
+
+def _values(values):
+    return [(v.line, v.name, v.value) for v in values]
+
+def test_enum_values():
+    file_index = index.index_lines(ENUMS)
+    assert _values(file_index.get_enum_values(1)) == [
+            (1, "IDLE", "0"), (1, "RUN", "5"), (1, "JUMP", "6")]
+    assert _values(file_index.get_enum_values(2)) == [
+            (3, "A", "1 << 0"), (4, "B", "1 << 1"), (5, "C", "(1 << 1) + 1"),
+            (5, "D", "-2"), (5, "E", "-1")]
+
+def test_enum_decls():
+    file_index = index.index_lines(ENUMS)
+    assert _decls(file_index, "State") == [("enum", 1, ())]
+    assert _decls(file_index, "RUN") == [("const", 1, ("State",))]
+    assert _decls(file_index, "C") == [("const", 5, ("Flags",))]
+    # Values of anonymous enums are constants of the enclosing class.
+    assert _decls(file_index, "TOP") == [("const", 7, ())]
+    assert _values(index.parse_enum(ENUMS, 7)) == [
+            (7, "TOP", "0"), (7, "BOTTOM", "TOP + 3"), (7, "LEFT", "(TOP + 3) + 1")]
+
+def test_project_class_names(tmp_path):
+    scripts = {
+        "player.gd": "extends KinematicBody2D\nclass_name Player\nclass Inner:\n    pass\n",
+        "enemy.gd": "class_name Enemy, \"res://icon.png\"\nextends Node2D\n",
+        "util.gd": "extends Reference\n",
+    }
+    for (name, text) in scripts.items():
+        tmp_path.joinpath(name).write_text(text)
+    project = index.ProjectIndex(str(tmp_path))
+    project.scan()
+    assert project.get_class_names() == set(["Player", "Enemy"])
+    tmp_path.joinpath("enemy.gd").unlink()
+    project.scan()
+    assert project.get_class_names() == set(["Player"])
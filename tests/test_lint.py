@@ -0,0 +1,182 @@
+import os
+
+import util
+import classes
+import lint
+
+def make_project(tmp_path, config_version=3):
+    with open(os.path.join(str(tmp_path), "project.godot"), "w") as f:
+        f.write("config_version={}\n".format(config_version))
+    return str(tmp_path)
+
+def check(tmp_path, lines, config_version=3):
+    project_dir = make_project(tmp_path, config_version)
+    classes.select_project(project_dir)
+    path = os.path.join(project_dir, "a.gd")
+    return [(d["line"], d["code"], d["message"]) for d in lint.check_lines(lines, path)]
+
+def test_builtin_member(tmp_path):
+    found = check(tmp_path, [
+        "extends Node",
+        "func _ready():",
+        "    var l = Vector2(1, 2).lenght()",
+        "    var n = OS.get_nmae()",
+    ])
+    assert found == [
+        (3, "unknown-method", "Nonexistent method 'lenght' in 'Vector2'"),
+        (4, "unknown-method", "Nonexistent method 'get_nmae' in 'OS'"),
+    ]
+
+def test_class_constants(tmp_path):
+    found = check(tmp_path, [
+        "extends Node",
+        "func _ready():",
+        "    var a = Node.PAUSE_MODE_STOPP",
+        "    var b = Node.PAUSE_MODE_STOP",
+        "    var c = Vector2.ZERO",
+        "    var d = Color.red",
+    ])
+    assert found == [(3, "unknown-constant",
+                      "Nonexistent constant 'PAUSE_MODE_STOPP' in 'Node'")]
+
+def test_own_methods(tmp_path):
+    found = check(tmp_path, [
+        "extends Node",
+        "signal hit(damage)",
+        "export(int) var speed = 1",
+        "func _ready():",
+        "    get_nod('x')",
+        "    self.get_nod('x')",
+        "    get_node('x')",
+        "    self.get_node('x')",
+        "    helper()",
+        "    self.helper()",
+        "    print(len([1]), Dictionary())",
+        "    if (speed > 1):",
+        "        yield(get_tree(), 'idle_frame')",
+        "func helper():",
+        "    pass",
+    ])
+    assert found == [
+        (5, "unknown-method", "Nonexistent method 'get_nod' in 'Node'"),
+        (6, "unknown-method", "Nonexistent method 'get_nod' in 'Node'"),
+    ]
+
+def test_own_methods_in_inner_class(tmp_path):
+    found = check(tmp_path, [
+        "extends Node",
+        "class Inner extends Reference:",
+        "    func inner_only():",
+        "        inner_only()",
+        "        helper()",
+        "        get_node('x')",
+        "func _ready():",
+        "    inner_only()",
+        "static func helper():",
+        "    pass",
+    ])
+    assert found == [
+        (6, "unknown-method", "Nonexistent method 'get_node' in 'Reference'"),
+        (8, "unknown-method", "Nonexistent method 'inner_only' in 'Node'"),
+    ]
+
+def test_unknown_base_not_checked(tmp_path):
+    assert check(tmp_path, [
+        'extends "res://base.gd"',
+        "func _ready():",
+        "    base_method()",
+    ]) == []
+
+def test_other_objects_not_checked(tmp_path):
+    assert check(tmp_path, [
+        "extends Node",
+        "func _ready():",
+        "    get_tree().get_nod('x')",
+        "    var n = get_node('x')",
+        "    n.get_nod('x')",
+    ]) == []
+
+def test_unknown_version_not_checked(tmp_path):
+    assert check(tmp_path, [
+        "extends Node",
+        "func _ready():",
+        "    get_nod('x')",
+        "    var a = Node.PAUSE_MODE_STOPP",
+    ], config_version=4) == []
+    assert not classes.is_version_exact()
+
+def test_project_version_override(tmp_path):
+    project_dir = make_project(tmp_path, 4)
+    try:
+        classes.configure(project_versions={project_dir: classes.get_versions()[0]})
+        classes.select_project(project_dir)
+        assert classes.is_version_exact()
+    finally:
+        classes.configure(project_versions={})
+    classes.select_project(project_dir)
+    assert not classes.is_version_exact()
+
+# Check a version of a buffer with 'lint.check_buffer()', as Vim does.
+# Returns the buffer's BufferLint and the diagnostics as (line, message)
+# tuples.
+def lint_buffer(project_dir, lines, tick, bufnr=1):
+    source = util.LinesSource(lines, os.path.join(project_dir, "a.gd"), bufnr, tick)
+    with util.using_context(util.Context(source, (1, 1), "", False)):
+        (done, diagnostics) = lint.check_buffer(10)
+    assert done
+    return (lint._buffers[bufnr], [(d["line"], d["message"]) for d in diagnostics])
+
+# Apply a version of a buffer without checking it.
+def update_buffer(project_dir, buffer_lint, lines, tick):
+    source = util.LinesSource(lines, os.path.join(project_dir, "a.gd"),
+                              buffer_lint.bufnr, tick)
+    with util.using_context(util.Context(source, (1, 1), "", False)):
+        buffer_lint.update(lines, tick)
+
+ERROR = "Nonexistent method 'get_nmae' in 'OS'"
+
+def test_buffer_insert_and_delete(tmp_path):
+    project_dir = make_project(tmp_path)
+    lines = ["extends Node", "func _ready():", "    OS.get_nmae()"]
+    (buffer_lint, found) = lint_buffer(project_dir, lines, 1)
+    assert found == [(3, ERROR)]
+
+    inserted = lines[:2] + ["    print(1)", "    print(2)"] + lines[2:]
+    update_buffer(project_dir, buffer_lint, inserted, 2)
+    # Only the new lines are checked again; the error moves down with its line.
+    assert buffer_lint._pending == set([2, 3])
+    assert [(d["line"], d["message"]) for d in buffer_lint.get_diagnostics("a.gd")] \
+        == [(5, ERROR)]
+    assert lint_buffer(project_dir, inserted, 2)[1] == [(5, ERROR)]
+
+    deleted = inserted[:2] + inserted[3:]
+    update_buffer(project_dir, buffer_lint, deleted, 3)
+    assert buffer_lint._pending == set()
+    assert lint_buffer(project_dir, deleted, 3)[1] == [(4, ERROR)]
+    lint.clear_buffer(1)
+
+def test_buffer_multiline_string(tmp_path):
+    project_dir = make_project(tmp_path)
+    lines = ["extends Node", "func _ready():", "    var s = 1", "    OS.get_nmae()",
+             '    s = 2 # """']
+    assert lint_buffer(project_dir, lines, 1)[1] == [(4, ERROR)]
+    # Opening a string above the error makes it part of the string.
+    opened = lines[:2] + ['    var s = """'] + lines[3:]
+    (buffer_lint, found) = lint_buffer(project_dir, opened, 2)
+    assert found == []
+    assert lint_buffer(project_dir, lines, 3)[1] == [(4, ERROR)]
+    lint.clear_buffer(1)
+
+def test_buffer_requeues_scope_of_changed_decls(tmp_path):
+    project_dir = make_project(tmp_path)
+    lines = ["extends Node", "func _ready():", "    helper()", "    get_node('x')"]
+    assert lint_buffer(project_dir, lines, 1)[1] == \
+        [(3, "Nonexistent method 'helper' in 'Node'")]
+    # Declaring the function fixes the call above it.
+    declared = lines + ["func helper():", "    pass"]
+    assert lint_buffer(project_dir, declared, 2)[1] == []
+    # Changing 'extends' checks every line again.
+    rebased = ["extends Reference"] + declared[1:]
+    assert lint_buffer(project_dir, rebased, 3)[1] == \
+        [(4, "Nonexistent method 'get_node' in 'Reference'")]
+    lint.clear_buffer(1)
@@ -0,0 +1,94 @@
+import os
+
+import scene
+
+PLAYER_SCENE = '''[gd_scene load_steps=4 format=2]
+
+[ext_resource path="res://player.gd" type="Script" id=1]
+[ext_resource path="res://weapon.tscn" type="PackedScene" id=2]
+[ext_resource path="res://icon.png" type="Texture" id=3]
+
+[sub_resource type="RectangleShape2D" id=1]
+extents = Vector2( 10, 10 )
+
+[node name="Player" type="KinematicBody2D"]
+script = ExtResource( 1 )
+
+[node name="Sprite" type="Sprite" parent="."]
+texture = ExtResource( 3 )
+
+[node name="Label" type="Label" parent="Sprite"]
+text = "first line
+[node name=\\"Fake\\" type=\\"Node\\"]
+last line"
+
+[node name="Weapon" parent="." instance=ExtResource( 2 )]
+position = Vector2( 4, 0 )
+'''
+
+WEAPON_SCENE = '''[gd_scene load_steps=2 format=2]
+
+[ext_resource path="res://weapon.gd" type="Script" id=1]
+
+[node name="Weapon" type="Node2D"]
+script = ExtResource( 1 )
+
+[node name="Muzzle" type="Position2D" parent="."]
+'''
+
+LEVEL_SCENE = '''[gd_scene load_steps=2 format=2]
+
+[ext_resource path="res://level.gd" type="Script" id=1]
+
+[node name="Level" type="Node"]
+script = ExtResource( 1 )
+'''
+
+def _make_project(tmp_path):
+    (tmp_path / "project.godot").write_text("config_version=3\n")
+    (tmp_path / "player.tscn").write_text(PLAYER_SCENE)
+    (tmp_path / "weapon.tscn").write_text(WEAPON_SCENE)
+    (tmp_path / "level.tscn").write_text(LEVEL_SCENE)
+    return scene.SceneIndex(str(tmp_path))
+
+def test_parse_scene(tmp_path):
+    _make_project(tmp_path)
+    player = scene.parse_scene(str(tmp_path / "player.tscn"))
+    assert list(player.nodes) == [".", "Sprite", "Sprite/Label", "Weapon"]
+    assert player.nodes["Sprite"].type == "Sprite"
+    assert player.nodes["Weapon"] == scene.SceneNode("Weapon", None, "res://weapon.tscn")
+    assert player.children == {".": ["Sprite", "Weapon"], "Sprite": ["Label"]}
+    assert player.scripts == {"res://player.gd": ["."]}
+
+def test_instanced_scenes(tmp_path):
+    scenes = _make_project(tmp_path)
+    player = scenes.get_scene(str(tmp_path / "player.tscn"))
+    assert scenes.get_node_type(player, "Weapon") == "Node2D"
+    assert scenes.get_node_type(player, "Weapon/Muzzle") == "Position2D"
+    assert scenes.get_children(player, "Weapon") == [("Muzzle", "Position2D")]
+    assert scenes.get_children(player, ".") == [("Sprite", "Sprite"), ("Weapon", "Node2D")]
+
+def test_find_script_nodes_only_parses_users(tmp_path):
+    scenes = _make_project(tmp_path)
+    results = scenes.find_script_nodes(str(tmp_path / "weapon.gd"))
+    assert [(s.nodes["."].type, path) for (s, path) in results] == [("Node2D", ".")]
+    assert list(scenes.files) == [str(tmp_path / "weapon.tscn")]
+    assert scenes.find_script_nodes(str(tmp_path / "missing.gd")) == []
+
+def test_find_script_nodes_follows_edits(tmp_path):
+    scenes = _make_project(tmp_path)
+    level_path = str(tmp_path / "level.tscn")
+    assert scenes.find_script_nodes(str(tmp_path / "weapon.gd"))[0][1] == "."
+    # The level now uses the weapon script on a child node.
+    with open(level_path, "w") as f:
+        f.write(LEVEL_SCENE.replace("res://level.gd", "res://weapon.gd") +
+                '\n[node name="Gun" type="Node2D" parent="."]\n'
+                'script = ExtResource( 1 )\n')
+    os.utime(level_path, (1, 1))
+    scenes.scan()
+    results = scenes.find_script_nodes(str(tmp_path / "weapon.gd"))
+    assert sorted(path for (s, path) in results) == [".", ".", "Gun"]
+    assert scenes.find_script_nodes(str(tmp_path / "level.gd")) == []
+    os.remove(level_path)
+    scenes.scan()
+    assert len(scenes.find_script_nodes(str(tmp_path / "weapon.gd"))) == 1
@@ -0,0 +1,101 @@
+import json
+
+import classes
+import symbols
+
+ENEMY_SYMBOLS = [
+    ("spawn_enemy", "func", 3, 5, None),
+    ("EnemyWave", "class", 10, 6, None),
+    ("enemy_count", "var", 1, 4, None),
+    ("SPEED", "const", 2, 6, "EnemyWave"),
+]
+
+PLAYER_SYMBOLS = [
+    ("get_node_map", "func", 4, 5, None),
+    ("spawn_point", "var", 1, 4, None),
+]
+
+def make_index():
+    symbol_index = symbols.SymbolIndex()
+    symbol_index.add_file("/p/enemy.gd", [1, 2], ENEMY_SYMBOLS)
+    symbol_index.add_file("/p/player.gd", [3, 4], PLAYER_SYMBOLS)
+    return symbol_index
+
+def names(matches):
+    return [m.name for m in matches]
+
+def test_exact_match_first():
+    matches = make_index().search("spawn_enemy")
+    assert matches[0].name == "spawn_enemy"
+    assert (matches[0].path, matches[0].line, matches[0].col) == ("/p/enemy.gd", 3, 5)
+
+def test_typo():
+    assert names(make_index().search("spawn_enmy"))[0] == "spawn_enemy"
+
+def test_initials():
+    assert names(make_index().search("gnm")) == ["get_node_map"]
+    assert "spawn_enemy" in names(make_index().search("se"))
+
+def test_substring_ranks_word_boundaries():
+    found = names(make_index().search("enemy"))
+    assert set(found[:3]) == set(["enemy_count", "EnemyWave", "spawn_enemy"])
+    assert "spawn_point" not in found
+
+def test_container():
+    matches = make_index().search("speed")
+    assert (matches[0].name, matches[0].container) == ("SPEED", "EnemyWave")
+
+def test_remove_file():
+    symbol_index = make_index()
+    symbol_index.remove_file("/p/enemy.gd")
+    assert len(symbol_index) == len(PLAYER_SYMBOLS)
+    assert "spawn_enemy" not in names(symbol_index.search("spawn"))
+    assert "spawn_point" in names(symbol_index.search("spawn"))
+
+def test_replace_file():
+    symbol_index = make_index()
+    symbol_index.add_file("/p/enemy.gd", [5, 6], [("spawn_boss", "func", 1, 5, None)])
+    found = names(symbol_index.search("spawn"))
+    assert "spawn_boss" in found
+    assert "spawn_enemy" not in found
+    assert symbol_index.files["/p/enemy.gd"][0] == [5, 6]
+
+def test_compact():
+    symbol_index = make_index()
+    symbol_index.add_file("/p/enemy.gd", [5, 6], ENEMY_SYMBOLS)
+    symbol_index.compact()
+    assert len(symbol_index._names) == len(ENEMY_SYMBOLS) + len(PLAYER_SYMBOLS)
+    assert symbol_index.get_file_symbols("/p/enemy.gd") == ENEMY_SYMBOLS
+    assert names(symbol_index.search("gnm")) == ["get_node_map"]
+
+def test_json_round_trip():
+    symbol_index = make_index()
+    symbol_index.remove_file("/p/player.gd")
+    obj = json.loads(json.dumps(symbol_index.to_json()))
+    loaded = symbols.SymbolIndex.from_json(obj)
+    assert len(loaded) == len(ENEMY_SYMBOLS)
+    assert loaded.get_file_symbols("/p/enemy.gd") == \
+        [tuple(s) for s in symbol_index.get_file_symbols("/p/enemy.gd")]
+    assert names(loaded.search("spawn")) == ["spawn_enemy"]
+    assert loaded.search("enemy")[0].path == "/p/enemy.gd"
+
+def test_script_symbols_skip_locals():
+    lines = [
+        "extends Node",
+        "var health = 10",
+        "func take_damage(amount):",
+        "    var left = health - amount",
+    ]
+    found = [s[0] for s in symbols.get_script_symbols(lines)]
+    assert "health" in found
+    assert "take_damage" in found
+    assert "left" not in found
+
+def test_api_symbols_leave_class_cache_alone():
+    classes.select_project(None)
+    before = classes.cache_stats()
+    found = set((s[0], s[4]) for s in symbols.get_api_symbols())
+    assert ("get_node", "Node") in found
+    assert ("Node2D", None) in found
+    assert classes.cache_stats()["evictions"] == before["evictions"]
+    assert classes.cache_stats()["classes"] <= before["classes"] + 1